@@ -0,0 +1,487 @@
+#!/usr/bin/env python3
+"""Asyncio client for the docker engine API."""
+
+import asyncio
+import functools
+import io
+import json
+import os
+import queue
+import threading
+import urllib.parse
+from collections import deque
+from collections.abc import AsyncIterator, Callable, Iterable, Iterator
+from concurrent.futures import Future
+from typing import Any, NamedTuple
+
+import docker
+import docker.constants
+import docker.errors
+import docker.utils
+import requests
+import requests.exceptions
+
+from dockertidy import __version__
+
+Connection = tuple[asyncio.StreamReader, asyncio.StreamWriter]
+
+
+class Response(NamedTuple):
+    """Status, headers and body of an HTTP response."""
+
+    status: int
+    reason: str
+    headers: dict[str, str]
+    body: bytes
+
+
+class AsyncDockerClient:
+    """
+    Talk HTTP/1.1 to the docker engine API over a unix socket or plain TCP.
+
+    Only the endpoints needed to list, inspect, remove and stop containers, images
+    and volumes and the events stream are implemented. At most `max_in_flight`
+    requests are sent at once, idle connections are kept for reuse. Errors are
+    raised as the same `docker.errors` and `requests.exceptions` types the
+    `docker.APIClient` raises.
+    """
+
+    def __init__(
+        self, base_url: str, timeout: float, max_in_flight: int, version: str | None = None
+    ) -> None:
+        url = urllib.parse.urlsplit(base_url)
+        if url.scheme == "http+unix":
+            self.socket_path: str | None = url.path
+            self.address = ("", 0)
+        elif url.scheme == "http" and url.hostname:
+            self.socket_path = None
+            self.address = (url.hostname, url.port or 2375)
+        else:
+            raise docker.errors.DockerException(
+                f"The asyncio backend doesn't support '{base_url}', use the sync backend"
+            )
+
+        self.base_url = base_url
+        self.timeout = timeout
+        self.version = version
+        self._semaphore = asyncio.Semaphore(max(1, max_in_flight))
+        self._idle: list[Connection] = []
+
+    async def negotiate(self) -> str:
+        """Use the API version of the daemon unless a version was given."""
+        if self.version is None:
+            response = await self._request("GET", "/version", versioned=False)
+            self.version = str(json.loads(response.body)["ApiVersion"])
+        return self.version
+
+    async def containers(
+        self,
+        all: bool = False,  # noqa: A002
+        filters: dict[str, Any] | None = None,
+    ) -> Any:
+        return await self._get_json("/containers/json", {"all": all, "filters": filters})
+
+    async def images(self, filters: dict[str, Any] | None = None) -> Any:
+        return await self._get_json("/images/json", {"filters": filters})
+
+    async def volumes(self, filters: dict[str, Any] | None = None) -> Any:
+        return await self._get_json("/volumes", {"filters": filters})
+
+    async def inspect_container(self, container: str) -> Any:
+        return await self._get_json(f"/containers/{self._quote(container)}/json")
+
+    async def inspect_image(self, image: str) -> Any:
+        return await self._get_json(f"/images/{self._quote(image)}/json")
+
+    async def remove_container(
+        self, container: str, v: bool = False, link: bool = False, force: bool = False
+    ) -> None:
+        params = {"v": v, "link": link, "force": force}
+        await self._request("DELETE", f"/containers/{self._quote(container)}", params)
+
+    async def remove_image(self, image: str, force: bool = False, noprune: bool = False) -> Any:
+        params = {"force": force, "noprune": noprune}
+        response = await self._request("DELETE", f"/images/{self._quote(image)}", params)
+        return json.loads(response.body) if response.body else None
+
+    async def remove_volume(self, name: str, force: bool = False) -> None:
+        await self._request("DELETE", f"/volumes/{self._quote(name)}", {"force": force or None})
+
+    async def stop(self, container: str, timeout: int | None = None) -> None:
+        # The daemon answers after the container stopped, allow for the grace period
+        await self._request(
+            "POST",
+            f"/containers/{self._quote(container)}/stop",
+            {"t": timeout},
+            timeout=self.timeout + (timeout or 0),
+        )
+
+    async def events(
+        self,
+        since: int | None = None,
+        until: int | None = None,
+        filters: dict[str, Any] | None = None,
+    ) -> AsyncIterator[dict[str, Any]]:
+        """Yield decoded events until the stream ends, without a read timeout."""
+        params = {"since": since, "until": until, "filters": filters}
+        reader, writer = await self._connect()
+        try:
+            self._send_head(writer, "GET", self._url("/events", params))
+            await writer.drain()
+            status, reason, headers = await self._read_head(reader)
+            if status >= 400:
+                body, _ = await self._read_body(reader, "GET", status, headers)
+                self._raise_for_status(Response(status, reason, headers, body), "/events")
+
+            buffer = b""
+            async for chunk in self._iter_body(reader, headers):
+                buffer += chunk
+                *lines, buffer = buffer.split(b"\n")
+                for line in lines:
+                    if line.strip():
+                        yield json.loads(line)
+            if buffer.strip():
+                yield json.loads(buffer)
+        except (OSError, asyncio.IncompleteReadError) as e:
+            raise requests.exceptions.ConnectionError(f"Events stream interrupted: {e!s}") from e
+        finally:
+            writer.close()
+
+    async def close(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _get_json(self, path: str, params: dict[str, Any] | None = None) -> Any:
+        response = await self._request("GET", path, params)
+        return json.loads(response.body)
+
+    async def _request(
+        self,
+        method: str,
+        path: str,
+        params: dict[str, Any] | None = None,
+        versioned: bool = True,
+        timeout: float | None = None,
+    ) -> Response:
+        url = self._url(path, params, versioned)
+        async with self._semaphore:
+            try:
+                response = await asyncio.wait_for(
+                    self._exchange(method, url), timeout or self.timeout
+                )
+            except TimeoutError as e:
+                raise requests.exceptions.ReadTimeout(
+                    f"{method} {url} timed out after {timeout or self.timeout}s"
+                ) from e
+            except (OSError, asyncio.IncompleteReadError, ValueError) as e:
+                raise requests.exceptions.ConnectionError(f"{method} {url} failed: {e!s}") from e
+
+        self._raise_for_status(response, url)
+        return response
+
+    async def _exchange(self, method: str, url: str) -> Response:
+        reused = bool(self._idle)
+        reader, writer = await self._acquire()
+        try:
+            self._send_head(writer, method, url)
+            await writer.drain()
+            status, reason, headers = await self._read_head(reader)
+            body, reusable = await self._read_body(reader, method, status, headers)
+        except (ConnectionError, asyncio.IncompleteReadError):
+            writer.close()
+            # The daemon may have closed an idle connection, retry once on a new one
+            if reused:
+                self._discard_idle()
+                return await self._exchange(method, url)
+            raise
+        except BaseException:
+            writer.close()
+            raise
+
+        if reusable:
+            self._idle.append((reader, writer))
+        else:
+            writer.close()
+        return Response(status, reason, headers, body)
+
+    async def _acquire(self) -> Connection:
+        while self._idle:
+            reader, writer = self._idle.pop()
+            if not reader.at_eof() and not writer.is_closing():
+                return reader, writer
+            writer.close()
+        return await self._connect()
+
+    def _discard_idle(self) -> None:
+        while self._idle:
+            _, writer = self._idle.pop()
+            writer.close()
+
+    async def _connect(self) -> Connection:
+        if self.socket_path is not None:
+            return await asyncio.open_unix_connection(self.socket_path)
+        return await asyncio.open_connection(*self.address)
+
+    def _send_head(self, writer: asyncio.StreamWriter, method: str, url: str) -> None:
+        writer.write(
+            f"{method} {url} HTTP/1.1\r\n"
+            f"Host: docker\r\n"
+            f"User-Agent: docker-tidy/{__version__}\r\n"
+            f"Content-Length: 0\r\n\r\n".encode("latin-1")
+        )
+
+    async def _read_head(self, reader: asyncio.StreamReader) -> tuple[int, str, dict[str, str]]:
+        line = await reader.readline()
+        if not line:
+            raise ConnectionResetError("Connection closed by the docker daemon")
+        _, status, *reason = line.decode("latin-1").rstrip("\r\n").split(" ", 2)
+
+        headers: dict[str, str] = {}
+        while (line := await reader.readline()) not in (b"\r\n", b"\n", b""):
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+        return int(status), "".join(reason), headers
+
+    async def _read_body(
+        self, reader: asyncio.StreamReader, method: str, status: int, headers: dict[str, str]
+    ) -> tuple[bytes, bool]:
+        """Return the body and whether the connection can be reused."""
+        keep_alive = headers.get("connection", "").lower() != "close"
+        if method == "HEAD" or status in (204, 304) or status < 200:
+            return b"", keep_alive
+        if "transfer-encoding" in headers or "content-length" in headers:
+            return b"".join(
+                [chunk async for chunk in self._iter_body(reader, headers)]
+            ), keep_alive
+        return await reader.read(), False
+
+    async def _iter_body(
+        self, reader: asyncio.StreamReader, headers: dict[str, str]
+    ) -> AsyncIterator[bytes]:
+        if headers.get("transfer-encoding", "").lower() != "chunked":
+            yield await reader.readexactly(int(headers.get("content-length", 0)))
+            return
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                raise asyncio.IncompleteReadError(b"", None)
+            size = int(line.split(b";", 1)[0], 16)
+            if size == 0:
+                while await reader.readline() not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield (await reader.readexactly(size + 2))[:-2]
+
+    def _url(self, path: str, params: dict[str, Any] | None = None, versioned: bool = True) -> str:
+        if versioned:
+            path = f"/v{self.version}{path}"
+
+        query = {}
+        for key, value in (params or {}).items():
+            if value is None:
+                continue
+            if key == "filters":
+                query[key] = docker.utils.convert_filters(value)
+            elif isinstance(value, bool):
+                query[key] = "1" if value else "0"
+            else:
+                query[key] = str(value)
+        return f"{path}?{urllib.parse.urlencode(query)}" if query else path
+
+    def _quote(self, value: str) -> str:
+        return urllib.parse.quote(value, safe="/:")
+
+    def _raise_for_status(self, response: Response, url: str) -> None:
+        if response.status < 400:
+            return
+
+        # Build the exception the docker SDK would raise for this response
+        http_response = requests.Response()
+        http_response.status_code = response.status
+        http_response.reason = response.reason
+        http_response.url = url
+        http_response.raw = io.BytesIO(response.body)
+        docker.errors.create_api_error_from_http_exception(
+            requests.exceptions.HTTPError(response=http_response)
+        )
+
+
+class EventStream:
+    """Blocking iterator over an events stream of the `AsyncDockerClient`."""
+
+    _END = object()
+
+    def __init__(
+        self, loop: asyncio.AbstractEventLoop, events: AsyncIterator[dict[str, Any]]
+    ) -> None:
+        self._queue: queue.SimpleQueue[Any] = queue.SimpleQueue()
+        self._future = asyncio.run_coroutine_threadsafe(self._pump(events), loop)
+
+    def __iter__(self) -> Iterator[dict[str, Any]]:
+        return self
+
+    def __next__(self) -> dict[str, Any]:
+        item = self._queue.get()
+        if item is self._END:
+            self._queue.put(item)
+            raise StopIteration
+        if isinstance(item, Exception):
+            raise item
+        return item  # type: ignore[no-any-return]
+
+    def close(self) -> None:
+        """Close the stream, iteration ends once the buffered events are consumed."""
+        self._future.cancel()
+        self._queue.put(self._END)
+
+    async def _pump(self, events: AsyncIterator[dict[str, Any]]) -> None:
+        try:
+            async for event in events:
+                self._queue.put(event)
+        except (docker.errors.DockerException, requests.exceptions.RequestException) as e:
+            self._queue.put(e)
+        finally:
+            self._queue.put(self._END)
+
+
+def deferred(func: Callable[..., Any], future: Future[Any]) -> Callable[..., Any]:
+    """
+    Return a stand-in for `func` that returns the result of an already submitted call.
+
+    Only the first call waits for `future`, further calls like retries call `func`.
+    """
+    pending = [future]
+
+    def call(*args: Any, **kwargs: Any) -> Any:
+        if pending:
+            return pending.pop().result()
+        return func(*args, **kwargs)
+
+    return functools.update_wrapper(call, func)
+
+
+class AsyncioClient:
+    """
+    Blocking facade of the `AsyncDockerClient` with the interface of `docker.APIClient`.
+
+    The event loop runs in a background thread and calls from any thread are
+    scheduled on it. `submit` and `map` return futures, so a single thread can keep
+    up to `max_in_flight` requests in flight. Endpoints without an asyncio
+    implementation, like `df` and the prune endpoints, are passed to a
+    `docker.APIClient` created on first use.
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        timeout: int = docker.constants.DEFAULT_TIMEOUT_SECONDS,
+        max_in_flight: int = 100,
+        version: str | None = None,
+    ) -> None:
+        self.base_url = str(
+            docker.utils.parse_host(
+                base_url or os.environ.get("DOCKER_HOST"),
+                docker.constants.IS_WINDOWS_PLATFORM,
+                tls=bool(os.environ.get("DOCKER_TLS_VERIFY")),
+            )
+        )
+        self.timeout = timeout
+        self.max_in_flight = max(1, max_in_flight)
+        self._client = AsyncDockerClient(self.base_url, timeout, self.max_in_flight, version)
+        self._fallback: docker.APIClient | None = None
+
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(
+            target=self._loop.run_forever, name="tidy-asyncio", daemon=True
+        )
+        self._thread.start()
+
+        try:
+            self.api_version = self.submit("negotiate").result()
+        except (docker.errors.APIError, requests.exceptions.RequestException) as e:
+            self.close()
+            raise docker.errors.DockerException(
+                f"Error while fetching server API version: {e!s}"
+            ) from e
+
+    def submit(self, method: str, *args: Any, **kwargs: Any) -> Future[Any]:
+        """Schedule a call of the asyncio client and return its future."""
+        coro = getattr(self._client, method)(*args, **kwargs)
+        return asyncio.run_coroutine_threadsafe(coro, self._loop)
+
+    def map(
+        self, method: str, key: str, values: Iterable[Any]
+    ) -> Iterator[tuple[Any, Future[Any]]]:
+        """Submit one call per value and yield each value with its future, in input order."""
+        pending: deque[tuple[Any, Future[Any]]] = deque()
+        for value in values:
+            pending.append((value, self.submit(method, **{key: value})))
+            if len(pending) >= self.max_in_flight * 2:
+                yield pending.popleft()
+        while pending:
+            yield pending.popleft()
+
+    def containers(
+        self,
+        all: bool = False,  # noqa: A002
+        filters: dict[str, Any] | None = None,
+    ) -> Any:
+        return self.submit("containers", all=all, filters=filters).result()
+
+    def images(self, filters: dict[str, Any] | None = None) -> Any:
+        return self.submit("images", filters=filters).result()
+
+    def volumes(self, filters: dict[str, Any] | None = None) -> Any:
+        return self.submit("volumes", filters=filters).result()
+
+    def inspect_container(self, container: str) -> Any:
+        return self.submit("inspect_container", container).result()
+
+    def inspect_image(self, image: str) -> Any:
+        return self.submit("inspect_image", image).result()
+
+    def remove_container(
+        self, container: str, v: bool = False, link: bool = False, force: bool = False
+    ) -> None:
+        self.submit("remove_container", container, v=v, link=link, force=force).result()
+
+    def remove_image(self, image: str, force: bool = False, noprune: bool = False) -> Any:
+        return self.submit("remove_image", image, force=force, noprune=noprune).result()
+
+    def remove_volume(self, name: str, force: bool = False) -> None:
+        self.submit("remove_volume", name, force=force).result()
+
+    def stop(self, container: str, timeout: int | None = None) -> None:
+        self.submit("stop", container, timeout=timeout).result()
+
+    def events(
+        self,
+        since: int | None = None,
+        until: int | None = None,
+        filters: dict[str, Any] | None = None,
+        decode: bool = True,
+    ) -> EventStream:
+        if not decode:
+            raise ValueError("The asyncio backend only returns decoded events")
+        return EventStream(self._loop, self._client.events(since, until, filters))
+
+    def close(self) -> None:
+        """Close all connections and stop the event loop."""
+        if self._loop.is_running():
+            asyncio.run_coroutine_threadsafe(self._client.close(), self._loop).result()
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._loop.close()
+        if self._fallback is not None:
+            self._fallback.close()
+
+    def __getattr__(self, name: str) -> Any:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._fallback is None:
+            self._fallback = docker.APIClient(
+                base_url=self.base_url, version=self.api_version, timeout=self.timeout
+            )
+        return getattr(self._fallback, name)
@@ -2,37 +2,64 @@
 """Stop long running docker images."""
 
 import datetime
-from collections.abc import Callable
+import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future
 from typing import Any
 
-import dateparser
-import dateutil.parser
 import docker
 import docker.errors
 import requests.exceptions
 
-from dockertidy.config import SingleConfig
+from dockertidy import metrics, profiler
+from dockertidy.aio import AsyncioClient, deferred
+from dockertidy.config import BACKENDS, SingleConfig
+from dockertidy.inventory import Inventory
 from dockertidy.logger import SingleLog
+from dockertidy.parser import parse_past_time, parse_timestamp
+from dockertidy.replay import Recorder, ReplayClient
+from dockertidy.resilience import get_retry_policy
+from dockertidy.summary import RunSummary
 
 
 class AutoStop:
     """AutoStop object to handle long running containers."""
 
-    def __init__(self) -> None:
+    def __init__(self, host: str | None = None) -> None:
         self.config = SingleConfig()
+        self.host = host
         self.log = SingleLog()
         self.logger = SingleLog().logger
-        self.docker = self._get_docker_client()
+        self._docker: Any = None
+        self.live_inventory: Inventory | None = None
+        self.retry = get_retry_policy(self.config.config)
+        self.summary = RunSummary("stop", host)
+        self.stopped: list[str] = []
+        self.failed: list[str] = []
+
+    @property
+    def docker(self) -> Any:
+        """Docker client, created on first use."""
+        if self._docker is None:
+            self._docker = self._get_docker_client()
+        return self._docker
+
+    @docker.setter
+    def docker(self, client: Any) -> None:
+        self._docker = client
+
+    def close(self) -> None:
+        """Close the docker client if it was created."""
+        if self._docker is not None:
+            self._docker.close()
+            self._docker = None
 
     def stop_containers(self) -> None:
         """Identify long running containers and terminate them."""
         client = self.docker
         config = self.config.config
 
-        max_run_time = dateparser.parse(
-            config["stop"]["max_run_time"],
-            settings={"TO_TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": True},
-        )
+        max_run_time = parse_past_time(config["stop"]["max_run_time"])
 
         if not max_run_time:
             return
@@ -45,29 +72,92 @@ class AutoStop:
         self.logger.info(
             f"Stopping containers older than '{max_run_time.strftime('%Y-%m-%d, %H:%M:%S')}'"
         )
-        for container_summary in client.containers():
-            container = client.inspect_container(container_summary["Id"])
+        stopping: list[tuple[str, Future[Any]]] = []
+        for container in self._get_running_containers():
+            metrics.SCANNED.inc(command="stop", resource="containers", host=self.host)
             name = container["Name"].lstrip("/")
 
             if (
                 prefix and matcher(name) and self._has_been_running_since(container, max_run_time)
             ) or (not prefix and self._has_been_running_since(container, max_run_time)):
+                self.summary.record(candidates=1)
                 self.logger.info(
                     "Stopping container {id} {name}: running since {started}".format(
                         id=container["Id"][:16], name=name, started=container["State"]["StartedAt"]
                     )
                 )
 
-                if not dry_run:
+                if dry_run:
+                    continue
+                if isinstance(client, AsyncioClient):
+                    stopping.append((container["Id"], client.submit("stop", container["Id"])))
+                else:
                     self._stop_container(client, container["Id"])
 
+        for cid, future in stopping:
+            self._wait_for_stop(cid, deferred(client.stop, future))
+
+    def _get_running_containers(self) -> Iterator[dict[str, Any]]:
+        client = self.docker
+        inventory = self.live_inventory
+
+        if inventory is None:
+            containers = self._instrumented_call(client.containers)
+            yield from self._inspect_containers([summary["Id"] for summary in containers])
+            return
+
+        for container_summary in inventory.containers:
+            if container_summary.get("State") != "running":
+                continue
+
+            started = inventory.started_at(container_summary["Id"])
+            if started is None:
+                yield self._instrumented_call(client.inspect_container, container_summary["Id"])
+            else:
+                # The start event carries everything needed to decide on the container
+                yield {
+                    "Id": container_summary["Id"],
+                    "Name": (container_summary.get("Names") or [""])[0],
+                    "State": {"StartedAt": started.isoformat()},
+                }
+
+    def _inspect_containers(self, ids: list[str]) -> Iterator[dict[str, Any]]:
+        client = self.docker
+        if isinstance(client, AsyncioClient):
+            for cid, future in client.map("inspect_container", "container", ids):
+                yield self._instrumented_call(deferred(client.inspect_container, future), cid)
+        else:
+            for cid in ids:
+                yield self._instrumented_call(client.inspect_container, cid)
+
     def _stop_container(self, client: Any, cid: str) -> None:
+        self._wait_for_stop(cid, client.stop)
+
+    def _wait_for_stop(self, cid: str, stop: Callable[[str], Any]) -> None:
         try:
-            client.stop(cid)
+            self._instrumented_call(stop, cid)
         except requests.exceptions.Timeout as e:
             self.logger.warning(f"Failed to stop container {cid}: {e!s}")
+            self.failed.append(cid)
         except docker.errors.APIError as e:
             self.logger.warning(f"Error stopping {cid}: {e!s}")
+            self.failed.append(cid)
+        else:
+            self.stopped.append(cid)
+
+    def _instrumented_call(self, func: Callable[..., Any], *args: Any) -> Any:
+        """Call the docker API, counting, timing and retrying the call, and raise on failure."""
+        self.summary.count_call()
+        started = time.monotonic()
+        try:
+            return self.retry.call(func, *args)
+        except (requests.exceptions.RequestException, docker.errors.DockerException):
+            metrics.API_CALL_ERRORS.inc(endpoint=metrics.endpoint(func), host=self.host)
+            raise
+        finally:
+            metrics.API_CALL_DURATION.observe(
+                time.monotonic() - started, endpoint=metrics.endpoint(func), host=self.host
+            )
 
     def _build_container_matcher(self, prefixes: list[str]) -> Callable[[str], bool]:
         def matcher(name: str) -> bool:
@@ -85,19 +175,65 @@ class AutoStop:
         if min_time is None:
             return True
 
-        return dateutil.parser.parse(started_at) <= min_time
+        started_date = parse_timestamp(started_at)
+        return started_date is not None and started_date <= min_time
 
     def _get_docker_client(self) -> Any:
         config = self.config.config
-        return docker.APIClient(version="auto", timeout=config["http_timeout"])
+        if config["backend"] not in BACKENDS:
+            self.log.sysexit_with_message(
+                f"Invalid backend '{config['backend']}', expected one of: {', '.join(BACKENDS)}"
+            )
+        if (config["record"]["path"] or config["replay"]["path"]) and config["backend"] != "sync":
+            self.log.sysexit_with_message("Record and replay require the sync backend")
+
+        if config["replay"]["path"]:
+            return ReplayClient(
+                config["replay"]["path"], config["replay"]["speed"], config["http_timeout"]
+            )
+        if config["backend"] == "asyncio":
+            return AsyncioClient(
+                self.host, timeout=config["http_timeout"], max_in_flight=config["max_in_flight"]
+            )
+        client = docker.APIClient(
+            base_url=self.host, version="auto", timeout=config["http_timeout"]
+        )
+        if config["record"]["path"]:
+            Recorder(config["record"]["path"], config["record"]["redact"]).attach(client)
+        return client
 
     def run(self) -> None:
         """AutoStop main method."""
+        config = self.config.config
+        self.summary = RunSummary("stop", self.host)
+        try:
+            with metrics.track_run("stop", self.host), self.summary.track():
+                self._run()
+        finally:
+            if config["summary"]:
+                self.summary.write(config["summary"])
+
+    def _run(self) -> None:
         self.logger.info("Start autostop")
         config = self.config.config
+        self.retry = get_retry_policy(config)
+        self.stopped = []
+        self.failed = []
 
         if config["stop"]["max_run_time"]:
-            self.stop_containers()
+            with (
+                metrics.phase("stop", "stop_containers", self.host),
+                self.summary.phase("stop_containers"),
+                profiler.phase("stop_containers", self.host),
+            ):
+                self.stop_containers()
+                self.summary.record(removed=len(self.stopped), failed=len(self.failed))
+            metrics.REMOVED.inc(
+                len(self.stopped), command="stop", resource="containers", host=self.host
+            )
+            metrics.FAILED.inc(
+                len(self.failed), command="stop", resource="containers", host=self.host
+            )
 
         if not config["stop"]["max_run_time"]:
             self.logger.warning("Skipped, no arguments given")
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""Persistent cache of image inspect results."""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections.abc import Iterable
+from typing import Any
+
+
+class InspectCache:
+    """
+    Image inspect results stored in a SQLite database, keyed by image ID.
+
+    Image IDs are content addressed, so the inspect result of an ID never changes
+    and entries never need to be revalidated. Only the fields gc relies on are
+    stored. Entries are read on first use and written back by `save`, which also
+    drops entries of images no longer present and caps the number of entries,
+    keeping the most recently used ones.
+    """
+
+    def __init__(self, path: str, max_entries: int) -> None:
+        self.path = path
+        self.max_entries = max_entries
+        self._entries: dict[str, dict[str, Any]] | None = None
+        self._added: dict[str, dict[str, Any]] = {}
+        self._used: set[str] = set()
+        self._lock = threading.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        """True if the cache has been read from disk."""
+        return self._entries is not None
+
+    @staticmethod
+    def compact(image: dict[str, Any]) -> dict[str, Any]:
+        """Reduce an inspect result to the cached fields."""
+        return {
+            "Id": image["Id"],
+            "Created": image.get("Created"),
+            "Size": image.get("Size"),
+            "RootFS": {"Layers": (image.get("RootFS") or {}).get("Layers") or []},
+            "Parent": image.get("Parent") or "",
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(self.path)
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS images "
+            "(id TEXT PRIMARY KEY, data TEXT NOT NULL, used REAL NOT NULL)"
+        )
+        return connection
+
+    def _load(self) -> dict[str, dict[str, Any]]:
+        if self._entries is None:
+            connection = self._connect()
+            try:
+                rows = connection.execute("SELECT id, data FROM images").fetchall()
+            finally:
+                connection.close()
+            self._entries = {image_id: json.loads(data) for image_id, data in rows}
+        return self._entries
+
+    def get(self, image_id: str) -> dict[str, Any] | None:
+        """Return the cached inspect result of the image, if any."""
+        with self._lock:
+            entry = self._load().get(image_id)
+            if entry is not None:
+                self._used.add(image_id)
+            return entry
+
+    def put(self, image: dict[str, Any]) -> dict[str, Any]:
+        """Add an inspect result to the cache and return the cached entry."""
+        entry = self.compact(image)
+        with self._lock:
+            self._load()[entry["Id"]] = entry
+            self._added[entry["Id"]] = entry
+            self._used.add(entry["Id"])
+        return entry
+
+    def save(self, present: Iterable[str] | None = None) -> None:
+        """
+        Write new entries to disk.
+
+        If `present` is given, entries of all other image IDs are evicted.
+        """
+        with self._lock:
+            if self._entries is None:
+                return
+
+            added = self._added
+            stale: set[str] = set()
+            if present is not None:
+                present = set(present)
+                added = {key: entry for key, entry in added.items() if key in present}
+                stale = self._entries.keys() - present
+
+            now = time.time()
+            connection = self._connect()
+            try:
+                with connection:
+                    connection.executemany(
+                        "DELETE FROM images WHERE id = ?", ((image_id,) for image_id in stale)
+                    )
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO images VALUES (?, ?, ?)",
+                        ((image_id, json.dumps(entry), now) for image_id, entry in added.items()),
+                    )
+                    connection.executemany(
+                        "UPDATE images SET used = ? WHERE id = ?",
+                        ((now, image_id) for image_id in self._used),
+                    )
+                    connection.execute(
+                        "DELETE FROM images WHERE id NOT IN "
+                        "(SELECT id FROM images ORDER BY used DESC LIMIT ?)",
+                        (max(0, self.max_entries),),
+                    )
+            finally:
+                connection.close()
+
+            # Keep the entries for later runs of the same process, unless some were trimmed
+            for image_id in stale:
+                del self._entries[image_id]
+            if len(self._entries) > self.max_entries:
+                self._entries = None
+            self._added = {}
+            self._used = set()
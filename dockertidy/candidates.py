@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Compact removal candidates and streaming helpers of the gc pipeline."""
+
+import datetime
+from collections import deque
+from collections.abc import Callable, Iterable, Iterator
+from typing import Any, TypeVar
+
+from dockertidy.parser import parse_created
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ImageCandidate:
+    """
+    Fields of an image gc needs to decide on, order and remove it.
+
+    Inspect results can be several kilobytes per image, so they are reduced to a
+    candidate as soon as they are received and only candidates are kept until the
+    end of a phase. `details` is the inspect result, or the list summary if it is
+    complete. Without details `created` and `layers` are None.
+    """
+
+    __slots__ = ("base", "created", "id", "layers", "parent", "size", "tags")
+
+    def __init__(self, summary: dict[str, Any], details: dict[str, Any] | None = None) -> None:
+        details = details or {}
+        self.id: str = summary["Id"]
+        self.tags: list[str] = summary.get("RepoTags") or []
+        self.parent: str | None = summary.get("ParentId") or None
+        self.size: int = summary.get("Size") or details.get("Size") or 0
+        self.created: datetime.datetime | None = (
+            parse_created(details["Created"]) if "Created" in details else None
+        )
+        rootfs = details.get("RootFS")
+        self.layers: tuple[str, ...] | None = (
+            tuple(rootfs.get("Layers") or ()) if rootfs is not None else None
+        )
+        self.base: str | None = details.get("Parent") or None
+
+    def __str__(self) -> str:
+        tags = "" if self.tags == ["<none>:<none>"] else ", ".join(self.tags)
+        return f"{self.id[:16]} {tags}"
+
+
+def fill_in_order(
+    items: Iterable[T],
+    known: Callable[[T], R | None],
+    fetch: Callable[[Iterator[T]], Iterator[R | None]],
+) -> Iterator[tuple[T, R | None]]:
+    """
+    Pair each item with its result in input order, fetching only the unknown ones.
+
+    Items `known` returns None for are passed to `fetch` as a lazy iterator, which
+    must yield one result per item in order and consume all of them. `fetch` may
+    read ahead, only the items between its read position and the last result are
+    buffered.
+    """
+    pending: deque[tuple[T, R | None]] = deque()
+
+    def missing() -> Iterator[T]:
+        for item in items:
+            result = known(item)
+            pending.append((item, result))
+            if result is None:
+                yield item
+
+    for fetched in fetch(missing()):
+        while pending:
+            item, result = pending.popleft()
+            if result is None:
+                yield item, fetched
+                break
+            yield item, result
+
+    while pending:
+        yield pending.popleft()
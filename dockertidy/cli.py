@@ -6,11 +6,10 @@ from typing import Any
 
 import dockertidy.exception
 from dockertidy import __version__
-from dockertidy.autostop import AutoStop
-from dockertidy.config import SingleConfig
-from dockertidy.garbage_collector import GarbageCollector
+from dockertidy.config import BACKENDS, GC_STRATEGIES, PROFILE_MODES, SingleConfig
 from dockertidy.logger import SingleLog
 from dockertidy.parser import timedelta_validator
+from dockertidy.profiler import profile
 
 
 class DockerTidy:
@@ -21,8 +20,6 @@ class DockerTidy:
         self.logger = self.log.logger
         self.args = self._cli_args()
         self.config = self._get_config()
-        self.gc = GarbageCollector()
-        self.stop = AutoStop()
         self.run()
 
     def _cli_args(self) -> dict[str, Any]:
@@ -47,6 +44,86 @@ class DockerTidy:
             metavar="HTTP_TIMEOUT",
             help="HTTP timeout in seconds for making docker API calls",
         )
+        parser.add_argument(
+            "-H",
+            "--host",
+            action="append",
+            dest="hosts",
+            metavar="HOST",
+            help="docker host to tidy, e.g. tcp://node1:2375 (repeat for multiple hosts)",
+        )
+        parser.add_argument(
+            "--host-workers",
+            type=int,
+            dest="host_workers",
+            metavar="HOST_WORKERS",
+            help="maximum number of hosts tidied concurrently",
+        )
+        parser.add_argument(
+            "--backend",
+            choices=BACKENDS,
+            dest="backend",
+            help="client used for docker API calls, 'asyncio' sends concurrent calls "
+            "from a single event loop",
+        )
+        parser.add_argument(
+            "--max-in-flight",
+            type=int,
+            dest="max_in_flight",
+            metavar="MAX_IN_FLIGHT",
+            help="maximum number of concurrent docker API calls of the asyncio backend",
+        )
+        parser.add_argument(
+            "--record",
+            dest="record.path",
+            metavar="RECORD",
+            help="append all docker API requests and responses to this file",
+        )
+        parser.add_argument(
+            "--redact",
+            action="append",
+            dest="record.redact",
+            metavar="KEY",
+            help="replace values of this JSON key in recorded responses (repeat for more keys)",
+        )
+        parser.add_argument(
+            "--replay",
+            dest="replay.path",
+            metavar="REPLAY",
+            help="answer docker API calls from a recording instead of a docker daemon",
+        )
+        parser.add_argument(
+            "--replay-speed",
+            type=float,
+            dest="replay.speed",
+            metavar="SPEED",
+            help="divide the recorded latency by this factor, 0 answers immediately",
+        )
+        parser.add_argument(
+            "--summary",
+            dest="summary",
+            metavar="SUMMARY",
+            help="append a JSON summary of each run to this file, '-' writes to stdout",
+        )
+        parser.add_argument(
+            "--metrics-textfile",
+            dest="metrics.textfile",
+            metavar="METRICS_TEXTFILE",
+            help="write prometheus metrics to this file after each run",
+        )
+        parser.add_argument(
+            "--profile",
+            choices=PROFILE_MODES,
+            dest="profile.mode",
+            help="profile the whole run, 'cpu' writes a cProfile dump and 'mem' a report "
+            "of the largest allocations",
+        )
+        parser.add_argument(
+            "--profile-output",
+            dest="profile.path",
+            metavar="PROFILE_OUTPUT",
+            help="file the profile is written to (default: docker-tidy.prof)",
+        )
         parser.add_argument(
             "-v", dest="logging.level", action="append_const", const=-1, help="increase log level"
         )
@@ -65,7 +142,7 @@ class DockerTidy:
             dest="gc.max_container_age",
             metavar="MAX_CONTAINER_AGE",
             help="maximum age for a container, containers older than this age "
-            "will be removed (dateparser value)",
+            "will be removed (e.g. '7 days ago', '1d12h' or 'P1W')",
         )
         parser_gc.add_argument(
             "--max-image-age",
@@ -73,7 +150,7 @@ class DockerTidy:
             dest="gc.max_image_age",
             metavar="MAX_IMAGE_AGE",
             help="maximum age for an image, images older than this age will be "
-            "removed (dateparser value)",
+            "removed (e.g. '7 days ago', '1d12h' or 'P1W')",
         )
         parser_gc.add_argument(
             "--dangling-volumes",
@@ -102,7 +179,7 @@ class DockerTidy:
             type=str,
             dest="gc.min_free_disk_space",
             metavar="MIN_FREE_DISK_SPACE",
-            help="remove oldest images until this much free disk space is available "
+            help="remove unused images until this much free disk space is available "
             "(e.g. 10GB, 500MB, 5%%)",
         )
         parser_gc.add_argument(
@@ -112,6 +189,28 @@ class DockerTidy:
             metavar="DISK_PATH",
             help="filesystem path to check for free disk space (default: /var/lib/docker)",
         )
+        parser_gc.add_argument(
+            "--workers",
+            type=int,
+            dest="gc.workers",
+            metavar="WORKERS",
+            help="number of concurrent docker API calls used to inspect containers and images",
+        )
+        parser_gc.add_argument(
+            "--latency-target",
+            type=float,
+            dest="gc.latency_target",
+            metavar="LATENCY_TARGET",
+            help="reduce concurrent removals while the p95 latency of docker API calls "
+            "exceeds this many seconds",
+        )
+        parser_gc.add_argument(
+            "--strategy",
+            choices=GC_STRATEGIES,
+            dest="gc.strategy",
+            help="use the daemon prune endpoints ('prune'), per-object removal ('per-object') "
+            "or prune endpoints only where they match the policy exactly ('auto')",
+        )
 
         parser_stop = subparsers.add_parser(
             "stop", help="stop containers that have been running for too long"
@@ -121,7 +220,8 @@ class DockerTidy:
             type=timedelta_validator,
             dest="stop.max_run_time",
             metavar="MAX_RUN_TIME",
-            help="maximum time a container is allows to run (dateparser value)",
+            help="maximum time a container is allowed to run "
+            "(e.g. '2 days ago', '1d12h' or 'P1W')",
         )
         parser_stop.add_argument(
             "--prefix",
@@ -132,6 +232,38 @@ class DockerTidy:
             help="only stop containers which match one of the prefix",
         )
 
+        parser_daemon = subparsers.add_parser(
+            "daemon", help="run gc and stop periodically in a long-running process"
+        )
+        parser_daemon.add_argument(
+            "--gc-interval",
+            type=int,
+            dest="daemon.gc_interval",
+            metavar="GC_INTERVAL",
+            help="seconds between garbage collector runs, 0 disables them",
+        )
+        parser_daemon.add_argument(
+            "--stop-interval",
+            type=int,
+            dest="daemon.stop_interval",
+            metavar="STOP_INTERVAL",
+            help="seconds between autostop runs, 0 disables them",
+        )
+        parser_daemon.add_argument(
+            "--no-events",
+            action="store_false",
+            default=None,
+            dest="daemon.events",
+            help="don't follow the docker events stream between runs",
+        )
+        parser_daemon.add_argument(
+            "--metrics-port",
+            type=int,
+            dest="metrics.port",
+            metavar="METRICS_PORT",
+            help="serve prometheus metrics at /metrics on this port, 0 disables it",
+        )
+
         return parser.parse_args().__dict__
 
     def _get_config(self) -> SingleConfig:
@@ -145,6 +277,10 @@ class DockerTidy:
         except ValueError as e:
             self.log.sysexit_with_message(f"Can not set log level.\n{e!s}")
 
+        # A summary written to stdout must not be mixed with log messages
+        if config.config["summary"] == "-":
+            self.log.log_to_stderr()
+
         self.logger.info(f"Using config file {config.config_file}")
         self.logger.debug(f"Config dump: {config.config}")
 
@@ -152,10 +288,44 @@ class DockerTidy:
 
     def run(self) -> None:
         """Cli main method."""
-        if self.config.config["command"] == "gc":
-            self.gc.run()
-        elif self.config.config["command"] == "stop":
-            self.stop.run()
+        config = self.config.config["profile"]
+        if config["mode"] and config["mode"] not in PROFILE_MODES:
+            self.log.sysexit_with_message(
+                f"Invalid profile mode '{config['mode']}', "
+                f"expected one of: {', '.join(PROFILE_MODES)}"
+            )
+
+        with profile(config["mode"], config["path"], config["top"]):
+            self._run_command()
+
+    def _run_command(self) -> None:
+        # Only import and set up what the selected command needs, the docker client
+        # and its dependencies dominate the startup time
+        command = self.config.config["command"]
+        try:
+            if self.config.config["hosts"] and command in ("gc", "stop"):
+                from dockertidy.fanout import FanOut
+
+                FanOut(command, self.config.config["hosts"]).run()
+            elif command == "gc":
+                from dockertidy.garbage_collector import GarbageCollector
+
+                GarbageCollector().run()
+            elif command == "stop":
+                from dockertidy.autostop import AutoStop
+
+                AutoStop().run()
+            elif command == "daemon":
+                if self.config.config["hosts"]:
+                    self.log.sysexit_with_message("The daemon command can only tidy a single host")
+
+                from dockertidy.autostop import AutoStop
+                from dockertidy.daemon import Daemon
+                from dockertidy.garbage_collector import GarbageCollector
+
+                Daemon(GarbageCollector(), AutoStop()).run()
+        except dockertidy.exception.CircuitOpenError as e:
+            self.log.sysexit_with_message(e)
 
 
 def main() -> None:
@@ -18,6 +18,12 @@ from dockertidy.utils import Singleton, dict_intersect
 
 config_dir = AppDirs("docker-tidy").user_config_dir
 default_config_file = os.path.join(config_dir, "config.yml")
+cache_dir = AppDirs("docker-tidy").user_cache_dir
+default_cache_file = os.path.join(cache_dir, "inspect.db")
+
+GC_STRATEGIES = ("auto", "prune", "per-object")
+BACKENDS = ("sync", "asyncio")
+PROFILE_MODES = ("cpu", "mem")
 
 
 class Config:
@@ -51,6 +57,36 @@ class Config:
             "file": True,
             "type": environs.Env().int,
         },
+        "backend": {
+            "default": "sync",
+            "env": "BACKEND",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "max_in_flight": {
+            "default": 100,
+            "env": "MAX_IN_FLIGHT",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "hosts": {
+            "default": [],
+            "env": "HOSTS",
+            "file": True,
+            "type": environs.Env().list,
+        },
+        "host_workers": {
+            "default": 8,
+            "env": "HOST_WORKERS",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "summary": {
+            "default": "",
+            "env": "SUMMARY",
+            "file": True,
+            "type": environs.Env().str,
+        },
         "logging.level": {
             "default": "WARNING",
             "env": "LOG_LEVEL",
@@ -63,6 +99,72 @@ class Config:
             "file": True,
             "type": environs.Env().bool,
         },
+        "retry.attempts": {
+            "default": 0,
+            "env": "RETRY_ATTEMPTS",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "retry.backoff": {
+            "default": 0.5,
+            "env": "RETRY_BACKOFF",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "retry.max_backoff": {
+            "default": 10.0,
+            "env": "RETRY_MAX_BACKOFF",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "retry.budget": {
+            "default": 100,
+            "env": "RETRY_BUDGET",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "breaker.threshold": {
+            "default": 0.0,
+            "env": "BREAKER_THRESHOLD",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "breaker.window": {
+            "default": 20,
+            "env": "BREAKER_WINDOW",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "breaker.pause": {
+            "default": 30.0,
+            "env": "BREAKER_PAUSE",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "breaker.max_opens": {
+            "default": 3,
+            "env": "BREAKER_MAX_OPENS",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "cache.enabled": {
+            "default": False,
+            "env": "CACHE_ENABLED",
+            "file": True,
+            "type": environs.Env().bool,
+        },
+        "cache.path": {
+            "default": default_cache_file,
+            "env": "CACHE_PATH",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "cache.max_entries": {
+            "default": 10000,
+            "env": "CACHE_MAX_ENTRIES",
+            "file": True,
+            "type": environs.Env().int,
+        },
         "gc.max_container_age": {
             "default": "",
             "env": "GC_MAX_CONTAINER_AGE",
@@ -105,6 +207,126 @@ class Config:
             "file": True,
             "type": environs.Env().str,
         },
+        "gc.workers": {
+            "default": 1,
+            "env": "GC_WORKERS",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "gc.remove_workers.containers": {
+            "default": 1,
+            "env": "GC_REMOVE_WORKERS_CONTAINERS",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "gc.remove_workers.images": {
+            "default": 1,
+            "env": "GC_REMOVE_WORKERS_IMAGES",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "gc.remove_workers.volumes": {
+            "default": 1,
+            "env": "GC_REMOVE_WORKERS_VOLUMES",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "gc.latency_target": {
+            "default": 0.0,
+            "env": "GC_LATENCY_TARGET",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "gc.latency_window": {
+            "default": 20,
+            "env": "GC_LATENCY_WINDOW",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "gc.strategy": {
+            "default": "per-object",
+            "env": "GC_STRATEGY",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "daemon.gc_interval": {
+            "default": 300,
+            "env": "DAEMON_GC_INTERVAL",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "daemon.stop_interval": {
+            "default": 0,
+            "env": "DAEMON_STOP_INTERVAL",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "daemon.events": {
+            "default": True,
+            "env": "DAEMON_EVENTS",
+            "file": True,
+            "type": environs.Env().bool,
+        },
+        "record.path": {
+            "default": "",
+            "env": "RECORD_PATH",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "record.redact": {
+            "default": [],
+            "env": "RECORD_REDACT",
+            "file": True,
+            "type": environs.Env().list,
+        },
+        "replay.path": {
+            "default": "",
+            "env": "REPLAY_PATH",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "replay.speed": {
+            "default": 1.0,
+            "env": "REPLAY_SPEED",
+            "file": True,
+            "type": environs.Env().float,
+        },
+        "metrics.textfile": {
+            "default": "",
+            "env": "METRICS_TEXTFILE",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "metrics.address": {
+            "default": "127.0.0.1",
+            "env": "METRICS_ADDRESS",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "metrics.port": {
+            "default": 0,
+            "env": "METRICS_PORT",
+            "file": True,
+            "type": environs.Env().int,
+        },
+        "profile.mode": {
+            "default": "",
+            "env": "PROFILE_MODE",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "profile.path": {
+            "default": "docker-tidy.prof",
+            "env": "PROFILE_PATH",
+            "file": True,
+            "type": environs.Env().str,
+        },
+        "profile.top": {
+            "default": 25,
+            "env": "PROFILE_TOP",
+            "file": True,
+            "type": environs.Env().int,
+        },
         "stop.max_run_time": {
             "default": "",
             "env": "STOP_MAX_RUN_TIME",
@@ -0,0 +1,158 @@
+#!/usr/bin/env python3
+"""Run garbage collection and autostop periodically in a single process."""
+
+import heapq
+import signal
+import threading
+import time
+from collections.abc import Callable
+from types import FrameType
+from typing import Any
+
+import docker.errors
+import requests.exceptions
+
+from dockertidy.autostop import AutoStop
+from dockertidy.config import SingleConfig
+from dockertidy.events import EventWatcher
+from dockertidy.exception import CircuitOpenError
+from dockertidy.garbage_collector import GarbageCollector
+from dockertidy.logger import SingleLog
+from dockertidy.metrics import MetricsServer
+
+
+class Daemon:
+    """
+    Schedule the gc and stop jobs at fixed intervals.
+
+    Jobs run one after another on the calling thread, so runs never overlap. A job
+    that takes longer than its interval is started again right after it finished,
+    missed runs are not made up for. The docker client, config, caches and, with
+    `daemon.events`, an inventory kept current by the events stream are shared by
+    all runs.
+    """
+
+    def __init__(self, gc: GarbageCollector, stop: AutoStop) -> None:
+        self.config = SingleConfig()
+        self.log = SingleLog()
+        self.logger = SingleLog().logger
+        self.gc = gc
+        self.stop = stop
+        self.stop.docker = self.gc.docker
+        self.watcher: EventWatcher | None = None
+        self.metrics_server: MetricsServer | None = None
+        self._stopped = threading.Event()
+
+    def _get_jobs(self) -> list[tuple[str, float, Callable[[], None]]]:
+        config = self.config.config
+        jobs = []
+
+        if config["daemon"]["gc_interval"] > 0:
+            jobs.append(("gc", float(config["daemon"]["gc_interval"]), self.gc.run))
+        if config["daemon"]["stop_interval"] > 0:
+            jobs.append(("stop", float(config["daemon"]["stop_interval"]), self.stop.run))
+
+        return jobs
+
+    def _run_job(self, name: str, job: Callable[[], None]) -> None:
+        started = time.monotonic()
+        try:
+            job()
+        except (
+            docker.errors.DockerException,
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+        ) as e:
+            self.logger.error(f"Job {name} failed: {e!s}")
+            return
+        except (Exception, SystemExit) as e:
+            # A bug or an invalid setting must not stop the schedule, the next run
+            # may well succeed and the other job is not affected at all
+            self.logger.exception(f"Job {name} failed unexpectedly: {e!r}")
+            return
+
+        self.logger.info(f"Job {name} finished in {time.monotonic() - started:.1f}s")
+
+    def _handle_signal(self, signum: int, frame: FrameType | None) -> None:  # noqa: ARG002
+        self.logger.info(f"Received {signal.Signals(signum).name}, shutting down")
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """Stop the scheduler after the running job finished."""
+        self._stopped.set()
+
+    def _start_watcher(self) -> None:
+        inventory = self.gc.create_inventory()
+        self.watcher = EventWatcher(self.gc.docker, inventory)
+        self.watcher.start()
+        self.gc.live_inventory = inventory
+        self.stop.live_inventory = inventory
+
+    def _stop_watcher(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+            self.watcher = None
+        self.gc.live_inventory = None
+        self.stop.live_inventory = None
+
+    def _start_metrics_server(self) -> None:
+        config = self.config.config["metrics"]
+        try:
+            self.metrics_server = MetricsServer(config["address"], config["port"])
+        except OSError as e:
+            self.log.sysexit_with_message(
+                f"Can not serve metrics on {config['address']}:{config['port']}: {e!s}"
+            )
+        self.metrics_server.start()
+        self.logger.info(f"Serving metrics on http://{config['address']}:{config['port']}/metrics")
+
+    def _stop_metrics_server(self) -> None:
+        if self.metrics_server is not None:
+            self.metrics_server.stop()
+            self.metrics_server = None
+
+    def run(self) -> None:
+        """Daemon main method."""
+        config = self.config.config
+        jobs = self._get_jobs()
+
+        if not jobs:
+            self.logger.warning("Skipped, no job interval given")
+            return
+
+        handlers: dict[signal.Signals, Any] = {}
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGTERM, signal.SIGINT):
+                handlers[signum] = signal.signal(signum, self._handle_signal)
+
+        if config["metrics"]["port"] > 0:
+            self._start_metrics_server()
+        if config["daemon"]["events"]:
+            self._start_watcher()
+
+        self.logger.info(
+            "Start daemon: {}".format(
+                ", ".join(f"{name} every {interval:.0f}s" for name, interval, _ in jobs)
+            )
+        )
+        # Jobs are due immediately, in the order they were configured
+        now = time.monotonic()
+        schedule = [(now, index) for index in range(len(jobs))]
+        heapq.heapify(schedule)
+
+        try:
+            while not self._stopped.is_set():
+                due, index = schedule[0]
+                if self._stopped.wait(max(0.0, due - time.monotonic())):
+                    break
+
+                name, interval, job = jobs[index]
+                self._run_job(name, job)
+                heapq.heapreplace(schedule, (max(due + interval, time.monotonic()), index))
+        finally:
+            self._stop_watcher()
+            self._stop_metrics_server()
+            for signum, handler in handlers.items():
+                signal.signal(signum, handler)
+
+        self.logger.info("Daemon stopped")
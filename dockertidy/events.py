@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+"""Keep an inventory current from the docker events stream."""
+
+import datetime
+import threading
+import time
+from typing import Any
+
+import docker.errors
+import requests.exceptions
+
+from dockertidy.inventory import Inventory
+from dockertidy.logger import SingleLog
+
+
+class EventWatcher:
+    """
+    Apply docker events to an `Inventory` in a background thread.
+
+    Container start and die events record the start and finish times, so these
+    containers don't need to be inspected. Events that change a listing in ways
+    that can't be derived from the event invalidate the listing, and it is fetched
+    again on next use. Whenever the stream is interrupted events may have been
+    missed, so all listings are invalidated and reconciled with a single listing
+    each.
+    """
+
+    FILTERS = {
+        "type": ["container", "image", "volume"],
+        "event": [
+            "create",
+            "start",
+            "die",
+            "destroy",
+            "rename",
+            "pull",
+            "import",
+            "load",
+            "tag",
+            "untag",
+            "delete",
+        ],
+    }
+    RECONNECT_DELAY = 5
+
+    def __init__(self, client: Any, inventory: Inventory) -> None:
+        self.logger = SingleLog().logger
+        self.client = client
+        self.inventory = inventory
+        self._stream: Any = None
+        self._stopped = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        """Subscribe to the events stream and start applying events."""
+        # Listings fetched from now on can't miss any event
+        since = int(time.time())
+        self.inventory.invalidate()
+        self._stopped.clear()
+        self._thread = threading.Thread(
+            target=self._watch, args=(since,), name="tidy-events", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        """Stop applying events and close the stream."""
+        self._stopped.set()
+        stream = self._stream
+        if stream is not None:
+            stream.close()
+        if self._thread is not None:
+            self._thread.join(timeout=self.RECONNECT_DELAY)
+            self._thread = None
+
+    def _watch(self, since: int) -> None:
+        while not self._stopped.is_set():
+            try:
+                self._stream = self.client.events(since=since, filters=self.FILTERS, decode=True)
+                for event in self._stream:
+                    since = max(since, int(event.get("time") or since))
+                    self.apply(event)
+            except (requests.exceptions.RequestException, docker.errors.APIError) as e:
+                if self._stopped.is_set():
+                    return
+                self.logger.warning(f"Docker events stream interrupted: {e!s}")
+
+            if self._stopped.wait(self.RECONNECT_DELAY):
+                return
+
+            since = int(time.time())
+            self.inventory.invalidate()
+
+    def apply(self, event: dict[str, Any]) -> None:
+        """Update the inventory from a single event."""
+        inventory = self.inventory
+        kind = event.get("Type")
+        action = event.get("Action") or event.get("status") or ""
+        actor_id = (event.get("Actor") or {}).get("ID") or event.get("id") or ""
+
+        if kind == "container":
+            if action == "start":
+                inventory.container_started(actor_id, self._event_time(event))
+            elif action == "die":
+                inventory.container_finished(actor_id, self._event_time(event))
+            elif action == "destroy":
+                inventory.discard_containers([actor_id])
+                # Volumes of the container may have become dangling
+                inventory.invalidate(containers=False, images=False)
+            elif action == "create":
+                inventory.invalidate(images=False)
+            elif action == "rename":
+                inventory.invalidate(images=False, volumes=False)
+        elif kind == "image":
+            if action == "delete":
+                inventory.discard_images([actor_id])
+            else:
+                inventory.invalidate(containers=False, volumes=False)
+        elif kind == "volume":
+            if action == "destroy":
+                inventory.discard_volumes([actor_id])
+            elif action == "create":
+                inventory.invalidate(containers=False, images=False)
+
+    def _event_time(self, event: dict[str, Any]) -> datetime.datetime:
+        if event.get("timeNano"):
+            return datetime.datetime.fromtimestamp(event["timeNano"] / 1e9, tz=datetime.UTC)
+        return datetime.datetime.fromtimestamp(event.get("time") or time.time(), tz=datetime.UTC)
@@ -14,3 +14,9 @@ class ConfigError(TidyError):
     """Errors related to config file handling."""
 
     pass
+
+
+class CircuitOpenError(TidyError):
+    """Errors raised when the docker daemon keeps failing."""
+
+    pass
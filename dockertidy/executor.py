@@ -0,0 +1,144 @@
+#!/usr/bin/env python3
+"""Concurrent execution of removal calls."""
+
+from collections.abc import Callable, Hashable, Iterable, Mapping
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import TypeVar
+
+from dockertidy.limiter import AdaptiveLimiter
+from dockertidy.logger import current_host, set_current_host
+
+T = TypeVar("T")
+
+
+def parent_depths(parents: Mapping[Hashable, Hashable | None]) -> dict[Hashable, int]:
+    """
+    Return the depth of each key within the parent chain of the given keys.
+
+    Keys whose parent is not part of `parents` have depth 0, so do keys on a cycle.
+    """
+    depths: dict[Hashable, int] = {}
+
+    def depth(item_key: Hashable) -> int:
+        chain = []
+        while item_key not in depths:
+            chain.append(item_key)
+            parent_key = parents[item_key]
+            if parent_key is None or parent_key not in parents or parent_key in chain:
+                depths[item_key] = 0
+                chain.pop()
+                break
+            item_key = parent_key
+        for child_key in reversed(chain):
+            depths[child_key] = depths[item_key] + 1
+            item_key = child_key
+        return depths[item_key]
+
+    for item_key in parents:
+        depth(item_key)
+    return depths
+
+
+class RemovalReport:
+    """Outcome of all removals of one resource type."""
+
+    def __init__(self) -> None:
+        self.removed: list[str] = []
+        self.failed: list[str] = []
+
+    def record(self, name: str, success: bool) -> None:
+        if success:
+            self.removed.append(name)
+        else:
+            self.failed.append(name)
+
+
+class RemovalExecutor:
+    """
+    Run removal calls with a concurrency limit per resource type.
+
+    With a `limiter` the number of removals in flight is further bounded by its
+    adaptive limit.
+    """
+
+    def __init__(self, limits: dict[str, int], limiter: AdaptiveLimiter | None = None) -> None:
+        self.limits = limits
+        self.limiter = limiter
+        self.reports: dict[str, RemovalReport] = {}
+
+    def report(self, resource: str) -> RemovalReport:
+        return self.reports.setdefault(resource, RemovalReport())
+
+    def run(
+        self,
+        resource: str,
+        items: Iterable[T],
+        remove: Callable[[T], bool],
+        name: Callable[[T], str],
+    ) -> RemovalReport:
+        """
+        Remove all items and record the outcome of each.
+
+        Items are consumed lazily, so removals start while the caller is still
+        producing candidates. `remove` must return whether the removal succeeded.
+        """
+        limit = max(1, self.limits.get(resource, 1))
+        report = self.report(resource)
+
+        if limit == 1:
+            for item in items:
+                report.record(name(item), remove(item))
+            return report
+
+        def collect(done: set[Future[bool]]) -> None:
+            for future in done:
+                report.record(pending.pop(future), future.result())
+
+        limiter = self.limiter
+        with ThreadPoolExecutor(
+            max_workers=limit,
+            thread_name_prefix=f"tidy-{resource}",
+            initializer=set_current_host,
+            initargs=(current_host(),),
+        ) as pool:
+            pending: dict[Future[bool], str] = {}
+            for item in items:
+                if len(pending) >= limit:
+                    collect(wait(pending, return_when=FIRST_COMPLETED).done)
+                if limiter is not None:
+                    limiter.acquire()
+                future = pool.submit(remove, item)
+                if limiter is not None:
+                    future.add_done_callback(lambda _: limiter.release())
+                pending[future] = name(item)
+            collect(wait(pending).done)
+
+        return report
+
+    def run_ordered(
+        self,
+        resource: str,
+        items: Iterable[T],
+        remove: Callable[[T], bool],
+        name: Callable[[T], str],
+        key: Callable[[T], Hashable],
+        parent: Callable[[T], Hashable | None],
+    ) -> RemovalReport:
+        """
+        Remove all items, removing children before their parents.
+
+        Items are grouped by their depth within the parent chain of the given items.
+        The deepest level is removed first and each level runs concurrently.
+        """
+        by_key = {key(item): item for item in items}
+        depths = parent_depths({item_key: parent(item) for item_key, item in by_key.items()})
+
+        levels: dict[int, list[T]] = {}
+        for item_key, item in by_key.items():
+            levels.setdefault(depths[item_key], []).append(item)
+
+        report = self.report(resource)
+        for level in sorted(levels, reverse=True):
+            self.run(resource, levels[level], remove, name)
+
+        return report
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""Run a command against many docker hosts from a single process."""
+
+import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import docker.errors
+import requests.exceptions
+
+from dockertidy.autostop import AutoStop
+from dockertidy.config import SingleConfig
+from dockertidy.exception import CircuitOpenError
+from dockertidy.garbage_collector import GarbageCollector
+from dockertidy.logger import SingleLog, current_host, set_current_host
+
+
+class HostSummary:
+    """Outcome of a command on one docker host."""
+
+    def __init__(self, host: str) -> None:
+        self.host = host
+        self.seconds = 0.0
+        self.error: str | None = None
+        self.removed: dict[str, int] = {}
+        self.failed: dict[str, int] = {}
+
+    def format(self) -> str:
+        if self.error is not None:
+            return f"{self.host}: failed after {self.seconds:.1f}s: {self.error}"
+
+        counts = [
+            f"{resource} {self.removed.get(resource, 0)} ok/{self.failed.get(resource, 0)} failed"
+            for resource in sorted(self.removed.keys() | self.failed.keys())
+        ]
+        return f"{self.host}: {', '.join(counts) or 'nothing to do'} in {self.seconds:.1f}s"
+
+
+class HostLogFilter(logging.Filter):
+    """Prefix log messages with the host the current thread works on."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        host = current_host()
+        if host is not None:
+            record.msg = f"[{host}] {record.msg}"
+        return True
+
+
+class FanOut:
+    """
+    Run the gc or stop command against every configured host.
+
+    Each host gets its own command object and docker client. Up to `host_workers`
+    hosts are tidied concurrently, and a failing host doesn't affect the others.
+    A summary line per host is logged at the end, and the exit code is non-zero
+    if any host failed.
+    """
+
+    def __init__(self, command: str, hosts: list[str]) -> None:
+        self.config = SingleConfig()
+        self.log = SingleLog()
+        self.logger = SingleLog().logger
+        self.command = command
+        self.hosts = list(dict.fromkeys(hosts))
+        self.log_filter = HostLogFilter()
+
+    def run_host(self, host: str) -> HostSummary:
+        """Run the command against a single host and summarize the outcome."""
+        summary = HostSummary(host)
+        started = time.monotonic()
+        set_current_host(host)
+        command: GarbageCollector | AutoStop | None = None
+        try:
+            command = GarbageCollector(host) if self.command == "gc" else AutoStop(host)
+            command.run()
+            if isinstance(command, GarbageCollector):
+                for resource, report in command.remover.reports.items():
+                    summary.removed[resource] = len(report.removed)
+                    summary.failed[resource] = len(report.failed)
+            else:
+                summary.removed["stopped containers"] = len(command.stopped)
+                summary.failed["stopped containers"] = len(command.failed)
+        except (
+            docker.errors.DockerException,
+            requests.exceptions.RequestException,
+            CircuitOpenError,
+        ) as e:
+            summary.error = str(e)
+        except Exception as e:
+            # A bug or an unexpected response of one host must not cost the others
+            self.logger.exception(f"Unexpected error: {e!r}")
+            summary.error = repr(e)
+        except SystemExit:
+            # Fatal errors of a command were logged before exiting
+            summary.error = "aborted"
+        finally:
+            if command is not None:
+                command.close()
+            set_current_host(None)
+            summary.seconds = time.monotonic() - started
+
+        return summary
+
+    def run(self) -> list[HostSummary]:
+        """FanOut main method."""
+        workers = max(1, min(self.config.config["host_workers"], len(self.hosts)))
+        self.logger.info(f"Start {self.command} on {len(self.hosts)} hosts, {workers} at a time")
+
+        self.logger.addFilter(self.log_filter)
+        try:
+            with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="tidy-host") as pool:
+                summaries = list(pool.map(self.run_host, self.hosts))
+        finally:
+            self.logger.removeFilter(self.log_filter)
+
+        failed = [summary for summary in summaries if summary.error is not None]
+        for summary in summaries:
+            if summary.error is None:
+                self.logger.info(summary.format())
+            else:
+                self.logger.error(summary.format())
+
+        if failed:
+            self.log.sysexit_with_message(f"{len(failed)} of {len(summaries)} hosts failed")
+        self.logger.info(f"Finished {self.command} on {len(summaries)} hosts")
+        return summaries
@@ -1,22 +1,41 @@
 #!/usr/bin/env python3
 """Remove unused docker containers and images."""
 
+import contextlib
 import datetime
-import fnmatch
+import os
+import re
 import shutil
-from collections import namedtuple
-from collections.abc import Callable
+import sqlite3
+import time
+from collections import deque, namedtuple
+from collections.abc import Callable, Iterable, Iterator
+from collections.abc import Set as AbstractSet
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Any
 
-import dateparser
-import dateutil.parser
 import docker
+import docker.constants
 import docker.errors
 import docker.utils
 import requests.exceptions
-
-from dockertidy.config import SingleConfig
-from dockertidy.logger import SingleLog
+from docker import APIClient
+
+from dockertidy import metrics, profiler
+from dockertidy.aio import AsyncioClient, deferred
+from dockertidy.cache import InspectCache
+from dockertidy.candidates import ImageCandidate, fill_in_order
+from dockertidy.config import BACKENDS, GC_STRATEGIES, SingleConfig, default_cache_file
+from dockertidy.executor import RemovalExecutor, parent_depths
+from dockertidy.inventory import Inventory
+from dockertidy.layers import LayerGraph
+from dockertidy.limiter import AdaptiveLimiter
+from dockertidy.logger import SingleLog, current_host, set_current_host
+from dockertidy.matcher import ImageExcludeIndex, LabelMatcher, has_glob
+from dockertidy.parser import YEAR_ZERO, parse_created, parse_past_time, parse_timestamp
+from dockertidy.replay import Recorder, ReplayClient
+from dockertidy.resilience import get_retry_policy, removal
+from dockertidy.summary import RunSummary
 
 SIZE_UNITS: dict[str, int] = {
     "B": 1,
@@ -68,27 +87,61 @@ class GarbageCollector:
     """Garbage collector object to handle cleanup tasks of container, images and volumes."""
 
     # This seems to be something docker uses for a null/zero date
-    YEAR_ZERO = "0001-01-01T00:00:00Z"
+    YEAR_ZERO = YEAR_ZERO
     ExcludeLabel = namedtuple("ExcludeLabel", ["key", "value"])
+    REMOVABLE_CONTAINER_STATES = ("created", "exited", "dead")
+    STRATEGIES = GC_STRATEGIES
+    SPACE_CHECKPOINT_INTERVAL = 10
+    PRUNE_API_VERSION = "1.25"
+    PRUNE_ALL_VOLUMES_API_VERSION = "1.42"
 
-    def __init__(self) -> None:
+    def __init__(self, host: str | None = None) -> None:
         self.config = SingleConfig()
+        self.host = host
         self.log = SingleLog()
         self.logger = SingleLog().logger
-        self.docker = self._get_docker_client()
+        self._docker: APIClient | AsyncioClient | None = None
+        self.limiter = self._get_limiter()
+        self.remover = RemovalExecutor(self.config.config["gc"]["remove_workers"], self.limiter)
+        self.retry = get_retry_policy(self.config.config)
+        self.summary = RunSummary("gc", host)
+        self.label_matcher: LabelMatcher | None = None
+        self.inventory: Inventory | None = None
+        self.live_inventory: Inventory | None = None
+        self.inspect_cache: InspectCache | None = None
+        self.space_reclaimed = 0
+        self.cutoffs: dict[str, datetime.datetime | None] = {}
+
+    @property
+    def docker(self) -> APIClient | AsyncioClient:
+        """Docker client, created on first use."""
+        if self._docker is None:
+            self._docker = self._get_docker_client()
+        return self._docker
+
+    @docker.setter
+    def docker(self, client: APIClient | AsyncioClient) -> None:
+        self._docker = client
+
+    def close(self) -> None:
+        """Close the docker client if it was created."""
+        if self._docker is not None:
+            self._docker.close()
+            self._docker = None
 
     def cleanup_containers(self) -> None:
         """Identify old containers and remove them."""
         config = self.config.config
         client = self.docker
-        all_containers = self._get_all_containers()
+        removable_containers = self._get_removable_containers()
+        metrics.SCANNED.inc(
+            len(removable_containers), command="gc", resource="containers", host=self.host
+        )
 
-        filtered_containers = self._filter_excluded_containers(all_containers)
+        # Oldest first, the list endpoint returns the newest containers first
+        filtered_containers = self._filter_excluded_containers(reversed(removable_containers))
 
-        max_container_age = dateparser.parse(
-            config["gc"]["max_container_age"],
-            settings={"TO_TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": True},
-        )
+        max_container_age = self._get_cutoff("max_container_age")
 
         if not max_container_age:
             return
@@ -97,64 +150,76 @@ class GarbageCollector:
             f"Removing containers older than '{max_container_age.strftime('%Y-%m-%d, %H:%M:%S')}'"
         )
 
-        for container_summary in reversed(list(filtered_containers)):
-            container = self._api_call(
-                client.inspect_container,
-                container=container_summary["Id"],
+        def is_decided(summary: dict[str, Any]) -> bool:
+            return self._should_remove_container_summary(summary, max_container_age) is not None
+
+        def removable_ids() -> Iterator[str]:
+            candidates = (
+                summary
+                for summary in filtered_containers
+                if self._should_remove_container_summary(summary, max_container_age) is not False
             )
-            if not container or not self._should_remove_container(
-                container,
-                max_container_age,
+            for summary, container in self._with_details(
+                lambda ids: self._map_api_call(client.inspect_container, "container", ids),
+                candidates,
+                is_decided,
             ):
-                continue
+                if container is summary:
+                    name = (summary.get("Names") or [""])[0]
+                    finished = (
+                        self.inventory.finished_at(summary["Id"]) if self.inventory else None
+                    )
+                    finished_at = finished.isoformat() if finished else self.YEAR_ZERO
+                elif container and self._should_remove_container(container, max_container_age):
+                    name = container.get("Name", "")
+                    finished_at = container["State"]["FinishedAt"]
+                else:
+                    continue
 
-            self.logger.info(
-                "Removing container {} {} {}".format(
-                    container["Id"][:16],
-                    container.get("Name", "").lstrip("/"),
-                    container["State"]["FinishedAt"],
+                self.summary.record(candidates=1)
+                self.logger.info(
+                    "Removing container {} {} {}".format(
+                        container["Id"][:16],
+                        name.lstrip("/"),
+                        finished_at,
+                    )
                 )
+
+                if not config["dry_run"]:
+                    yield container["Id"]
+
+        def remove(container_id: str) -> bool:
+            success, _ = self._api_call_result(
+                removal(client.remove_container), container=container_id, v=True
             )
+            if success and self.inventory is not None:
+                self.inventory.discard_containers([container_id])
+            return success
 
-            if not config["dry_run"]:
-                self._api_call(
-                    client.remove_container,
-                    container=container["Id"],
-                    v=True,
-                )
+        self.remover.run("containers", removable_ids(), remove, lambda cid: cid[:16])
 
     def _filter_excluded_containers(
-        self, containers: list[dict[str, Any]]
-    ) -> list[dict[str, Any]]:
-        config = self.config.config
+        self, containers: Iterable[dict[str, Any]]
+    ) -> Iterator[dict[str, Any]]:
+        matcher = self._get_label_matcher()
 
-        if not config["gc"]["exclude_container_labels"]:
-            return containers
+        if not matcher:
+            return iter(containers)
 
         def include_container(container: dict[str, Any]) -> bool:
-            return not self._should_exclude_container_with_labels(container)
+            return not matcher.matches(container["Labels"])
 
-        return list(filter(include_container, containers))
+        return filter(include_container, containers)
 
     def _should_exclude_container_with_labels(self, container: dict[str, Any]) -> bool:
-        config = self.config.config
+        return self._get_label_matcher().matches(container["Labels"])
 
-        if container["Labels"]:
-            for exclude_label in config["gc"]["exclude_container_labels"]:
-                if exclude_label.value:
-                    matching_keys = fnmatch.filter(
-                        container["Labels"].keys(),
-                        exclude_label.key,
-                    )
-                    label_values_to_check = [
-                        container["Labels"][matching_key] for matching_key in matching_keys
-                    ]
-                    if fnmatch.filter(label_values_to_check, exclude_label.value):
-                        return True
-                else:
-                    if fnmatch.filter(container["Labels"].keys(), exclude_label.key):
-                        return True
-        return False
+    def _get_label_matcher(self) -> LabelMatcher:
+        exclude_labels = tuple(self.config.config["gc"]["exclude_container_labels"])
+
+        if self.label_matcher is None or self.label_matcher.rules != exclude_labels:
+            self.label_matcher = LabelMatcher(exclude_labels)
+        return self.label_matcher
 
     def _should_remove_container(
         self, container: dict[str, Any], min_date: datetime.datetime
@@ -167,57 +232,128 @@ class GarbageCollector:
         if state.get("Ghost"):
             return True
 
+        finished_date = parse_timestamp(state["FinishedAt"])
+
         # Container was created, but never started
-        if state.get("FinishedAt") == self.YEAR_ZERO:
-            created_date = dateutil.parser.parse(container["Created"])
-            return created_date < min_date
+        if finished_date is None:
+            return parse_created(container["Created"]) < min_date
 
-        finished_date = dateutil.parser.parse(state["FinishedAt"])
         return finished_date < min_date
 
+    def _should_remove_container_summary(
+        self, summary: dict[str, Any], min_date: datetime.datetime
+    ) -> bool | None:
+        """
+        Decide on a container from its list summary alone.
+
+        Returns None if the decision depends on `FinishedAt` and requires an inspect.
+        """
+        created = summary.get("Created")
+        if not isinstance(created, int):
+            return None
+
+        # A container can't have finished before it was created
+        if parse_created(created) >= min_date:
+            return False
+
+        # Container was created, but never started
+        if summary.get("State") == "created":
+            return True
+
+        finished = self.inventory.finished_at(summary["Id"]) if self.inventory else None
+        if finished is not None and summary.get("State") != "running":
+            return finished < min_date
+
+        return None
+
     def _get_all_containers(self) -> Any:
         client = self.docker
         self.logger.info("Getting all containers")
-        containers = client.containers(all=True)
+        containers = self._instrumented_call(client.containers, all=True)
         self.logger.info("Found %s containers", len(containers))
         return containers
 
+    def _get_cutoff(self, key: str) -> datetime.datetime | None:
+        """Return the absolute time for the `gc` age setting, computed once per run."""
+        if key not in self.cutoffs:
+            self.cutoffs[key] = parse_past_time(self.config.config["gc"][key])
+        return self.cutoffs[key]
+
+    def _get_removable_containers(self) -> Any:
+        client = self.docker
+
+        if self.inventory is not None:
+            return [
+                container
+                for container in self.inventory.containers
+                if container.get("State") in self.REMOVABLE_CONTAINER_STATES
+            ]
+
+        self.logger.info("Getting removable containers")
+        containers = self._instrumented_call(
+            client.containers, all=True, filters={"status": list(self.REMOVABLE_CONTAINER_STATES)}
+        )
+        self.logger.info("Found %s removable containers", len(containers))
+        return containers
+
     def _get_all_images(self) -> Any:
         client = self.docker
         self.logger.info("Getting all images")
-        images = client.images()
+        images = self._instrumented_call(client.images)
         self.logger.info("Found %s images", len(images))
         return images
 
     def _get_dangling_volumes(self) -> list[dict[str, Any]]:
         client = self.docker
         self.logger.info("Getting dangling volumes")
-        volumes = client.volumes({"dangling": True})["Volumes"] or []
+        volumes = (
+            self._instrumented_call(client.volumes, filters={"dangling": True})["Volumes"] or []
+        )
         self.logger.info("Found %s dangling volumes", len(volumes))
         return volumes
 
-    def _get_removable_images(self, exclude_set: set[str]) -> list[dict[str, Any]]:
+    def _get_removable_images(
+        self, exclude_set: AbstractSet[str], oldest_first: bool = False
+    ) -> Iterator[dict[str, Any]]:
+        """Stream the summaries of images that are neither in use nor excluded."""
         client = self.docker
-        containers = self._get_all_containers()
-        images = self._get_all_images()
+        if self.inventory is not None:
+            containers = self.inventory.containers
+            all_images = self.inventory.images
+        else:
+            containers = self._get_all_containers()
+            all_images = self._get_all_images()
+        # The list endpoint returns the newest images first
+        images: Iterable[dict[str, Any]] = reversed(all_images) if oldest_first else all_images
         if docker.utils.compare_version("1.21", client.api_version) < 0:
             image_tags_in_use = {container.get("Image", "") for container in containers}
             images = self._filter_images_in_use(images, image_tags_in_use)
         else:
             image_ids_in_use = {container.get("ImageID", "") for container in containers}
             images = self._filter_images_in_use_by_id(images, image_ids_in_use)
-        return self._filter_excluded_images(images, exclude_set)
 
-    def cleanup_images(self, exclude_set: set[str]) -> None:
+        scanned = 0
+        try:
+            for image_summary in self._filter_excluded_images(images, exclude_set):
+                scanned += 1
+                yield image_summary
+        finally:
+            metrics.SCANNED.inc(scanned, command="gc", resource="images", host=self.host)
+
+    def _image_candidates(self, images: Iterable[dict[str, Any]]) -> Iterator[ImageCandidate]:
+        """Inspect images whose summary is incomplete and reduce them to candidates."""
+        for image_summary, image in self._with_details(
+            self._inspect_images, images, self._has_created_date
+        ):
+            yield ImageCandidate(image_summary, image)
+
+    def cleanup_images(self, exclude_set: AbstractSet[str]) -> None:
         """Identify old images and remove them."""
         config = self.config.config
 
-        images = self._get_removable_images(exclude_set)
+        images = self._get_removable_images(exclude_set, oldest_first=True)
 
-        max_image_age = dateparser.parse(
-            config["gc"]["max_image_age"],
-            settings={"TO_TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": True},
-        )
+        max_image_age = self._get_cutoff("max_image_age")
 
         if not max_image_age:
             return
@@ -225,26 +361,39 @@ class GarbageCollector:
         self.logger.info(
             f"Removing images older than '{max_image_age.strftime('%Y-%m-%d, %H:%M:%S')}'"
         )
-        for image_summary in reversed(list(images)):
-            self._remove_image(image_summary, max_image_age)
+        selected = [
+            candidate
+            for candidate in self._image_candidates(images)
+            if self._select_image(candidate, max_image_age)
+        ]
+        if config["dry_run"]:
+            self._log_reclaimable(selected)
+        else:
+            self._remove_images(selected)
 
     def _filter_excluded_images(
-        self, images: list[dict[str, Any]], exclude_set: set[str]
-    ) -> list[dict[str, Any]]:
+        self, images: Iterable[dict[str, Any]], exclude_set: AbstractSet[str]
+    ) -> Iterator[dict[str, Any]]:
+        index: ImageExcludeIndex | None = None
+
         def include_image(image_summary: dict[str, Any]) -> bool:
+            nonlocal index
             image_tags = image_summary.get("RepoTags", [])
             if self._no_image_tags(image_tags):
                 return True
-            for exclude_pattern in exclude_set:
-                if fnmatch.filter(image_tags, exclude_pattern):
-                    return False
-            return True
+            if index is None:
+                index = (
+                    exclude_set
+                    if isinstance(exclude_set, ImageExcludeIndex)
+                    else ImageExcludeIndex(exclude_set)
+                )
+            return not index.matches(image_tags)
 
-        return list(filter(include_image, images))
+        return filter(include_image, images)
 
     def _filter_images_in_use(
-        self, images: list[dict[str, Any]], image_tags_in_use: set[str]
-    ) -> list[dict[str, Any]]:
+        self, images: Iterable[dict[str, Any]], image_tags_in_use: set[str]
+    ) -> Iterator[dict[str, Any]]:
         def get_tag_set(image_summary: dict[str, Any]) -> set[str]:
             image_tags = image_summary.get("RepoTags", [])
             if self._no_image_tags(image_tags):
@@ -255,69 +404,113 @@ class GarbageCollector:
         def image_not_in_use(image_summary: dict[str, Any]) -> bool:
             return not get_tag_set(image_summary) & image_tags_in_use
 
-        return list(filter(image_not_in_use, images))
+        return filter(image_not_in_use, images)
 
     def _filter_images_in_use_by_id(
-        self, images: list[dict[str, Any]], image_ids_in_use: set[str]
-    ) -> list[dict[str, Any]]:
+        self, images: Iterable[dict[str, Any]], image_ids_in_use: set[str]
+    ) -> Iterator[dict[str, Any]]:
         def image_not_in_use(image_summary: dict[str, Any]) -> bool:
             return image_summary["Id"] not in image_ids_in_use
 
-        return list(filter(image_not_in_use, images))
+        return filter(image_not_in_use, images)
+
+    def _is_image_old(self, candidate: ImageCandidate, min_date: datetime.datetime) -> bool:
+        return candidate.created is not None and candidate.created < min_date
 
-    def _is_image_old(self, image: dict[str, Any], min_date: datetime.datetime) -> bool:
-        return dateutil.parser.parse(image["Created"]) < min_date
+    def _has_created_date(self, summary: dict[str, Any]) -> bool:
+        return isinstance(summary.get("Created"), int)
 
     def _no_image_tags(self, image_tags: list[str] | None) -> bool:
         return not image_tags or image_tags == ["<none>:<none>"]
 
-    def _remove_image_tags(self, image_summary: dict[str, Any]) -> None:
+    def _remove_image_tags(self, candidate: ImageCandidate) -> bool:
         client = self.docker
-        image_tags = image_summary.get("RepoTags", [])
-        if self._no_image_tags(image_tags):
-            self._api_call(client.remove_image, image=image_summary["Id"])
+        if self._no_image_tags(candidate.tags):
+            success, _ = self._api_call_result(removal(client.remove_image), image=candidate.id)
         else:
-            for image_tag in image_tags:
-                self._api_call(client.remove_image, image=image_tag)
+            success = True
+            for image_tag in candidate.tags:
+                success &= self._api_call_result(removal(client.remove_image), image=image_tag)[0]
+
+        if success:
+            metrics.REMOVED_IMAGE_BYTES.inc(candidate.size, host=self.host)
+            if self.inventory is not None:
+                self.inventory.discard_images([candidate.id])
+        return success
+
+    def _remove_images(self, candidates: Iterable[ImageCandidate]) -> None:
+        self.remover.run_ordered(
+            "images",
+            candidates,
+            self._remove_image_tags,
+            name=lambda candidate: candidate.id[:16],
+            key=lambda candidate: candidate.id,
+            parent=lambda candidate: candidate.parent,
+        )
 
     def _remove_image(self, image_summary: dict[str, Any], min_date: Any) -> None:
-        config = self.config.config
-        client = self.docker
-        image = self._api_call(client.inspect_image, image=image_summary["Id"])
+        if self._has_created_date(image_summary):
+            image = image_summary
+        else:
+            image = self._inspect_image(image_summary["Id"])
+        self._remove_inspected_image(ImageCandidate(image_summary, image), min_date)
 
-        if not image or not self._is_image_old(image, min_date):
-            return
+    def _remove_inspected_image(self, candidate: ImageCandidate, min_date: Any) -> None:
+        config = self.config.config
 
-        self.logger.info(f"Removing image {self._format_image(image, image_summary)}")
-        if config["dry_run"]:
+        if not self._select_image(candidate, min_date) or config["dry_run"]:
             return
 
-        self._remove_image_tags(image_summary)
+        self._remove_images([candidate])
 
-    def _remove_volume(self, volume: dict[str, Any]) -> None:
-        config = self.config.config
-        client = self.docker
-        if not volume:
-            return
+    def _select_image(self, candidate: ImageCandidate, min_date: Any) -> bool:
+        if not self._is_image_old(candidate, min_date):
+            return False
 
-        self.logger.info("Removing volume {name}".format(name=volume["Name"]))
-        if config["dry_run"]:
-            return
+        self.summary.record(candidates=1)
+        self.logger.info(f"Removing image {candidate}")
+        return True
 
-        self._api_call(client.remove_volume, name=volume["Name"])
+    def _remove_volume(self, volume: dict[str, Any]) -> bool:
+        client = self.docker
+        success, _ = self._api_call_result(removal(client.remove_volume), name=volume["Name"])
+        if success and self.inventory is not None:
+            self.inventory.discard_volumes([volume["Name"]])
+        return success
 
     def cleanup_volumes(self) -> None:
         """Identify old volumes and remove them."""
-        dangling_volumes = self._get_dangling_volumes()
+        config = self.config.config
+        if self.inventory is not None:
+            dangling_volumes = self.inventory.volumes
+        else:
+            dangling_volumes = self._get_dangling_volumes()
+        metrics.SCANNED.inc(
+            len(dangling_volumes), command="gc", resource="volumes", host=self.host
+        )
+
+        def removable_volumes() -> Iterator[dict[str, Any]]:
+            for volume in reversed(dangling_volumes):
+                if not volume:
+                    continue
+
+                self.summary.record(candidates=1)
+                self.logger.info("Removing dangling volume %s", volume["Name"])
+                if not config["dry_run"]:
+                    yield volume
 
         self.logger.info("Removing dangling volumes")
-        for volume in reversed(dangling_volumes):
-            self.logger.info("Removing dangling volume %s", volume["Name"])
-            self._remove_volume(volume)
+        self.remover.run(
+            "volumes", removable_volumes(), self._remove_volume, lambda volume: volume["Name"]
+        )
+
+    def _api_call(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        return self._api_call_result(func, **kwargs)[1]
 
-    def _api_call(self, func: Callable[..., str | None], **kwargs: Any) -> Any:
+    def _api_call_result(self, func: Callable[..., Any], **kwargs: Any) -> tuple[bool, Any]:
+        """Call the docker API and return whether the call succeeded along with its result."""
         try:
-            return func(**kwargs)
+            return (True, self._instrumented_call(func, **kwargs))
         except requests.exceptions.Timeout as e:
             params = ",".join("%s=%s" % item for item in kwargs.items())  # noqa:UP031
             self.logger.warning(f"Failed to call {func.__name__} {params} {e!s}")
@@ -325,28 +518,136 @@ class GarbageCollector:
             params = ",".join("%s=%s" % item for item in kwargs.items())  # noqa:UP031
             self.logger.warning(f"Error calling {func.__name__} {params} {e!s}")
 
-    def _format_image(self, image: dict[str, Any], image_summary: dict[str, Any]) -> str:
-        def get_tags() -> str:
-            tags = image_summary.get("RepoTags")
-            if not tags or tags == ["<none>:<none>"]:
-                return ""
-            return ", ".join(tags)
+        return (False, None)
 
-        return "{id} {tags}".format(id=image["Id"][:16], tags=get_tags())
+    def _instrumented_call(self, func: Callable[..., Any], **kwargs: Any) -> Any:
+        """
+        Call the docker API, counting, timing and retrying the call, and raise on failure.
 
-    def _build_exclude_set(self) -> set[str]:
-        config = self.config.config
+        Listings use it directly, acting on an incomplete listing could e.g. remove
+        images of containers that weren't listed, so a failure aborts the run.
+        """
+        self.summary.count_call()
+        started = time.monotonic()
+        try:
+            return self.retry.call(func, **kwargs)
+        except (requests.exceptions.RequestException, docker.errors.DockerException):
+            metrics.API_CALL_ERRORS.inc(endpoint=metrics.endpoint(func), host=self.host)
+            raise
+        finally:
+            elapsed = time.monotonic() - started
+            metrics.API_CALL_DURATION.observe(
+                elapsed, endpoint=metrics.endpoint(func), host=self.host
+            )
+            if self.limiter is not None:
+                self.limiter.observe(elapsed)
+
+    def _inspect_image(self, image: str) -> Any:
+        """Inspect an image, answering from the inspect cache if possible."""
+        return next(self._inspect_images([image]))
+
+    def _inspect_images(self, images: Iterable[str]) -> Iterator[Any]:
+        """Inspect images in input order, only calling the API for images not in the cache."""
+
+        def inspect(uncached: Iterator[str]) -> Iterator[Any]:
+            for details in self._map_api_call(self.docker.inspect_image, "image", uncached):
+                cache = self.inspect_cache
+                yield cache.put(details) if details and cache is not None else details
+
+        for _, details in fill_in_order(images, self._get_cached_image, inspect):
+            yield details
+
+    def _get_cached_image(self, image: str) -> Any:
+        cache = self.inspect_cache
+        if cache is None:
+            return None
+
+        try:
+            return cache.get(image)
+        except (sqlite3.Error, OSError, ValueError) as e:
+            self.logger.warning(f"Disabling inspect cache at '{cache.path}': {e!s}")
+            self.inspect_cache = None
+            return None
+
+    def _get_cache_path(self) -> str:
+        path = self.config.config["cache"]["path"] or default_cache_file
+        if self.host is None:
+            return path
+
+        # Each host removes the entries of images it doesn't have, so hosts can't share a cache
+        root, ext = os.path.splitext(path)
+        return f"{root}-{re.sub(r'[^A-Za-z0-9.-]+', '_', self.host).strip('_')}{ext}"
+
+    def _save_inspect_cache(self) -> None:
+        cache = self.inspect_cache
+        if cache is None or not cache.loaded:
+            return
+
+        present = [image["Id"] for image in self.inventory.images] if self.inventory else None
+        try:
+            cache.save(present)
+        except (sqlite3.Error, OSError) as e:
+            self.logger.warning(f"Failed to save inspect cache at '{cache.path}': {e!s}")
+
+    def _map_api_call(
+        self, func: Callable[..., Any], key: str, values: Iterable[Any]
+    ) -> Iterator[Any]:
+        """Call `func` once per value with up to `gc.workers` calls in flight, in input order."""
+        workers = self.config.config["gc"]["workers"]
+        client = getattr(func, "__self__", None)
+
+        if isinstance(client, AsyncioClient):
+            # The event loop keeps up to `max_in_flight` calls in flight without threads
+            for value, future in client.map(func.__name__, key, values):
+                yield self._api_call(deferred(func, future), **{key: value})
+            return
+
+        if workers <= 1:
+            for value in values:
+                yield self._api_call(func, **{key: value})
+            return
+
+        with ThreadPoolExecutor(
+            max_workers=workers,
+            thread_name_prefix="tidy",
+            initializer=set_current_host,
+            initargs=(current_host(),),
+        ) as pool:
+            pending: deque[Future[Any]] = deque()
+            for value in values:
+                pending.append(pool.submit(self._api_call, func, **{key: value}))
+                if len(pending) >= workers * 2:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+    def _with_details(
+        self,
+        inspect: Callable[[Iterable[str]], Iterator[Any]],
+        summaries: Iterable[dict[str, Any]],
+        is_complete: Callable[[dict[str, Any]], bool],
+    ) -> Iterator[tuple[dict[str, Any], Any]]:
+        """Pair summaries with inspect results, only inspecting those `is_complete` rejects."""
+        return fill_in_order(
+            summaries,
+            lambda summary: summary if is_complete(summary) else None,
+            lambda incomplete: inspect(summary["Id"] for summary in incomplete),
+        )
 
-        def is_image_tag(line: str) -> bool:
-            return bool(line) and not line.startswith("#")
+    def _build_exclude_set(self) -> AbstractSet[str]:
+        config = self.config.config
 
-        return set(config["gc"]["exclude_images"])
+        return ImageExcludeIndex(config["gc"]["exclude_images"])
 
     def _format_exclude_labels(self) -> None:
         config = self.config.config
         exclude_labels = []
 
         for exclude_label_arg in config["gc"]["exclude_container_labels"]:
+            if isinstance(exclude_label_arg, self.ExcludeLabel):
+                exclude_labels.append(exclude_label_arg)
+                continue
+
             split_exclude_label = exclude_label_arg.split("=", 1)
             exclude_label_key = split_exclude_label[0]
             exclude_label_value = split_exclude_label[1] if len(split_exclude_label) == 2 else None
@@ -357,24 +658,64 @@ class GarbageCollector:
                 )
             )
         config["gc"]["exclude_container_labels"] = exclude_labels
+        self.label_matcher = LabelMatcher(exclude_labels)
 
-    def _get_docker_client(self) -> docker.APIClient:
+    def _get_docker_client(self) -> APIClient | AsyncioClient:
         config = self.config.config
+        if config["backend"] not in BACKENDS:
+            self.log.sysexit_with_message(
+                f"Invalid backend '{config['backend']}', expected one of: {', '.join(BACKENDS)}"
+            )
+        if (config["record"]["path"] or config["replay"]["path"]) and config["backend"] != "sync":
+            self.log.sysexit_with_message("Record and replay require the sync backend")
+
         try:
-            return docker.APIClient(version="auto", timeout=config["http_timeout"])
-        except docker.errors.DockerException as e:
+            if config["replay"]["path"]:
+                return ReplayClient(
+                    config["replay"]["path"], config["replay"]["speed"], config["http_timeout"]
+                )
+            if config["backend"] == "asyncio":
+                return AsyncioClient(
+                    self.host,
+                    timeout=config["http_timeout"],
+                    max_in_flight=config["max_in_flight"],
+                )
+            client = APIClient(
+                base_url=self.host,
+                version="auto",
+                timeout=config["http_timeout"],
+                max_pool_size=max(
+                    config["gc"]["workers"],
+                    *config["gc"]["remove_workers"].values(),
+                    docker.constants.DEFAULT_MAX_POOL_SIZE,
+                ),
+            )
+            if config["record"]["path"]:
+                Recorder(config["record"]["path"], config["record"]["redact"]).attach(client)
+            return client
+        except (docker.errors.DockerException, OSError) as e:
             self.log.sysexit_with_message(f"Can't create docker client\n{e}")
 
+    def _get_limiter(self) -> AdaptiveLimiter | None:
+        config = self.config.config["gc"]
+        if config["latency_target"] <= 0:
+            return None
+
+        return AdaptiveLimiter(
+            config["latency_target"],
+            max(config["remove_workers"].values()),
+            window=config["latency_window"],
+        )
+
     def _get_disk_usage(self, path: str) -> Any:
         try:
             return shutil.disk_usage(path)
         except OSError as e:
             self.log.sysexit_with_message(f"Cannot check disk space at '{path}': {e}")
 
-    def cleanup_images_by_space(self, exclude_set: set[str]) -> None:
-        """Remove oldest images until the target free disk space is reached."""
+    def cleanup_images_by_space(self, exclude_set: AbstractSet[str]) -> None:
+        """Remove images until the target free disk space is reached."""
         config = self.config.config
-        client = self.docker
 
         try:
             target_value, is_percent = parse_disk_size(config["gc"]["min_free_disk_space"])
@@ -396,23 +737,72 @@ class GarbageCollector:
         self.logger.info(
             f"Target: {target_bytes / 1024**3:.1f}GB free, "
             f"current: {usage.free / 1024**3:.1f}GB free, "
-            f"removing oldest images until target is reached"
+            f"removing images freeing the most space first until target is reached"
         )
 
         images = self._get_removable_images(exclude_set)
+        # Images that couldn't be inspected are sorted last and never removed
+        latest = datetime.datetime.max.replace(tzinfo=datetime.UTC)
+        candidates = sorted(
+            self._image_candidates(images), key=lambda candidate: candidate.created or latest
+        )
 
-        decorated: list[tuple[dict[str, Any], dict[str, Any] | None, datetime.datetime]] = []
-        for image_summary in images:
-            image = self._api_call(client.inspect_image, image=image_summary["Id"])
-            if image:
-                created = dateutil.parser.parse(image["Created"])
-            else:
-                created = datetime.datetime.max.replace(tzinfo=datetime.timezone.utc)
-            decorated.append((image_summary, image, created))
+        disk_usage = self._get_image_disk_usage()
+        if disk_usage is None:
+            self.logger.info("No image disk usage available, removing oldest images first")
+            self._evict_oldest_first(candidates, disk_path, target_bytes)
+            return
 
-        decorated.sort(key=lambda x: x[2])
+        graph = self._build_layer_graph(disk_usage, candidates)
+        order, planned = self._plan_space_eviction(candidates, graph, target_bytes - usage.free)
+        estimate = sum(reclaimable for _, reclaimable in order[:planned])
+        self.logger.info(
+            f"Removing {planned} images is estimated to free {estimate / 1024**3:.1f}GB"
+        )
+
+        # Free space is only re-checked between batches of removals. Children are moved
+        # ahead of their parents, a parent removed in an earlier batch than its child
+        # would fail while the child still exists
+        interval = self.SPACE_CHECKPOINT_INTERVAL
+        planned_order = self._children_first(order[:planned])
+        # In a dry run free space never changes, so only the planned removals are reported
+        remaining_order = [] if config["dry_run"] else self._children_first(order[planned:])
+        batches = [planned_order[i : i + interval] for i in range(0, planned, interval)]
+        batches += [
+            remaining_order[i : i + interval] for i in range(0, len(remaining_order), interval)
+        ]
+        for index, batch in enumerate(batches):
+            if index:
+                current_usage = self._get_disk_usage(disk_path)
+                if current_usage.free >= target_bytes:
+                    self.logger.info(
+                        f"Reached target free space: {current_usage.free / 1024**3:.1f}GB free"
+                    )
+                    break
 
-        for image_summary, image, _ in decorated:
+            self.summary.record(candidates=len(batch))
+            for candidate, reclaimable in batch:
+                self.logger.info(
+                    f"Removing image {candidate} ({reclaimable / 1024**2:.1f}MB reclaimable)"
+                )
+
+            if not config["dry_run"]:
+                self._remove_images(candidate for candidate, _ in batch)
+
+    @staticmethod
+    def _children_first(
+        order: list[tuple[ImageCandidate, int]],
+    ) -> list[tuple[ImageCandidate, int]]:
+        """Move child images ahead of their parents, keeping the order otherwise."""
+        depths = parent_depths({candidate.id: candidate.parent for candidate, _ in order})
+        return sorted(order, key=lambda item: -depths[item[0].id])
+
+    def _evict_oldest_first(
+        self, candidates: list[ImageCandidate], disk_path: str, target_bytes: int
+    ) -> None:
+        config = self.config.config
+
+        for candidate in candidates:
             current_usage = self._get_disk_usage(disk_path)
             if current_usage.free >= target_bytes:
                 self.logger.info(
@@ -420,34 +810,325 @@ class GarbageCollector:
                 )
                 break
 
-            if not image:
+            if candidate.created is None:
                 continue
 
-            self.logger.info(f"Removing image {self._format_image(image, image_summary)}")
+            self.summary.record(candidates=1)
+            self.logger.info(f"Removing image {candidate}")
             if config["dry_run"]:
                 continue
 
-            self._remove_image_tags(image_summary)
+            self.remover.report("images").record(
+                candidate.id[:16], self._remove_image_tags(candidate)
+            )
+
+    def _get_image_disk_usage(self) -> dict[str, dict[str, Any]] | None:
+        """Return the daemon disk usage data by image ID, or None if it is not available."""
+        client = self.docker
+        self.logger.info("Getting image disk usage")
+        usage = self._api_call(client.df)
+        if not isinstance(usage, dict) or not isinstance(usage.get("Images"), list):
+            return None
+
+        return {image["Id"]: image for image in usage["Images"]}
+
+    def _build_layer_graph(
+        self,
+        disk_usage: dict[str, dict[str, Any]],
+        known: Iterable[ImageCandidate] = (),
+    ) -> LayerGraph:
+        """
+        Build the layer graph of all images on the host.
+
+        Images are inspected for their layers unless a `known` candidate already
+        holds them. Sizes are taken from the disk usage data where available.
+        """
+        images = self.inventory.images if self.inventory else self._get_all_images()
+        details = {candidate.id: candidate for candidate in known if candidate.layers is not None}
+
+        graph = LayerGraph()
+        image_ids = (image["Id"] for image in images)
+        for image_id, found in fill_in_order(image_ids, details.get, self._inspect_images):
+            candidate = (
+                found
+                if isinstance(found, ImageCandidate)
+                else ImageCandidate({"Id": image_id}, found)
+            )
+            usage = disk_usage.get(image_id, {})
+            graph.add_image(
+                image_id,
+                candidate.layers or [],
+                usage.get("Size", candidate.size),
+                # A shared size of -1 means the daemon did not compute it
+                shared_size=usage.get("SharedSize"),
+                parent=candidate.base,
+            )
+        return graph
+
+    def _log_reclaimable(self, candidates: list[ImageCandidate]) -> None:
+        disk_usage = self._get_image_disk_usage()
+        if disk_usage is None:
+            return
+
+        graph = self._build_layer_graph(disk_usage)
+        freed = 0
+        for candidate in candidates:
+            reclaimable = graph.reclaimable(candidate.id)
+            graph.select(candidate.id)
+            freed += reclaimable
+            self.logger.debug(f"Image {candidate.id[:16]} frees {reclaimable / 1024**2:.1f}MB")
+        self.logger.info(f"Removing {len(candidates)} images would free {freed / 1024**3:.1f}GB")
+
+    def _plan_space_eviction(
+        self,
+        candidates: list[ImageCandidate],
+        graph: LayerGraph,
+        deficit: int,
+    ) -> tuple[list[tuple[ImageCandidate, int]], int]:
+        """
+        Order removal candidates to reach the target with as few removals as possible.
+
+        Candidates are picked by the bytes their removal frees given the images picked
+        before them, largest first and oldest first among equals. Returns the ordered
+        candidates with their reclaimable bytes and the number of leading candidates
+        estimated to cover the deficit.
+        """
+        by_id = {
+            candidate.id: candidate for candidate in candidates if candidate.created is not None
+        }
+        ranked, planned = graph.plan(
+            {image_id: candidate.created for image_id, candidate in by_id.items()}, deficit
+        )
+        return ([(by_id[image_id], reclaimable) for image_id, reclaimable in ranked], planned)
+
+    def _get_prune_filters(self, resource: str) -> tuple[dict[str, Any] | None, bool]:
+        """
+        Translate the gc policy for a resource type into prune filters.
+
+        Returns the filters, or None if the policy can't be expressed that way,
+        and whether the filters select exactly the objects per-object removal would.
+        """
+        config = self.config.config
+        client = self.docker
+
+        if resource == "containers":
+            exclude_labels = config["gc"]["exclude_container_labels"]
+            if any(
+                has_glob(label.key) or (label.value and has_glob(label.value))
+                for label in exclude_labels
+            ):
+                return (None, False)
+
+            max_container_age = self._get_cutoff("max_container_age")
+            if not max_container_age:
+                return (None, False)
+
+            filters: dict[str, Any] = {"until": str(int(max_container_age.timestamp()))}
+            if exclude_labels:
+                filters["label!"] = [
+                    f"{label.key}={label.value}" if label.value else label.key
+                    for label in exclude_labels
+                ]
+            # The daemon compares `until` with the creation time, not with `FinishedAt`
+            return (filters, False)
+
+        if resource == "images":
+            if config["gc"]["exclude_images"]:
+                return (None, False)
+
+            max_image_age = self._get_cutoff("max_image_age")
+            if not max_image_age:
+                return (None, False)
+
+            return ({"dangling": False, "until": str(int(max_image_age.timestamp()))}, True)
+
+        # Newer daemons only prune anonymous volumes unless `all` is set
+        api_version = client.api_version
+        if docker.utils.compare_version(self.PRUNE_ALL_VOLUMES_API_VERSION, api_version) < 0:
+            return ({}, True)
+        return ({"all": True}, True)
+
+    def _use_prune(self, resource: str) -> bool:
+        config = self.config.config
+        strategy = config["gc"]["strategy"]
+
+        # Prune endpoints can't report what they would remove
+        if strategy == "per-object" or config["dry_run"]:
+            return False
+
+        if docker.utils.compare_version(self.PRUNE_API_VERSION, self.docker.api_version) < 0:
+            self.logger.info(
+                f"Docker API version {self.docker.api_version} has no prune endpoints, "
+                f"using per-object removal for {resource}"
+            )
+            return False
+
+        filters, exact = self._get_prune_filters(resource)
+        if strategy == "prune" and filters is None:
+            self.logger.warning(
+                f"Policy for {resource} can't be expressed as prune filters, "
+                "using per-object removal"
+            )
+            return False
+
+        return filters is not None and (strategy == "prune" or exact)
+
+    def _prune(self, resource: str, func: Callable[..., Any], deleted_key: str) -> list[Any]:
+        filters, _ = self._get_prune_filters(resource)
+        self.logger.info(f"Pruning {resource} with filters {filters}")
+
+        result = self._api_call(func, filters=filters)
+        if not result:
+            return []
+
+        deleted = result.get(deleted_key) or []
+        space_reclaimed = result.get("SpaceReclaimed") or 0
+        self.space_reclaimed += space_reclaimed
+        metrics.REMOVED.inc(len(deleted), command="gc", resource=resource, host=self.host)
+        self.summary.record(candidates=len(deleted), removed=len(deleted))
+        metrics.RECLAIMED_BYTES.inc(space_reclaimed, host=self.host)
+        self.logger.info(
+            f"Pruned {len(deleted)} {resource}, daemon reclaimed {space_reclaimed / 1024**2:.1f}MB"
+        )
+        return deleted
+
+    def prune_containers(self) -> None:
+        """Remove old containers with a single prune call."""
+        deleted = self._prune("containers", self.docker.prune_containers, "ContainersDeleted")
+        if self.inventory is not None:
+            self.inventory.discard_containers(deleted)
+
+    def prune_images(self) -> None:
+        """Remove old images with a single prune call."""
+        deleted = self._prune("images", self.docker.prune_images, "ImagesDeleted")
+        if self.inventory is not None:
+            self.inventory.discard_images(item["Deleted"] for item in deleted if "Deleted" in item)
+
+    def prune_volumes(self) -> None:
+        """Remove dangling volumes with a single prune call."""
+        self._prune("volumes", self.docker.prune_volumes, "VolumesDeleted")
+
+    def create_inventory(self) -> Inventory:
+        """Create an empty inventory of the docker host."""
+        return Inventory(
+            self._get_all_containers, self._get_all_images, self._get_dangling_volumes
+        )
 
     def run(self) -> None:
         """Garbage collector main method."""
+        config = self.config.config
+        disk_path = None if self.host else config["gc"]["disk_path"]
+        self.summary = RunSummary("gc", self.host, disk_path)
+        try:
+            with metrics.track_run("gc", self.host), self.summary.track():
+                self._run()
+        finally:
+            if config["summary"]:
+                self.summary.write(config["summary"])
+
+    @contextlib.contextmanager
+    def _phase(self, name: str) -> Iterator[None]:
+        reports = self.remover.reports.values()
+        removed = sum(len(report.removed) for report in reports)
+        failed = sum(len(report.failed) for report in reports)
+        with (
+            metrics.phase("gc", name, self.host),
+            self.summary.phase(name),
+            profiler.phase(name, self.host),
+        ):
+            try:
+                yield
+            finally:
+                self.summary.record(
+                    removed=sum(len(report.removed) for report in reports) - removed,
+                    failed=sum(len(report.failed) for report in reports) - failed,
+                )
+
+    def _run(self) -> None:
         self.logger.info("Start garbage collection")
         config = self.config.config
+        self.limiter = self._get_limiter()
+        self.remover = RemovalExecutor(config["gc"]["remove_workers"], self.limiter)
+        self.retry = get_retry_policy(config)
+        self.space_reclaimed = 0
+        self.cutoffs = {}
+
+        # Phases after the container cleanup work from a single listing of the host
+        if self.live_inventory is not None:
+            self.inventory = self.live_inventory
+        elif config["gc"]["max_image_age"] or config["gc"]["min_free_disk_space"]:
+            self.inventory = self.create_inventory()
+        else:
+            self.inventory = None
+
+        if config["cache"]["enabled"]:
+            # Entries loaded by a previous run in the same process are kept in memory
+            if self.inspect_cache is None:
+                self.inspect_cache = InspectCache(
+                    self._get_cache_path(), config["cache"]["max_entries"]
+                )
+        else:
+            self.inspect_cache = None
+
+        if config["gc"]["strategy"] not in self.STRATEGIES:
+            self.log.sysexit_with_message(
+                f"Invalid gc strategy '{config['gc']['strategy']}', "
+                f"expected one of: {', '.join(self.STRATEGIES)}"
+            )
+
         self._format_exclude_labels()
 
         exclude_set = self._build_exclude_set()
 
         if config["gc"]["max_container_age"]:
-            self.cleanup_containers()
+            if self._use_prune("containers"):
+                with self._phase("prune_containers"):
+                    self.prune_containers()
+            else:
+                with self._phase("cleanup_containers"):
+                    self.cleanup_containers()
 
         if config["gc"]["max_image_age"]:
-            self.cleanup_images(exclude_set)
+            if self._use_prune("images"):
+                with self._phase("prune_images"):
+                    self.prune_images()
+            else:
+                with self._phase("cleanup_images"):
+                    self.cleanup_images(exclude_set)
 
-        if config["gc"]["min_free_disk_space"]:
-            self.cleanup_images_by_space(exclude_set)
+        if config["gc"]["min_free_disk_space"] and self.host:
+            # Free space is measured on the local filesystem, not on the docker host
+            self.logger.warning(
+                "Skipped image cleanup by free disk space, it only supports the local docker host"
+            )
+        elif config["gc"]["min_free_disk_space"]:
+            with self._phase("cleanup_images_by_space"):
+                self.cleanup_images_by_space(exclude_set)
 
         if config["gc"]["dangling_volumes"]:
-            self.cleanup_volumes()
+            if self._use_prune("volumes"):
+                with self._phase("prune_volumes"):
+                    self.prune_volumes()
+            else:
+                with self._phase("cleanup_volumes"):
+                    self.cleanup_volumes()
+
+        self._save_inspect_cache()
+
+        for resource, report in self.remover.reports.items():
+            metrics.REMOVED.inc(
+                len(report.removed), command="gc", resource=resource, host=self.host
+            )
+            metrics.FAILED.inc(len(report.failed), command="gc", resource=resource, host=self.host)
+            if report.removed or report.failed:
+                self.logger.info(
+                    f"Removed {len(report.removed)} {resource}, {len(report.failed)} failed"
+                )
+
+        if self.space_reclaimed:
+            self.logger.info(
+                f"Prune endpoints reclaimed {self.space_reclaimed / 1024**2:.1f}MB in total"
+            )
 
         if (
             not config["gc"]["max_container_age"]
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Run-scoped snapshot of the docker host."""
+
+import datetime
+import threading
+from collections.abc import Callable, Iterable
+from typing import Any
+
+
+class Inventory:
+    """
+    Container, image and volume listings shared by all phases of a run.
+
+    Each listing is fetched once on first use and updated in place when objects
+    are removed, so later phases see the state left behind by earlier ones. An
+    inventory kept current by an `EventWatcher` can outlive a run, in that case
+    listings are only fetched again after events invalidated them.
+    """
+
+    def __init__(
+        self,
+        load_containers: Callable[[], list[dict[str, Any]]],
+        load_images: Callable[[], list[dict[str, Any]]],
+        load_volumes: Callable[[], list[dict[str, Any]]] | None = None,
+    ) -> None:
+        self._load_containers = load_containers
+        self._load_images = load_images
+        self._load_volumes = load_volumes
+        self._containers: dict[str, dict[str, Any]] | None = None
+        self._images: dict[str, dict[str, Any]] | None = None
+        self._volumes: dict[str, dict[str, Any]] | None = None
+        self._started: dict[str, datetime.datetime] = {}
+        self._finished: dict[str, datetime.datetime] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def containers(self) -> list[dict[str, Any]]:
+        """All containers, including stopped ones."""
+        with self._lock:
+            if self._containers is None:
+                self._containers = {item["Id"]: item for item in self._load_containers()}
+            return list(self._containers.values())
+
+    @property
+    def images(self) -> list[dict[str, Any]]:
+        """All top-level images."""
+        with self._lock:
+            if self._images is None:
+                self._images = {item["Id"]: item for item in self._load_images()}
+            return list(self._images.values())
+
+    @property
+    def volumes(self) -> list[dict[str, Any]]:
+        """All dangling volumes."""
+        with self._lock:
+            if self._volumes is None:
+                load_volumes = self._load_volumes
+                self._volumes = {item["Name"]: item for item in (load_volumes or list)()}
+            return list(self._volumes.values())
+
+    def discard_containers(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            for container_id in ids:
+                if self._containers is not None:
+                    self._containers.pop(container_id, None)
+                self._started.pop(container_id, None)
+                self._finished.pop(container_id, None)
+
+    def discard_images(self, ids: Iterable[str]) -> None:
+        with self._lock:
+            if self._images is not None:
+                for image_id in ids:
+                    self._images.pop(image_id, None)
+
+    def discard_volumes(self, names: Iterable[str]) -> None:
+        with self._lock:
+            if self._volumes is not None:
+                for name in names:
+                    self._volumes.pop(name, None)
+
+    def invalidate(
+        self, containers: bool = True, images: bool = True, volumes: bool = True
+    ) -> None:
+        """Drop listings, so they are fetched again on next use."""
+        with self._lock:
+            if containers:
+                self._containers = None
+            if images:
+                self._images = None
+            if volumes:
+                self._volumes = None
+
+    def container_started(self, container_id: str, time: datetime.datetime) -> None:
+        with self._lock:
+            self._started[container_id] = time
+            self._finished.pop(container_id, None)
+            self._set_state(container_id, "running")
+
+    def container_finished(self, container_id: str, time: datetime.datetime) -> None:
+        with self._lock:
+            self._finished[container_id] = time
+            self._set_state(container_id, "exited")
+
+    def _set_state(self, container_id: str, state: str) -> None:
+        if self._containers is not None and container_id in self._containers:
+            self._containers[container_id] = {**self._containers[container_id], "State": state}
+
+    def started_at(self, container_id: str) -> datetime.datetime | None:
+        """Return the start time of the container, if it has been observed."""
+        with self._lock:
+            return self._started.get(container_id)
+
+    def finished_at(self, container_id: str) -> datetime.datetime | None:
+        """Return the time the container stopped, if it has been observed."""
+        with self._lock:
+            return self._finished.get(container_id)
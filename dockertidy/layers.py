@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""Layer sharing between images for reclaimable space accounting."""
+
+import heapq
+from collections.abc import Hashable, Iterable
+from typing import Any
+
+
+class LayerGraph:
+    """
+    Prefix tree of the layer chains of all images on a host.
+
+    Docker stores layers by chain, so two images share storage exactly for the
+    common prefix of their `RootFS.Layers`. Every node of the tree is a layer
+    chain, referenced by all images whose chain passes through it. Removing a set
+    of images frees the nodes no remaining image references.
+
+    Per-layer sizes are not exposed by the daemon, so node sizes are derived from
+    the image sizes: an image node holds the image size, the deepest node an image
+    shares with others holds its `SharedSize` from the daemon disk usage data, and
+    every node's own bytes are the difference to its nearest sized ancestor. Shared
+    nodes without size information are sized as large as their descendants allow,
+    which never overestimates the bytes a removal frees.
+    """
+
+    def __init__(self) -> None:
+        self._index: dict[tuple[int, Hashable], int] = {}
+        self._parent: list[int] = []
+        self._images: list[list[str]] = []
+        self._paths: dict[str, list[int]] = {}
+        self._sizes: dict[str, int] = {}
+        self._shared_sizes: dict[str, int] = {}
+        self._image_parents: dict[str, str] = {}
+        self._opaque: set[str] = set()
+        self._segments: list[int] | None = None
+        self._remaining: list[int] = []
+        self.selected: set[str] = set()
+
+    def add_image(
+        self,
+        image_id: str,
+        layers: Iterable[str],
+        size: int,
+        shared_size: int | None = None,
+        parent: str | None = None,
+    ) -> None:
+        """
+        Add an image to the graph.
+
+        Images without layer information are treated as a chain of their own, below
+        their parent image if it is known.
+        """
+        self._segments = None
+        self._sizes[image_id] = size
+        if shared_size is not None and shared_size >= 0:
+            self._shared_sizes[image_id] = shared_size
+
+        node = -1
+        for layer in layers:
+            node = self._node(node, layer)
+
+        if node == -1:
+            self._opaque.add(image_id)
+            if parent:
+                self._image_parents[image_id] = parent
+            return
+
+        self._paths[image_id] = self._path(node)
+
+    def _node(self, parent: int, key: Hashable) -> int:
+        node = self._index.get((parent, key))
+        if node is None:
+            node = len(self._parent)
+            self._index[(parent, key)] = node
+            self._parent.append(parent)
+            self._images.append([])
+        return node
+
+    def _path(self, node: int) -> list[int]:
+        path = []
+        while node != -1:
+            path.append(node)
+            node = self._parent[node]
+        path.reverse()
+        return path
+
+    def _add_opaque_images(self) -> None:
+        def path(image_id: str, seen: set[str]) -> list[int]:
+            if image_id in self._paths:
+                return self._paths[image_id]
+
+            seen.add(image_id)
+            parent = self._image_parents.get(image_id)
+            parent_node = -1
+            if parent and parent in self._sizes and parent not in seen:
+                parent_node = path(parent, seen)[-1]
+            self._paths[image_id] = self._path(self._node(parent_node, ("image", image_id)))
+            return self._paths[image_id]
+
+        for image_id in self._sizes:
+            if image_id not in self._paths:
+                path(image_id, set())
+
+    def _finalize(self) -> list[int]:
+        if self._segments is not None:
+            return self._segments
+
+        self._add_opaque_images()
+        count = len(self._parent)
+        refs = [0] * count
+        cum: list[int | None] = [None] * count
+
+        for images in self._images:
+            images.clear()
+        for image_id, path in self._paths.items():
+            for node in path:
+                refs[node] += 1
+                self._images[node].append(image_id)
+
+        for image_id, path in self._paths.items():
+            leaf = path[-1]
+            size = self._sizes[image_id]
+            if image_id in self._opaque and len(path) == 1:
+                # An image without layers and known parent only accounts for its own bytes
+                size -= self._shared_sizes.get(image_id, 0)
+            cum[leaf] = max(cum[leaf] or 0, size)
+
+        for image_id, shared_size in self._shared_sizes.items():
+            path = self._paths[image_id]
+            if refs[path[-1]] > 1:
+                continue
+            for node in reversed(path[:-1]):
+                if refs[node] > 1:
+                    known = cum[node]
+                    cum[node] = shared_size if known is None else min(known, shared_size)
+                    break
+
+        # Nodes are created parent first, so children always have a higher index
+        smallest_below: list[int | None] = [None] * count
+        for node in reversed(range(count)):
+            value = cum[node]
+            if value is None and refs[node] > 1:
+                value = cum[node] = smallest_below[node]
+            if value is None:
+                value = smallest_below[node]
+            parent = self._parent[node]
+            if parent != -1 and value is not None:
+                current = smallest_below[parent]
+                smallest_below[parent] = value if current is None else min(current, value)
+
+        base = [0] * count
+        segments = [0] * count
+        for node in range(count):
+            parent = self._parent[node]
+            if parent != -1:
+                parent_cum = cum[parent]
+                base[node] = base[parent] if parent_cum is None else parent_cum
+            value = cum[node]
+            if value is not None:
+                segments[node] = max(0, value - base[node])
+
+        self._remaining = refs
+        self._segments = segments
+        self.selected = set()
+        return segments
+
+    def reclaimable(self, image_id: str) -> int:
+        """Return the bytes removing the image frees, given the images already selected."""
+        segments = self._finalize()
+        if image_id in self.selected or image_id not in self._paths:
+            return 0
+
+        freed = 0
+        for node in reversed(self._paths[image_id]):
+            # References only decrease towards the leaves, no ancestor can be freed either
+            if self._remaining[node] > 1:
+                break
+            freed += segments[node]
+        return freed
+
+    def select(self, image_id: str) -> set[str]:
+        """
+        Mark the image as removed.
+
+        Returns the images whose reclaimable bytes increased because they are now the
+        only remaining image referencing one of the layers.
+        """
+        self._finalize()
+        if image_id in self.selected or image_id not in self._paths:
+            return set()
+
+        self.selected.add(image_id)
+        changed: set[str] = set()
+        for node in self._paths[image_id]:
+            self._remaining[node] -= 1
+            if self._remaining[node] == 1:
+                changed.update(other for other in self._images[node] if other not in self.selected)
+        return changed
+
+    def plan(self, candidates: dict[str, Any], deficit: int) -> tuple[list[tuple[str, int]], int]:
+        """
+        Order candidates greedily by the bytes their removal frees.
+
+        `candidates` maps image IDs to a sort key used to break ties, smallest first.
+        Returns the candidates in removal order with their reclaimable bytes at the
+        time they are selected, and the number of leading candidates estimated to
+        cover the deficit. Selections are recorded in the graph.
+        """
+        gains = {image_id: self.reclaimable(image_id) for image_id in candidates}
+        heap = [(-gain, candidates[image_id], image_id) for image_id, gain in gains.items()]
+        heapq.heapify(heap)
+
+        order: list[tuple[str, int]] = []
+        planned = 0
+        freed = 0
+        while heap:
+            negative_gain, _, image_id = heapq.heappop(heap)
+            if image_id in self.selected or -negative_gain != gains[image_id]:
+                continue
+
+            order.append((image_id, gains[image_id]))
+            if freed < deficit:
+                freed += gains[image_id]
+                planned += 1
+
+            for other in self.select(image_id):
+                if other in candidates:
+                    gains[other] = self.reclaimable(other)
+                    heapq.heappush(heap, (-gains[other], candidates[other], other))
+
+        return (order, planned)
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Adaptive concurrency limit driven by docker API latency."""
+
+import math
+import threading
+
+from dockertidy.logger import SingleLog
+
+
+def percentile(samples: list[float], percent: float) -> float:
+    """Return the nearest-rank percentile of the samples."""
+    ordered = sorted(samples)
+    return ordered[max(0, math.ceil(percent / 100 * len(ordered)) - 1)]
+
+
+class AdaptiveLimiter:
+    """
+    Limit concurrent calls with additive increase and multiplicative decrease.
+
+    Latencies of docker API calls are collected in rounds of `window` samples.
+    After each round the limit is multiplied by `decrease` if the p95 latency
+    exceeded `target` seconds, otherwise it grows by one, staying between 1 and
+    `max_limit`. The limit starts at 1.
+    """
+
+    def __init__(
+        self, target: float, max_limit: int, window: int = 20, decrease: float = 0.5
+    ) -> None:
+        self.logger = SingleLog().logger
+        self.target = target
+        self.max_limit = max(1, max_limit)
+        self.window = max(1, window)
+        self.decrease = decrease
+        self.limit = 1
+        self.in_flight = 0
+        self._samples: list[float] = []
+        self._condition = threading.Condition()
+
+    def acquire(self) -> None:
+        """Wait until fewer calls than the limit are in flight and take a slot."""
+        with self._condition:
+            while self.in_flight >= self.limit:
+                self._condition.wait()
+            self.in_flight += 1
+
+    def release(self) -> None:
+        with self._condition:
+            self.in_flight -= 1
+            self._condition.notify_all()
+
+    def observe(self, latency: float) -> None:
+        """Record the latency of a call and adjust the limit after each round."""
+        with self._condition:
+            self._samples.append(latency)
+            if len(self._samples) < self.window:
+                return
+
+            p95 = percentile(self._samples, 95)
+            self._samples.clear()
+            if p95 > self.target:
+                limit = max(1, int(self.limit * self.decrease))
+                if limit != self.limit:
+                    self.logger.info(
+                        f"Docker API p95 latency {p95:.2f}s above target {self.target:.2f}s, "
+                        f"reducing concurrent removals to {limit}"
+                    )
+            else:
+                limit = min(self.max_limit, self.limit + 1)
+                if limit != self.limit:
+                    self.logger.debug(f"Increasing concurrent removals to {limit}")
+
+            self.limit = limit
+            self._condition.notify_all()
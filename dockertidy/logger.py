@@ -4,6 +4,7 @@
 import logging
 import os
 import sys
+import threading
 from typing import Any, NoReturn
 
 import colorama
@@ -25,6 +26,23 @@ def _should_do_markup() -> bool:
 
 colorama.init(autoreset=True, strip=not _should_do_markup())
 
+_thread = threading.local()
+
+
+def current_host() -> str | None:
+    """Return the docker host the current thread works on, None if it isn't set."""
+    return getattr(_thread, "host", None)
+
+
+def set_current_host(host: str | None) -> None:
+    """
+    Set the docker host the current thread works on.
+
+    Pools started by the thread pass it on to their workers, so log messages can be
+    attributed to a host.
+    """
+    _thread.host = host
+
 
 class LogFilter:
     """A custom log filter which excludes log messages above the logged level."""
@@ -154,6 +172,12 @@ class Log:
         """Set log level."""
         self.logger.setLevel(s)
 
+    def log_to_stderr(self) -> None:
+        """Write all log messages to stderr, keeping stdout free for other output."""
+        for handler in self.logger.handlers:
+            if isinstance(handler, logging.StreamHandler):
+                handler.setStream(sys.stderr)
+
     def debug(self, msg: str) -> str:
         """Format info messages and return string."""
         return msg
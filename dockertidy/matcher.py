@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""Precompiled matchers for exclude rules."""
+
+import fnmatch
+import re
+from collections.abc import Iterable
+from typing import Any
+
+GLOB_CHARS = frozenset("*?[")
+
+
+def has_glob(pattern: str) -> bool:
+    """Return True if the pattern contains fnmatch wildcards."""
+    return not GLOB_CHARS.isdisjoint(pattern)
+
+
+def translate(pattern: str) -> str:
+    """Translate a fnmatch pattern into an unanchored regular expression."""
+    return re.sub(r"\\[zZ]$", "", fnmatch.translate(pattern))
+
+
+def compile_patterns(patterns: Iterable[str]) -> re.Pattern[str] | None:
+    """Merge regular expressions into a single alternation, to be used with `fullmatch`."""
+    alternatives = [f"(?:{pattern})" for pattern in patterns]
+    if not alternatives:
+        return None
+    return re.compile("|".join(alternatives))
+
+
+class LabelMatcher:
+    """
+    Match container labels against `gc.exclude_container_labels` rules.
+
+    A rule is a tuple of a key pattern and an optional value pattern. A container
+    matches if any of its labels matches the key pattern and, if given, the value
+    pattern, with the same semantics as `fnmatch.fnmatchcase`.
+
+    Literal keys and values are resolved by dict lookups, all wildcard rules are
+    merged into one regular expression for keys and one for `key<NUL>value` pairs.
+    """
+
+    SEPARATOR = "\x00"
+
+    def __init__(self, rules: Iterable[tuple[str, str | None]]) -> None:
+        self.rules = tuple(rules)
+        self._keys: set[str] = set()
+        self._pairs: dict[str, set[str]] = {}
+        key_patterns: list[str] = []
+        pair_patterns: list[str] = []
+
+        for key, value in self.rules:
+            if not value:
+                if has_glob(key):
+                    key_patterns.append(translate(key))
+                else:
+                    self._keys.add(key)
+            elif has_glob(key) or has_glob(value):
+                # Labels never contain NUL, so the separator pins the key/value split
+                pair_patterns.append(translate(key) + re.escape(self.SEPARATOR) + translate(value))
+            else:
+                self._pairs.setdefault(key, set()).add(value)
+
+        self._key_regex = compile_patterns(key_patterns)
+        self._pair_regex = compile_patterns(pair_patterns)
+
+    def __bool__(self) -> bool:
+        return bool(self.rules)
+
+    def matches(self, labels: dict[str, str] | None) -> bool:
+        """Return True if any of the labels matches an exclude rule."""
+        if not labels:
+            return False
+
+        keys = self._keys
+        pairs = self._pairs
+        key_regex = self._key_regex
+        pair_regex = self._pair_regex
+
+        for key, value in labels.items():
+            if key in keys:
+                return True
+            values = pairs.get(key)
+            if values is not None and value in values:
+                return True
+            if key_regex is not None and key_regex.fullmatch(key):
+                return True
+            if pair_regex is not None and pair_regex.fullmatch(f"{key}{self.SEPARATOR}{value}"):
+                return True
+
+        return False
+
+
+class ImageExcludeIndex(frozenset[str]):
+    """
+    Match image tags against `gc.exclude_images` patterns.
+
+    The index is the set of patterns itself, with the same fnmatch semantics as
+    `fnmatch.fnmatchcase`. Literal tags are looked up in the set, `repo:*` style
+    patterns (a literal prefix followed by a single `*`) are resolved with a prefix
+    trie and all remaining wildcard patterns are merged into one regular expression.
+    """
+
+    TERMINAL = ""
+
+    def __init__(self, patterns: Iterable[str] = ()) -> None:  # noqa: ARG002
+        # The patterns are consumed by frozenset.__new__
+        super().__init__()
+        self._literals: set[str] = set()
+        self._prefixes: dict[str, Any] = {}
+        glob_patterns: list[str] = []
+
+        for pattern in self:
+            if not has_glob(pattern):
+                self._literals.add(pattern)
+            elif pattern.endswith("*") and not has_glob(pattern[:-1]):
+                self._add_prefix(pattern[:-1])
+            else:
+                glob_patterns.append(translate(pattern))
+
+        self._regex = compile_patterns(glob_patterns)
+
+    def _add_prefix(self, prefix: str) -> None:
+        node = self._prefixes
+        for char in prefix:
+            node = node.setdefault(char, {})
+        node[self.TERMINAL] = True
+
+    def _match_prefix(self, tag: str) -> bool:
+        node = self._prefixes
+        for char in tag:
+            if self.TERMINAL in node:
+                return True
+            next_node = node.get(char)
+            if next_node is None:
+                return False
+            node = next_node
+        return self.TERMINAL in node
+
+    def matches(self, tags: Iterable[str]) -> bool:
+        """Return True if any of the tags matches an exclude pattern."""
+        literals = self._literals
+        regex = self._regex
+
+        for tag in tags:
+            if tag in literals:
+                return True
+            if self._prefixes and self._match_prefix(tag):
+                return True
+            if regex is not None and regex.fullmatch(tag):
+                return True
+
+        return False
@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""Prometheus metrics of runs and docker API calls."""
+
+import contextlib
+import math
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable, Iterator, Sequence
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any
+
+from dockertidy.config import SingleConfig
+from dockertidy.logger import SingleLog
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    return repr(float(value))
+
+
+def _format_labels(labels: Sequence[tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+
+    def escape(value: str) -> str:
+        return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+    return "{" + ",".join(f'{name}="{escape(value)}"' for name, value in labels) + "}"
+
+
+class Registry:
+    """Collection of metrics rendered in the Prometheus text format."""
+
+    def __init__(self) -> None:
+        self.metrics: list[Metric] = []
+
+    def register(self, metric: "Metric") -> None:
+        self.metrics.append(metric)
+
+    def exposition(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        for metric in self.metrics:
+            lines.append(f"# HELP {metric.name} {metric.help}")
+            lines.append(f"# TYPE {metric.name} {metric.TYPE}")
+            lines.extend(metric.samples())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, path: str) -> None:
+        """Write all metrics to `path` atomically, as read by the node exporter."""
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp = tempfile.mkstemp(dir=directory, prefix=".docker-tidy-", suffix=".prom")
+        try:
+            with os.fdopen(fd, "w") as textfile:
+                textfile.write(self.exposition())
+            os.chmod(tmp, 0o644)
+            os.replace(tmp, path)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+REGISTRY = Registry()
+
+
+class Metric:
+    """Base of all metric types, holding one value per label combination."""
+
+    TYPE = "untyped"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,  # noqa: A002
+        labels: Sequence[str] = (),
+        registry: Registry | None = REGISTRY,
+    ) -> None:
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: dict[tuple[str, ...], Any] = {}
+        self._lock = threading.Lock()
+        if registry is not None:
+            registry.register(self)
+
+    def _key(self, labels: dict[str, str | None]) -> tuple[str, ...]:
+        """Return the label values in label order, None is exported as an empty string."""
+        if set(labels) != set(self.labels):
+            raise ValueError(f"Metric {self.name} expects labels {self.labels}, got {labels}")
+        return tuple("" if labels[name] is None else str(labels[name]) for name in self.labels)
+
+    def value(self, **labels: str | None) -> float:
+        with self._lock:
+            return float(self._values.get(self._key(labels), 0.0))
+
+    def samples(self) -> list[str]:
+        with self._lock:
+            return [
+                f"{self.name}{_format_labels(list(zip(self.labels, key, strict=True)))} "
+                f"{_format_value(value)}"
+                for key, value in sorted(self._values.items())
+            ]
+
+
+class Counter(Metric):
+    """Value that only goes up."""
+
+    TYPE = "counter"
+
+    def inc(self, amount: float = 1.0, **labels: str | None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+
+class Gauge(Metric):
+    """Value that can be set to anything."""
+
+    TYPE = "gauge"
+
+    def set(self, value: float, **labels: str | None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    TYPE = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,  # noqa: A002
+        labels: Sequence[str] = (),
+        registry: Registry | None = REGISTRY,
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labels, registry)
+        self.buckets = (*sorted(buckets), math.inf)
+
+    def observe(self, value: float, **labels: str | None) -> None:
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key, ([0] * len(self.buckets), 0.0))
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[index] += 1
+            self._values[key] = (counts, total + value)
+
+    def value(self, **labels: str | None) -> float:
+        """Return the number of observations."""
+        with self._lock:
+            counts, _ = self._values.get(self._key(labels), ([0], 0.0))
+            return float(counts[-1])
+
+    def samples(self) -> list[str]:
+        lines = []
+        with self._lock:
+            for key, (counts, total) in sorted(self._values.items()):
+                labels = list(zip(self.labels, key, strict=True))
+                for bound, count in zip(self.buckets, counts, strict=True):
+                    bucket_labels = _format_labels([*labels, ("le", _format_value(bound))])
+                    lines.append(f"{self.name}_bucket{bucket_labels} {count}")
+                lines.append(f"{self.name}_sum{_format_labels(labels)} {_format_value(total)}")
+                lines.append(f"{self.name}_count{_format_labels(labels)} {counts[-1]}")
+        return lines
+
+
+SCANNED = Counter(
+    "docker_tidy_objects_scanned_total",
+    "Objects considered for removal or stopping.",
+    ("command", "resource", "host"),
+)
+REMOVED = Counter(
+    "docker_tidy_objects_removed_total",
+    "Objects removed or stopped.",
+    ("command", "resource", "host"),
+)
+FAILED = Counter(
+    "docker_tidy_objects_failed_total",
+    "Objects that failed to be removed or stopped.",
+    ("command", "resource", "host"),
+)
+RECLAIMED_BYTES = Counter(
+    "docker_tidy_reclaimed_bytes_total",
+    "Disk space the daemon reported as reclaimed by prune calls.",
+    ("host",),
+)
+REMOVED_IMAGE_BYTES = Counter(
+    "docker_tidy_removed_image_bytes_total",
+    "Size of removed images, including layers shared with other images.",
+    ("host",),
+)
+RUNS = Counter("docker_tidy_runs_total", "Finished runs.", ("command", "status", "host"))
+LAST_RUN = Gauge(
+    "docker_tidy_last_run_timestamp_seconds", "Time the last run finished.", ("command", "host")
+)
+RUN_DURATION = Gauge(
+    "docker_tidy_run_duration_seconds",
+    "Duration of each phase of the last run, 'total' covers the whole run.",
+    ("command", "phase", "host"),
+)
+API_CALL_DURATION = Histogram(
+    "docker_tidy_api_call_duration_seconds",
+    "Duration of docker API calls including retries.",
+    ("endpoint", "host"),
+)
+API_CALL_ERRORS = Counter(
+    "docker_tidy_api_call_errors_total", "Failed docker API calls.", ("endpoint", "host")
+)
+
+
+def endpoint(func: Callable[..., Any]) -> str:
+    """Return the endpoint label of a docker client method."""
+    name = getattr(func, "__name__", None)
+    return name if isinstance(name, str) else "unknown"
+
+
+@contextlib.contextmanager
+def phase(command: str, name: str, host: str | None = None) -> Iterator[None]:
+    """Record the duration of a phase of a run on `host`, None for the local daemon."""
+    started = time.monotonic()
+    try:
+        yield
+    finally:
+        RUN_DURATION.set(time.monotonic() - started, command=command, phase=name, host=host)
+
+
+@contextlib.contextmanager
+def track_run(command: str, host: str | None = None) -> Iterator[None]:
+    """
+    Record the duration and outcome of a run.
+
+    Afterwards all metrics are written to `metrics.textfile` if it is set.
+    """
+    status = "failure"
+    try:
+        with phase(command, "total", host):
+            yield
+        status = "success"
+    finally:
+        RUNS.inc(command=command, status=status, host=host)
+        LAST_RUN.set(time.time(), command=command, host=host)
+        path = SingleConfig().config["metrics"]["textfile"]
+        if path:
+            try:
+                REGISTRY.write_textfile(path)
+            except OSError as e:
+                SingleLog().logger.warning(f"Can not write metrics to {path}: {e!s}")
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    server: "MetricsServer"
+
+    def do_GET(self) -> None:
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+
+        body = self.server.registry.exposition().encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        SingleLog().logger.debug(f"Metrics request: {format % args}")
+
+
+class MetricsServer(ThreadingHTTPServer):
+    """HTTP server exposing the metrics at `/metrics` from a background thread."""
+
+    daemon_threads = True
+
+    def __init__(self, address: str, port: int, registry: Registry = REGISTRY) -> None:
+        super().__init__((address, port), _MetricsHandler)
+        self.registry = registry
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="tidy-metrics", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
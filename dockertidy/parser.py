@@ -1,30 +1,182 @@
 #!/usr/bin/env python3
 """Custom input type parser."""
 
+import datetime
+import importlib.util
+import re
 from argparse import ArgumentTypeError
 
-import dateparser
 import environs
+from dateutil.relativedelta import relativedelta
 
 env = environs.Env()
 
+HAS_DATEPARSER = importlib.util.find_spec("dateparser") is not None
+
+# Docker's zero value for times that never happened, e.g. `FinishedAt` of a new container
+YEAR_ZERO = "0001-01-01T00:00:00Z"
+
+DURATION_UNITS = {
+    "seconds": ("s", "sec", "secs", "second", "seconds"),
+    "minutes": ("m", "min", "mins", "minute", "minutes"),
+    "hours": ("h", "hr", "hrs", "hour", "hours"),
+    "days": ("d", "day", "days"),
+    "weeks": ("w", "wk", "wks", "week", "weeks"),
+    "months": ("mo", "month", "months"),
+    "years": ("y", "yr", "yrs", "year", "years"),
+}
+UNIT_ALIASES = {alias: unit for unit, aliases in DURATION_UNITS.items() for alias in aliases}
+
+DURATION_COMPONENT = re.compile(r"(?:,|and\b|\s)*(\d+(?:\.\d+)?|an?\b)\s*([a-z]+)")
+ISO_DURATION = re.compile(
+    r"P(?:(?P<years>\d+)Y)?(?:(?P<months>\d+)M)?(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+(?:\.\d+)?)S)?)?"
+)
+
 
 def timedelta_validator(value: str | None) -> str | None:
     """
     Return the dateparser string for a time in the past.
 
-    :param value: a string containing a time format supported by
-    mod:`dateparser`
+    :param value: a duration like `7 days ago`, `1d12h` or `P1W`, or any other
+    time format supported by mod:`dateparser`
     """
     if value is None:
         return None
 
-    if not dateparser.parse(value):
-        raise ArgumentTypeError(f"'{value}' is not a valid timedelta string")
+    if not parse_past_time(value):
+        hint = "" if HAS_DATEPARSER else ", install docker-tidy[dateparser] for more formats"
+        raise ArgumentTypeError(f"'{value}' is not a valid timedelta string{hint}")
 
     return value
 
 
+def parse_duration(value: str) -> relativedelta | None:
+    """
+    Parse a duration with the built-in grammar.
+
+    Supported are relative phrases (`7 days ago`, `an hour ago`, `1 day and 2 hours`),
+    compact durations (`12h`, `1d12h`, `0day`) and ISO 8601 durations (`P1DT12H`).
+    Returns None if the value doesn't match the grammar.
+    """
+    value = value.strip()
+
+    match = ISO_DURATION.fullmatch(value.upper())
+    if match and value.upper() not in ("P", "PT") and not value.upper().endswith("T"):
+        fields = match.groupdict()
+        return _to_relativedelta({key: float(part) for key, part in fields.items() if part})
+
+    value = value.lower().removesuffix("ago").rstrip()
+    parts: dict[str, float] = {}
+    position = 0
+    while position < len(value):
+        match = DURATION_COMPONENT.match(value, position)
+        if not match or match.group(2) not in UNIT_ALIASES:
+            return None
+        amount = 1.0 if match.group(1) in ("a", "an") else float(match.group(1))
+        unit = UNIT_ALIASES[match.group(2)]
+        parts[unit] = parts.get(unit, 0.0) + amount
+        position = match.end()
+
+    if not parts:
+        return None
+    return _to_relativedelta(parts)
+
+
+def _to_relativedelta(parts: dict[str, float]) -> relativedelta | None:
+    # Calendar units have no fixed length, fractions of them are left to dateparser
+    if any(not parts.get(unit, 0.0).is_integer() for unit in ("months", "years")):
+        return None
+
+    seconds = (
+        parts.get("weeks", 0.0) * 604800
+        + parts.get("days", 0.0) * 86400
+        + parts.get("hours", 0.0) * 3600
+        + parts.get("minutes", 0.0) * 60
+        + parts.get("seconds", 0.0)
+    )
+    return relativedelta(
+        years=int(parts.get("years", 0.0)),
+        months=int(parts.get("months", 0.0)),
+        seconds=int(seconds),
+        microseconds=round(seconds % 1 * 1000000),
+    )
+
+
+def _parse_absolute(value: str, now: datetime.datetime) -> datetime.datetime | None:
+    if value.lower() == "now":
+        return now
+
+    text = re.sub(r"\s*UTC$", "+00:00", value, flags=re.IGNORECASE)
+    try:
+        parsed = datetime.datetime.fromisoformat(text)
+    except ValueError:
+        return None
+
+    # Naive times are interpreted in the local timezone by dateparser
+    if parsed.tzinfo is None:
+        return None
+    return parsed.astimezone(datetime.UTC)
+
+
+def parse_past_time(value: str, now: datetime.datetime | None = None) -> datetime.datetime | None:
+    """
+    Return the timezone aware UTC time described by a duration or date string.
+
+    Durations are subtracted from `now`. Values the built-in grammar doesn't
+    understand are passed to dateparser if it is installed.
+    """
+    value = value.strip()
+    if not value:
+        return None
+
+    now = now or datetime.datetime.now(tz=datetime.UTC)
+    delta = parse_duration(value)
+    if delta is not None:
+        return now - delta
+
+    absolute = _parse_absolute(value, now)
+    if absolute is not None or not HAS_DATEPARSER:
+        return absolute
+
+    # Importing dateparser takes hundreds of milliseconds, only pay for it when needed
+    import dateparser
+
+    return dateparser.parse(
+        value, settings={"TO_TIMEZONE": "UTC", "RETURN_AS_TIMEZONE_AWARE": True}
+    )
+
+
+def parse_timestamp(value: str) -> datetime.datetime | None:
+    """
+    Parse an RFC 3339 timestamp as returned by the docker API.
+
+    Returns None for `YEAR_ZERO`. Timestamps without a timezone are taken as UTC.
+    Nanoseconds are truncated to microseconds by `datetime.fromisoformat`, values
+    it rejects are passed to dateutil, which raises ValueError if it can't parse them.
+    """
+    if value == YEAR_ZERO:
+        return None
+
+    try:
+        parsed = datetime.datetime.fromisoformat(value)
+    except ValueError:
+        import dateutil.parser
+
+        parsed = dateutil.parser.parse(value)
+
+    if parsed.tzinfo is None:
+        return parsed.replace(tzinfo=datetime.UTC)
+    return parsed
+
+
+def parse_created(created: int | str) -> datetime.datetime:
+    """Parse a creation time, list endpoints return unix timestamps and inspect RFC 3339."""
+    if isinstance(created, int):
+        return datetime.datetime.fromtimestamp(created, tz=datetime.UTC)
+    return parse_timestamp(created) or datetime.datetime.min.replace(tzinfo=datetime.UTC)
+
+
 @env.parser_for("timedelta_validator")
 def timedelta_parser(value: str) -> str:
     try:
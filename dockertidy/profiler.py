@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""Profile a whole run of docker-tidy."""
+
+import contextlib
+import cProfile
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from collections.abc import Iterator
+from typing import Any
+
+from dockertidy.logger import SingleLog
+
+
+class PhaseTiming:
+    """
+    Resources used by one phase of a profiled run.
+
+    CPU time is that of the whole process. For phases that `overlapped` with a
+    phase on another host it includes the other host, and no peak is recorded.
+    """
+
+    def __init__(self, name: str, host: str | None = None) -> None:
+        self.name = name
+        self.host = host
+        self.seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_bytes: int | None = None
+        self.overlapped = False
+
+    def format(self) -> str:
+        name = f"[{self.host}] {self.name}" if self.host else self.name
+        line = f"{name}: {self.seconds:.3f}s wall, {self.cpu_seconds:.3f}s CPU"
+        if self.peak_bytes is not None:
+            line += f", {self.peak_bytes / 1024**2:.1f}MB peak"
+        if self.overlapped:
+            line += ", overlapped other phases"
+        return line
+
+
+class Profiler:
+    """
+    Profile CPU time or memory allocations until `stop` is called.
+
+    In `cpu` mode a cProfile dump of all threads is written to `path`, to be read
+    with pstats or tools like snakeviz. Before Python 3.12 a profiler only sees
+    the thread that enabled it, so every thread started while profiling gets its
+    own profiler and their stats are merged into the dump. In `mem` mode a
+    text report of the `top` lines that allocated the most memory still held at
+    the end of the run is written, together with the peak memory of each phase.
+    """
+
+    def __init__(self, mode: str, path: str, top: int = 25) -> None:
+        self.logger = SingleLog().logger
+        self.mode = mode
+        self.path = path
+        self.top = top
+        self.phases: list[PhaseTiming] = []
+        self._running: list[PhaseTiming] = []
+        self._lock = threading.Lock()
+        self._cpu: cProfile.Profile | None = None
+        self._thread_cpu: list[cProfile.Profile] = []
+
+    def start(self) -> None:
+        if self.mode == "cpu":
+            self._cpu = cProfile.Profile()
+            self._cpu.enable()
+            if sys.version_info < (3, 12):
+                threading.setprofile(self._profile_thread)
+        else:
+            tracemalloc.start()
+
+    def stop(self) -> None:
+        try:
+            if self._cpu is not None:
+                threading.setprofile(None)
+                self._cpu.disable()
+                stats = pstats.Stats(self._cpu)
+                with self._lock:
+                    for thread_cpu in self._thread_cpu:
+                        stats.add(thread_cpu)
+                    self._thread_cpu = []
+                stats.dump_stats(self.path)
+                self._cpu = None
+            else:
+                _, peak = tracemalloc.get_traced_memory()
+                snapshot = tracemalloc.take_snapshot()
+                tracemalloc.stop()
+                self._write_memory_report(snapshot, peak)
+        except OSError as e:
+            self.logger.error(f"Can not write profile to {self.path}: {e!s}")
+            return
+        self.logger.info(f"Wrote {self.mode} profile to {self.path}")
+
+    def _profile_thread(self, frame: Any, event: str, arg: Any) -> None:  # noqa: ARG002
+        """Profile a new thread, installed as profile hook of all threads started later."""
+        profile = cProfile.Profile()
+        with self._lock:
+            self._thread_cpu.append(profile)
+        profile.enable()
+
+    @contextlib.contextmanager
+    def phase(self, name: str, host: str | None = None) -> Iterator[PhaseTiming]:
+        """
+        Measure wall time, CPU time and, in `mem` mode, peak memory of a phase.
+
+        Phases of several hosts may run concurrently on different threads. There is
+        only one traced peak per process, so the peak is only recorded for phases
+        that didn't overlap with any other phase.
+        """
+        timing = PhaseTiming(name, host)
+        with self._lock:
+            self.phases.append(timing)
+            if self._running:
+                timing.overlapped = True
+                for running in self._running:
+                    running.overlapped = True
+            elif self.mode == "mem":
+                tracemalloc.reset_peak()
+            self._running.append(timing)
+        started = time.perf_counter()
+        cpu_started = time.process_time()
+        try:
+            yield timing
+        finally:
+            timing.seconds = time.perf_counter() - started
+            timing.cpu_seconds = time.process_time() - cpu_started
+            with self._lock:
+                self._running.remove(timing)
+                if self.mode == "mem" and not timing.overlapped:
+                    timing.peak_bytes = tracemalloc.get_traced_memory()[1]
+            self.logger.info(f"Phase {timing.format()}")
+
+    def _write_memory_report(self, snapshot: tracemalloc.Snapshot, peak: int) -> None:
+        stats = snapshot.statistics("lineno")
+        lines = [f"Peak traced memory: {peak / 1024**2:.1f}MB", "", "Phases:"]
+        lines += [f"  {timing.format()}" for timing in self.phases]
+        lines += ["", f"Top {self.top} allocations still held at the end of the run:"]
+        lines += [f"  {stat}" for stat in stats[: self.top]]
+        total = sum(stat.size for stat in stats)
+        lines += ["", f"Total held: {total / 1024**2:.1f}MB in {len(stats)} lines"]
+        with open(self.path, "w", encoding="utf-8") as report:
+            report.write("\n".join(lines) + "\n")
+
+
+_active: Profiler | None = None
+
+
+@contextlib.contextmanager
+def profile(mode: str, path: str, top: int = 25) -> Iterator[Profiler | None]:
+    """Profile the enclosed block if a mode is given."""
+    global _active
+    if not mode:
+        yield None
+        return
+
+    profiler = Profiler(mode, path, top)
+    _active = profiler
+    profiler.start()
+    try:
+        yield profiler
+    finally:
+        _active = None
+        profiler.stop()
+
+
+@contextlib.contextmanager
+def phase(name: str, host: str | None = None) -> Iterator[None]:
+    """Time a phase of the run on `host` when profiling, otherwise do nothing."""
+    profiler = _active
+    if profiler is None:
+        yield
+        return
+
+    with profiler.phase(name, host):
+        yield
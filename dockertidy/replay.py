@@ -0,0 +1,162 @@
+#!/usr/bin/env python3
+"""Record docker API traffic and replay it without a docker daemon."""
+
+import collections
+import http
+import io
+import json
+import threading
+import time
+from typing import Any
+
+import docker.constants
+import requests
+import requests.adapters
+import requests.structures
+from docker import APIClient
+
+REDACTED = "<redacted>"
+
+_locks: dict[str, threading.Lock] = collections.defaultdict(threading.Lock)
+
+
+def redact(value: Any, keys: frozenset[str]) -> Any:
+    """Replace the values of all `keys` within a decoded JSON document."""
+    if isinstance(value, dict):
+        return {
+            key: REDACTED if key in keys else redact(item, keys) for key, item in value.items()
+        }
+    if isinstance(value, list):
+        return [redact(item, keys) for item in value]
+    return value
+
+
+class Recorder:
+    """
+    Append every response of a docker client to a JSON lines file.
+
+    Each line holds the method and path of the request, and the status, content
+    type, body and latency of the response. Values of the `redact` keys are
+    replaced anywhere within JSON bodies. Bodies of streamed responses like the
+    events stream are not recorded.
+    """
+
+    def __init__(self, path: str, redact: list[str] | None = None) -> None:
+        self.path = path
+        self.redact = frozenset(redact or [])
+
+    def attach(self, client: APIClient) -> None:
+        """Record all further responses of `client`."""
+        self._write({"version": client.api_version, "host": client.base_url})
+        client.hooks["response"].append(self.record)
+
+    def record(self, response: requests.Response, **kwargs: Any) -> None:
+        entry: dict[str, Any] = {
+            "method": response.request.method,
+            "path": response.request.path_url,
+            "status": response.status_code,
+            "content_type": response.headers.get("Content-Type"),
+            "elapsed": response.elapsed.total_seconds(),
+        }
+        if kwargs.get("stream"):
+            entry["stream"] = True
+        elif "json" in (entry["content_type"] or ""):
+            entry["body"] = redact(response.json(), self.redact)
+        else:
+            entry["body"] = response.text
+        self._write(entry)
+
+    def _write(self, entry: dict[str, Any]) -> None:
+        line = json.dumps(entry, sort_keys=True) + "\n"
+        with _locks[self.path], open(self.path, "a", encoding="utf-8") as recording:
+            recording.write(line)
+
+
+class ReplayAdapter(requests.adapters.BaseAdapter):
+    """
+    Answer requests with the responses of a recording.
+
+    Responses are matched by method and path. Repeated requests get the recorded
+    responses in order, and the last one once they are used up. Each response is
+    delayed by its recorded latency divided by `speed`, a speed of 0 answers
+    immediately. Requests that weren't recorded get a 404.
+    """
+
+    def __init__(self, path: str, speed: float = 1.0) -> None:
+        super().__init__()
+        self.speed = speed
+        self.version: str | None = None
+        self.responses: dict[tuple[str, str], collections.deque[dict[str, Any]]] = {}
+        self._lock = threading.Lock()
+
+        with open(path, encoding="utf-8") as recording:
+            for line in recording:
+                entry = json.loads(line)
+                if "version" in entry:
+                    self.version = self.version or entry["version"]
+                    continue
+                key = (entry["method"], entry["path"])
+                self.responses.setdefault(key, collections.deque()).append(entry)
+
+    def _next(self, method: str, path: str) -> dict[str, Any] | None:
+        with self._lock:
+            entries = self.responses.get((method, path))
+            if not entries:
+                return None
+            return entries.popleft() if len(entries) > 1 else entries[0]
+
+    def send(
+        self,
+        request: requests.PreparedRequest,
+        *args: Any,  # noqa: ARG002
+        **kwargs: Any,  # noqa: ARG002
+    ) -> requests.Response:
+        entry = self._next(str(request.method), request.path_url)
+        if entry is None:
+            entry = {
+                "status": 404,
+                "content_type": "application/json",
+                "body": {
+                    "message": f"No recorded response for {request.method} {request.path_url}"
+                },
+                "elapsed": 0.0,
+            }
+
+        if self.speed > 0 and entry["elapsed"]:
+            time.sleep(entry["elapsed"] / self.speed)
+
+        body = entry.get("body")
+        if body is None:
+            data = b""
+        elif isinstance(body, str):
+            data = body.encode()
+        else:
+            data = json.dumps(body).encode()
+
+        response = requests.Response()
+        response.status_code = entry["status"]
+        response.reason = http.HTTPStatus(entry["status"]).phrase
+        response.headers = requests.structures.CaseInsensitiveDict(
+            {"Content-Type": entry["content_type"]} if entry.get("content_type") else {}
+        )
+        response.raw = io.BytesIO(data)
+        response.encoding = "utf-8"
+        response.url = str(request.url)
+        response.request = request
+        return response
+
+    def close(self) -> None:
+        pass
+
+
+class ReplayClient(APIClient):
+    """Docker client that answers all calls from a recording instead of a daemon."""
+
+    def __init__(self, path: str, speed: float = 1.0, timeout: int = 60) -> None:
+        adapter = ReplayAdapter(path, speed)
+        super().__init__(
+            base_url="tcp://replay:2375",
+            version=adapter.version or docker.constants.DEFAULT_DOCKER_API_VERSION,
+            timeout=timeout,
+        )
+        self.mount("http://", adapter)
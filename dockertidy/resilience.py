@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""Retries and circuit breaking for docker API calls."""
+
+import random
+import threading
+import time
+from collections import deque
+from collections.abc import Callable
+from typing import Any
+
+import docker.errors
+import requests.exceptions
+
+from dockertidy.exception import CircuitOpenError
+from dockertidy.logger import SingleLog
+
+
+def is_transient(error: Exception) -> bool:
+    """Return whether an error of a docker API call is likely to go away on its own."""
+    if isinstance(error, requests.exceptions.Timeout | requests.exceptions.ConnectionError):
+        return True
+    if isinstance(error, docker.errors.APIError):
+        return bool(error.is_server_error())
+    return False
+
+
+def removal(func: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Wrap a single removal call so that it can be retried safely.
+
+    A removal can succeed on the daemon after the client timed out. Its retry then
+    fails with NotFound, which only means the object is gone, so it is reported as
+    success. NotFound on the first attempt is still raised.
+    """
+    attempts = 0
+
+    def remove(*args: Any, **kwargs: Any) -> Any:
+        nonlocal attempts
+        attempts += 1
+        try:
+            return func(*args, **kwargs)
+        except docker.errors.NotFound:
+            if attempts == 1:
+                raise
+            return None
+
+    # Keep the endpoint name for metrics and log messages
+    name = getattr(func, "__name__", None)
+    if isinstance(name, str):
+        remove.__name__ = name
+    return remove
+
+
+class CircuitBreaker:
+    """
+    Pause all calls while the docker daemon keeps failing.
+
+    The outcome of the last `window` calls is tracked, and once the share of
+    transient errors reaches `threshold` the breaker opens: calls wait for `pause`
+    seconds before they are sent. The first outcome after the pause closes the
+    breaker again or reopens it. If it opens more than `max_opens` times, calls
+    raise `CircuitOpenError` instead. A threshold of 0 disables the breaker.
+    """
+
+    def __init__(
+        self, threshold: float = 0.0, window: int = 20, pause: float = 30.0, max_opens: int = 3
+    ) -> None:
+        self.logger = SingleLog().logger
+        self.threshold = threshold
+        self.window = max(1, window)
+        self.pause = pause
+        self.max_opens = max_opens
+        self.opens = 0
+        self._outcomes: deque[bool] = deque(maxlen=self.window)
+        self._open_until: float | None = None
+        self._half_open = False
+        self._lock = threading.Lock()
+
+    def before_call(self) -> None:
+        """Wait while the breaker is open."""
+        if self.threshold <= 0:
+            return
+
+        with self._lock:
+            if self.opens > self.max_opens:
+                raise CircuitOpenError(
+                    f"Docker daemon kept failing after {self.max_opens} pauses, giving up"
+                )
+            open_until = self._open_until
+
+        if open_until is not None:
+            time.sleep(max(0.0, open_until - time.monotonic()))
+            with self._lock:
+                if self._open_until == open_until:
+                    self._open_until = None
+                    self._half_open = True
+
+    def record(self, success: bool) -> None:
+        """Record the outcome of a call."""
+        if self.threshold <= 0:
+            return
+
+        with self._lock:
+            if self._half_open:
+                self._half_open = False
+                if success:
+                    self._outcomes.clear()
+                    return
+                self._open()
+                return
+
+            self._outcomes.append(success)
+            if len(self._outcomes) < self.window or self._open_until is not None:
+                return
+
+            rate = self._outcomes.count(False) / len(self._outcomes)
+            if rate >= self.threshold:
+                self.logger.warning(
+                    f"Docker daemon error rate {rate:.0%} over the last {len(self._outcomes)} "
+                    f"calls, pausing for {self.pause:.0f}s"
+                )
+                self._open()
+
+    def _open(self) -> None:
+        self.opens += 1
+        self._outcomes.clear()
+        self._open_until = time.monotonic() + self.pause
+
+
+class RetryPolicy:
+    """
+    Retry docker API calls that failed with a transient error.
+
+    Calls are attempted up to `attempts` more times after the first failure, with
+    exponential backoff and full jitter between attempts. All calls share a budget
+    of `budget` retries, so a daemon that is down doesn't multiply the run time.
+    Every attempt passes the circuit breaker.
+    """
+
+    def __init__(
+        self,
+        attempts: int = 0,
+        backoff: float = 0.5,
+        max_backoff: float = 10.0,
+        budget: int = 100,
+        breaker: CircuitBreaker | None = None,
+    ) -> None:
+        self.logger = SingleLog().logger
+        self.attempts = attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.budget = budget
+        self.breaker = breaker or CircuitBreaker()
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def call(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Call `func`, retrying transient errors. The last error is raised."""
+        attempt = 0
+        while True:
+            self.breaker.before_call()
+            try:
+                result = func(*args, **kwargs)
+            except (docker.errors.APIError, requests.exceptions.RequestException) as e:
+                transient = is_transient(e)
+                self.breaker.record(not transient)
+                if not transient or attempt >= self.attempts or not self._take_budget():
+                    raise
+
+                delay = random.uniform(0, min(self.max_backoff, self.backoff * 2**attempt))  # noqa: S311
+                attempt += 1
+                self.logger.debug(
+                    f"Retrying {getattr(func, '__name__', 'call')} in {delay:.2f}s "
+                    f"(attempt {attempt + 1}): {e!s}"
+                )
+                time.sleep(delay)
+            else:
+                self.breaker.record(True)
+                return result
+
+    def _take_budget(self) -> bool:
+        with self._lock:
+            if self.retries >= self.budget:
+                return False
+            self.retries += 1
+            return True
+
+
+def get_retry_policy(config: dict[str, Any]) -> RetryPolicy:
+    """Create the retry policy and circuit breaker of a run from the config."""
+    return RetryPolicy(
+        attempts=config["retry"]["attempts"],
+        backoff=config["retry"]["backoff"],
+        max_backoff=config["retry"]["max_backoff"],
+        budget=config["retry"]["budget"],
+        breaker=CircuitBreaker(
+            threshold=config["breaker"]["threshold"],
+            window=config["breaker"]["window"],
+            pause=config["breaker"]["pause"],
+            max_opens=config["breaker"]["max_opens"],
+        ),
+    )
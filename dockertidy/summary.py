@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+"""Structured summary of a run."""
+
+import contextlib
+import datetime
+import json
+import shutil
+import sys
+import threading
+import time
+from collections.abc import Iterator
+from typing import Any
+
+_write_lock = threading.Lock()
+
+
+class PhaseSummary:
+    """Outcome of one phase of a run."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.seconds = 0.0
+        self.api_calls = 0
+        self.candidates = 0
+        self.removed = 0
+        self.failed = 0
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "name": self.name,
+            "seconds": round(self.seconds, 6),
+            "api_calls": self.api_calls,
+            "candidates": self.candidates,
+            "removed": self.removed,
+            "failed": self.failed,
+        }
+
+
+class RunSummary:
+    """
+    Wall time, docker API calls and outcome of a run, per phase.
+
+    API calls and candidates are attributed to the phase that is currently
+    running. Calls outside of any phase only count towards the run total. Free
+    disk space of `disk_path` is sampled before and after the run to compute the
+    bytes actually reclaimed.
+    """
+
+    def __init__(
+        self, command: str, host: str | None = None, disk_path: str | None = None
+    ) -> None:
+        self.command = command
+        self.host = host
+        self.disk_path = disk_path
+        self.started = datetime.datetime.now(datetime.UTC)
+        self.seconds = 0.0
+        self.api_calls = 0
+        self.phases: list[PhaseSummary] = []
+        self.disk_free_before: int | None = None
+        self.disk_free_after: int | None = None
+        self._current: PhaseSummary | None = None
+        self._lock = threading.Lock()
+
+    def _disk_free(self) -> int | None:
+        if not self.disk_path:
+            return None
+        try:
+            return shutil.disk_usage(self.disk_path).free
+        except OSError:
+            return None
+
+    @contextlib.contextmanager
+    def track(self) -> Iterator["RunSummary"]:
+        """Measure the whole run."""
+        self.disk_free_before = self._disk_free()
+        started = time.monotonic()
+        try:
+            yield self
+        finally:
+            self.seconds = time.monotonic() - started
+            self.disk_free_after = self._disk_free()
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[PhaseSummary]:
+        """Measure a phase, phases must not overlap."""
+        phase = PhaseSummary(name)
+        self.phases.append(phase)
+        self._current = phase
+        started = time.monotonic()
+        try:
+            yield phase
+        finally:
+            phase.seconds = time.monotonic() - started
+            self._current = None
+
+    def count_call(self) -> None:
+        with self._lock:
+            self.api_calls += 1
+            if self._current is not None:
+                self._current.api_calls += 1
+
+    def record(self, candidates: int = 0, removed: int = 0, failed: int = 0) -> None:
+        """Add to the outcome of the current phase."""
+        with self._lock:
+            if self._current is not None:
+                self._current.candidates += candidates
+                self._current.removed += removed
+                self._current.failed += failed
+
+    @property
+    def reclaimed_bytes(self) -> int | None:
+        if self.disk_free_before is None or self.disk_free_after is None:
+            return None
+        return self.disk_free_after - self.disk_free_before
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "command": self.command,
+            "host": self.host,
+            "started": self.started.isoformat(),
+            "seconds": round(self.seconds, 6),
+            "api_calls": self.api_calls,
+            "candidates": sum(phase.candidates for phase in self.phases),
+            "removed": sum(phase.removed for phase in self.phases),
+            "failed": sum(phase.failed for phase in self.phases),
+            "disk_free_before": self.disk_free_before,
+            "disk_free_after": self.disk_free_after,
+            "reclaimed_bytes": self.reclaimed_bytes,
+            "phases": [phase.to_dict() for phase in self.phases],
+        }
+
+    def write(self, path: str) -> None:
+        """Append the summary as a single JSON line to `path`, `-` writes to stdout."""
+        line = json.dumps(self.to_dict(), sort_keys=True) + "\n"
+        with _write_lock:
+            if path == "-":
+                sys.stdout.write(line)
+                sys.stdout.flush()
+                return
+            with open(path, "a", encoding="utf-8") as summary_file:
+                summary_file.write(line)
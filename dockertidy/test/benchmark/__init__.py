@@ -0,0 +1 @@
+"""Micro-benchmarks for docker-tidy, run with `python -m dockertidy.test.benchmark.<name>`."""
@@ -0,0 +1,64 @@
+"""Compare the sync and asyncio backends inspecting containers of a slow daemon."""
+
+import argparse
+import tempfile
+import time
+from collections.abc import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import docker
+
+from dockertidy.aio import AsyncioClient
+from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+
+def timed(func: Callable[[], list[str]]) -> tuple[float, list[str]]:
+    start = time.perf_counter()
+    result = func()
+    return time.perf_counter() - start, result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--containers", type=int, default=500)
+    parser.add_argument("--latency", type=float, default=0.01, help="daemon latency in seconds")
+    parser.add_argument("--workers", type=int, default=8, help="threads of the sync backend")
+    parser.add_argument("--max-in-flight", type=int, default=100)
+    args = parser.parse_args()
+
+    fake = FakeDocker()
+    ids = [f"c{i:05d}" for i in range(args.containers)]
+    for cid in ids:
+        fake.add_container(cid)
+    fake.latency = args.latency
+
+    with tempfile.TemporaryDirectory() as tmp:
+        url = fake.serve_unix(Path(tmp) / "docker.sock")
+        sync = docker.APIClient(base_url=url, version=fake.API_VERSION, max_pool_size=args.workers)
+        aio = AsyncioClient(url, max_in_flight=args.max_in_flight)
+
+        def run_sync() -> list[str]:
+            with ThreadPoolExecutor(max_workers=args.workers) as pool:
+                return [c["Id"] for c in pool.map(sync.inspect_container, ids)]
+
+        def run_asyncio() -> list[str]:
+            return [f.result()["Id"] for _, f in aio.map("inspect_container", "container", ids)]
+
+        results = {}
+        for name, func in {"sync": run_sync, "asyncio": run_asyncio}.items():
+            fake.max_in_flight = 0
+            elapsed, inspected = timed(func)
+            assert inspected == ids
+            results[name] = (elapsed, fake.max_in_flight)
+
+        aio.close()
+        fake.shutdown()
+
+    for name, (elapsed, in_flight) in results.items():
+        print(f"{name}: {elapsed * 1000:.0f}ms, max {in_flight} requests in flight")  # noqa: T201
+    print(f"speedup {results['sync'][0] / results['asyncio'][0]:.1f}x")  # noqa: T201
+
+
+if __name__ == "__main__":
+    main()
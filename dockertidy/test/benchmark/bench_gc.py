@@ -0,0 +1,231 @@
+"""Benchmark gc and stop runs end to end against a fake docker daemon."""
+
+import argparse
+import datetime
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any
+
+from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+BASELINE = Path(__file__).with_name("baseline.json")
+COMMANDS = ("gc", "stop")
+NOW = datetime.datetime.now(datetime.UTC)
+
+# Policies applied to the generated inventory, as a cron job would set them
+ENVIRONMENT = {
+    "TIDY_GC_MAX_CONTAINER_AGE": "7 days ago",
+    "TIDY_GC_MAX_IMAGE_AGE": "30 days ago",
+    "TIDY_GC_DANGLING_VOLUMES": "true",
+    "TIDY_GC_EXCLUDE_CONTAINER_LABELS": "keep=*",
+    "TIDY_STOP_MAX_RUN_TIME": "2 days ago",
+    "TIDY_LOG_LEVEL": "critical",
+}
+
+
+def iso(days_ago: float) -> str:
+    return (NOW - datetime.timedelta(days=days_ago)).isoformat().replace("+00:00", "Z")
+
+
+def epoch(days_ago: float) -> int:
+    return int((NOW - datetime.timedelta(days=days_ago)).timestamp())
+
+
+def populate(fake: FakeDocker, size: int, seed: int = 1) -> None:
+    """
+    Fill the fake daemon with `size` containers and images and `size // 10` volumes.
+
+    A fifth of the containers is running, the rest exited or never started, and
+    about half of each group is older than the policies. Images are referenced by
+    running containers, tagged or untagged, and old or recent.
+    """
+    rnd = random.Random(seed)
+    images = [f"sha256:{i:064x}" for i in range(size)]
+    for index, iid in enumerate(images):
+        old = rnd.random() < 0.5
+        fake.add_image(
+            iid,
+            RepoTags=[f"app{index}:latest"] if index % 3 == 0 else ["<none>:<none>"],
+            Created=epoch(rnd.uniform(31, 400) if old else rnd.uniform(0, 29)),
+            Size=rnd.randrange(1, 500) * 1024**2,
+            Labels={},
+        )
+
+    for index in range(size):
+        cid = f"{index:064x}"
+        image = rnd.choice(images)
+        age = rnd.uniform(8, 400) if rnd.random() < 0.5 else rnd.uniform(0, 6)
+        kind = rnd.random()
+        if kind < 0.2:
+            state, started, finished = "running", iso(age), "0001-01-01T00:00:00Z"
+        elif kind < 0.9:
+            state, started, finished = "exited", iso(age + 1), iso(age)
+        else:
+            state, started, finished = "created", "0001-01-01T00:00:00Z", "0001-01-01T00:00:00Z"
+        labels = {"keep": "yes"} if index % 50 == 0 else {"app": f"app{index % 7}"}
+        fake.add_container(
+            cid,
+            State=state,
+            Created=epoch(age + 1),
+            Image=image,
+            ImageID=image,
+            Labels=labels,
+            Inspect={
+                "Created": iso(age + 1),
+                "Image": image,
+                "Config": {"Labels": labels},
+                "State": {
+                    "Running": state == "running",
+                    "StartedAt": started,
+                    "FinishedAt": finished,
+                },
+            },
+        )
+
+    for index in range(size // 10):
+        fake.add_volume(f"volume{index}")
+
+
+def child(command: str, host: str) -> None:
+    """Run a single command in this process and report its wall time and peak RSS."""
+    if command == "gc":
+        from dockertidy.garbage_collector import GarbageCollector
+
+        runner: Any = GarbageCollector(host)
+    else:
+        from dockertidy.autostop import AutoStop
+
+        runner = AutoStop(host)
+
+    started = time.perf_counter()
+    runner.run()
+    seconds = time.perf_counter() - started
+    runner.close()
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    print(json.dumps({"seconds": seconds, "rss": rss}))  # noqa: T201
+
+
+def measure(command: str, size: int, latency: float, backend: str) -> dict[str, Any]:
+    fake = FakeDocker()
+    populate(fake, size)
+    fake.latency = latency
+    return run(fake, command, {"TIDY_BACKEND": backend})
+
+
+def run(fake: FakeDocker, command: str, environment: dict[str, str]) -> dict[str, Any]:
+    """Run a command against `fake` in a child process, `environment` adds to the policies."""
+    with tempfile.TemporaryDirectory() as tmp:
+        host = fake.serve_unix(Path(tmp) / "docker.sock")
+        env = {
+            **os.environ,
+            **ENVIRONMENT,
+            "TIDY_CONFIG_FILE": str(Path(tmp) / "config.yml"),
+            "TIDY_CACHE_PATH": str(Path(tmp) / "inspect.db"),
+            **environment,
+        }
+        # Inventory generation isn't counted, and each run gets a fresh process so its
+        # peak RSS isn't inflated by previous runs or by the fake daemon
+        output = subprocess.run(  # noqa: S603
+            [sys.executable, "-m", __spec__.name, "--child", command, host],
+            env=env,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        fake.shutdown()
+
+    result = json.loads(output.strip().splitlines()[-1])
+    return {
+        "api_calls": len(fake.calls),
+        "seconds": round(result["seconds"], 3),
+        "rss_mb": round(result["rss"] / 1024**2, 1),
+    }
+
+
+def compare(
+    results: dict[str, dict[str, Any]],
+    baseline: dict[str, dict[str, Any]],
+    time_tolerance: float,
+    rss_tolerance: float,
+) -> list[str]:
+    """Return a message for every measurement that regressed against the baseline."""
+    regressions = []
+    for name, result in results.items():
+        expected = baseline.get(name)
+        if expected is None:
+            continue
+        if result["api_calls"] > expected["api_calls"]:
+            regressions.append(
+                f"{name}: {result['api_calls']} API calls, baseline {expected['api_calls']}"
+            )
+        if result["seconds"] > expected["seconds"] * (1 + time_tolerance):
+            regressions.append(
+                f"{name}: {result['seconds']:.2f}s, baseline {expected['seconds']:.2f}s"
+            )
+        if result["rss_mb"] > expected["rss_mb"] * (1 + rss_tolerance):
+            regressions.append(
+                f"{name}: {result['rss_mb']:.0f}MB peak RSS, baseline {expected['rss_mb']:.0f}MB"
+            )
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--child", nargs=2, metavar=("COMMAND", "HOST"), help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--sizes", default="1000,10000", help="comma-separated numbers of containers and images"
+    )
+    parser.add_argument("--commands", default=",".join(COMMANDS))
+    parser.add_argument("--latency", type=float, default=0.0, help="daemon latency in seconds")
+    parser.add_argument("--backend", default="sync", choices=("sync", "asyncio"))
+    parser.add_argument("--baseline", type=Path, default=BASELINE)
+    parser.add_argument("--update-baseline", action="store_true")
+    parser.add_argument(
+        "--time-tolerance", type=float, default=2.0, help="allowed relative wall time increase"
+    )
+    parser.add_argument(
+        "--rss-tolerance", type=float, default=0.5, help="allowed relative peak RSS increase"
+    )
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    results = {}
+    for size in (int(value) for value in args.sizes.split(",")):
+        for command in args.commands.split(","):
+            name = f"{command}-{size}-{args.backend}"
+            results[name] = measure(command, size, args.latency, args.backend)
+            result = results[name]
+            print(  # noqa: T201
+                f"{name}: {result['api_calls']} API calls, {result['seconds']:.2f}s, "
+                f"{result['rss_mb']:.0f}MB peak RSS"
+            )
+
+    if args.latency:
+        return
+
+    baseline = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+    if args.update_baseline:
+        args.baseline.write_text(
+            json.dumps({**baseline, **results}, indent=2, sort_keys=True) + "\n"
+        )
+        return
+
+    regressions = compare(results, baseline, args.time_tolerance, args.rss_tolerance)
+    for regression in regressions:
+        print(f"regression {regression}")  # noqa: T201
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+"""Measure the import time of the CLI module and check it against a budget."""
+
+import argparse
+import re
+import statistics
+import subprocess  # noqa: S404
+import sys
+
+IMPORTTIME = re.compile(r"^import time:\s+\d+\s+\|\s+(\d+)\s+\|\s+(\S+)$")
+
+
+def import_time(module: str) -> tuple[int, dict[str, int]]:
+    """Return the cumulative import time of the module and of its dependencies in µs."""
+    result = subprocess.run(  # noqa: S603
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    cumulative: dict[str, int] = {}
+    for line in result.stderr.splitlines():
+        match = IMPORTTIME.match(line.strip())
+        if match:
+            cumulative[match.group(2)] = int(match.group(1))
+    return cumulative[module], cumulative
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--module", default="dockertidy.cli")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=400, help="budget in milliseconds")
+    parser.add_argument("--top", type=int, default=5)
+    args = parser.parse_args()
+
+    samples = []
+    cumulative: dict[str, int] = {}
+    for _ in range(args.repeat):
+        total, cumulative = import_time(args.module)
+        samples.append(total)
+    median = statistics.median(samples) / 1000
+
+    print(f"import {args.module}: median {median:.1f}ms (budget {args.budget:.0f}ms)")  # noqa: T201
+    for name, value in sorted(cumulative.items(), key=lambda item: -item[1])[1 : args.top + 1]:
+        print(f"  {name}: {value / 1000:.1f}ms")  # noqa: T201
+
+    if median > args.budget:
+        sys.exit(f"import time of {args.module} exceeds the budget")
+
+
+if __name__ == "__main__":
+    main()
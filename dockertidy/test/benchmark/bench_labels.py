@@ -0,0 +1,80 @@
+"""Benchmark the compiled label matcher against the fnmatch based implementation."""
+
+import argparse
+import fnmatch
+import random
+import timeit
+from typing import Any
+
+from dockertidy.matcher import LabelMatcher
+
+
+def fnmatch_exclude(labels: dict[str, str], rules: list[tuple[str, str | None]]) -> bool:
+    """Label exclusion as implemented before the compiled matcher."""
+    if labels:
+        for key, value in rules:
+            if value:
+                matching_keys = fnmatch.filter(labels.keys(), key)
+                if fnmatch.filter([labels[k] for k in matching_keys], value):
+                    return True
+            elif fnmatch.filter(labels.keys(), key):
+                return True
+    return False
+
+
+def generate(
+    containers: int, labels: int, rules: int, seed: int
+) -> tuple[list[dict[str, str]], list[tuple[str, str | None]]]:
+    rnd = random.Random(seed)
+    prefixes = ["com.docker.compose", "io.kubernetes.pod", "org.opencontainers.image", "app"]
+
+    def label() -> tuple[str, str]:
+        return (f"{rnd.choice(prefixes)}.key{rnd.randrange(200)}", f"value{rnd.randrange(50)}")
+
+    inventory = [dict(label() for _ in range(labels)) for _ in range(containers)]
+    exclude: list[tuple[str, str | None]] = []
+    for i in range(rules):
+        kind = i % 4
+        if kind == 0:
+            exclude.append((f"keep.exact{i}", None))
+        elif kind == 1:
+            exclude.append((f"keep.exact{i}", f"value{i}"))
+        elif kind == 2:
+            exclude.append((f"keep.wild{i}.*", None))
+        else:
+            exclude.append((f"keep.wild{i}.*", "prod-*"))
+    return inventory, exclude
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--containers", type=int, default=2000)
+    parser.add_argument("--labels", type=int, default=30)
+    parser.add_argument("--rules", type=int, default=40)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    inventory, rules = generate(args.containers, args.labels, args.rules, seed=42)
+    matcher = LabelMatcher(rules)
+
+    results: dict[str, Any] = {}
+    for name, func in {
+        "fnmatch": lambda: [fnmatch_exclude(labels, rules) for labels in inventory],
+        "compiled": lambda: [matcher.matches(labels) for labels in inventory],
+    }.items():
+        results[name] = min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    assert [fnmatch_exclude(labels, rules) for labels in inventory] == [
+        matcher.matches(labels) for labels in inventory
+    ]
+
+    print(  # noqa: T201
+        f"{args.containers} containers x {args.labels} labels x {args.rules} rules: "
+        f"fnmatch {results['fnmatch'] * 1000:.1f}ms, "
+        f"compiled {results['compiled'] * 1000:.1f}ms, "
+        f"speedup {results['fnmatch'] / results['compiled']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""Check that peak RSS of a gc run doesn't grow with the size of inspect results."""
+
+import argparse
+import datetime
+import sys
+import tempfile
+
+from dockertidy.test.benchmark.bench_gc import populate, run
+from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+
+def pad(fake: FakeDocker, payload: int, inspect_created: bool = False) -> None:
+    """
+    Grow the inspect result of every container and image by `payload` bytes.
+
+    Real inspect results carry environment, mounts, network settings and image
+    config that gc never reads. List summaries stay the same size. With
+    `inspect_created` image summaries lack a usable creation time, so every image
+    is inspected before its age is known.
+    """
+    env = ["PADDING=" + "x" * payload] if payload else []
+    for container in fake.containers.values():
+        container["Inspect"]["Config"]["Env"] = env
+    for index, (iid, image) in enumerate(fake.images.items()):
+        image["Inspect"] = {
+            "RootFS": {"Layers": [f"sha256:base{index % 10:059d}", f"sha256:{iid[7:]}"]},
+            "Config": {"Env": env},
+        }
+        if inspect_created:
+            created = datetime.datetime.fromtimestamp(image["Created"], tz=datetime.UTC)
+            image["Inspect"]["Created"] = created.isoformat()
+            image["Created"] = None
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=2000, help="number of containers and images")
+    parser.add_argument(
+        "--payloads", default="0,16,64", help="comma-separated inspect padding in KiB"
+    )
+    parser.add_argument(
+        "--tolerance", type=float, default=0.25, help="allowed relative peak RSS increase"
+    )
+    args = parser.parse_args()
+
+    # A dry run with an unreachable free space target inspects every container and
+    # image, plans the removals by space and logs what the age policies would remove
+    environment = {
+        "TIDY_DRY_RUN": "true",
+        "TIDY_GC_MIN_FREE_DISK_SPACE": "100%",
+        "TIDY_GC_DISK_PATH": tempfile.gettempdir(),
+    }
+    payloads = [int(value) for value in args.payloads.split(",")]
+    regressions = []
+    for inspect_created in (False, True):
+        kind = "inspect-created" if inspect_created else "summary-created"
+        results = {}
+        for payload in payloads:
+            fake = FakeDocker()
+            populate(fake, args.size)
+            pad(fake, payload * 1024, inspect_created)
+            results[payload] = run(fake, "gc", environment)
+            inspected = args.size * 2 * payload / 1024
+            print(  # noqa: T201
+                f"gc-{args.size}-{kind}-{payload}KiB: {results[payload]['api_calls']} API calls, "
+                f"{results[payload]['rss_mb']:.0f}MB peak RSS, {inspected:.0f}MB inspected"
+            )
+
+        smallest, largest = results[min(payloads)], results[max(payloads)]
+        if largest["rss_mb"] > smallest["rss_mb"] * (1 + args.tolerance):
+            regressions.append(
+                f"gc-{args.size}-{kind}: {smallest['rss_mb']:.0f}MB peak RSS with "
+                f"{min(payloads)}KiB inspect results, {largest['rss_mb']:.0f}MB with "
+                f"{max(payloads)}KiB"
+            )
+
+    for regression in regressions:
+        print(f"regression {regression}")  # noqa: T201
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
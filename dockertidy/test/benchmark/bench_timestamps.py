@@ -0,0 +1,55 @@
+"""Benchmark docker timestamp parsing against dateutil."""
+
+import argparse
+import datetime
+import random
+import timeit
+
+import dateutil.parser
+
+from dockertidy.parser import YEAR_ZERO, parse_timestamp
+
+
+def generate(count: int, seed: int) -> list[str]:
+    """Docker style RFC 3339 timestamps with nanoseconds, some of them zero."""
+    rnd = random.Random(seed)
+    start = datetime.datetime(2020, 1, 1, tzinfo=datetime.UTC)
+    timestamps = []
+    for _ in range(count):
+        if rnd.random() < 0.05:
+            timestamps.append(YEAR_ZERO)
+            continue
+        value = start + datetime.timedelta(seconds=rnd.randrange(5 * 365 * 86400))
+        timestamps.append(f"{value:%Y-%m-%dT%H:%M:%S}.{rnd.randrange(10**9):09d}Z")
+    return timestamps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--timestamps", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    timestamps = generate(args.timestamps, seed=42)
+
+    results = {}
+    for name, func in {
+        "dateutil": lambda: [dateutil.parser.parse(value) for value in timestamps],
+        "native": lambda: [parse_timestamp(value) for value in timestamps],
+    }.items():
+        results[name] = min(timeit.repeat(func, number=1, repeat=args.repeat))
+
+    for value in timestamps:
+        expected = None if value == YEAR_ZERO else dateutil.parser.parse(value)
+        assert parse_timestamp(value) == expected
+
+    print(  # noqa: T201
+        f"{args.timestamps} timestamps: "
+        f"dateutil {results['dateutil'] * 1000:.1f}ms, "
+        f"native {results['native'] * 1000:.1f}ms, "
+        f"speedup {results['dateutil'] / results['native']:.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    main()
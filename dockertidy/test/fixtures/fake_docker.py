@@ -0,0 +1,225 @@
+"""Fake docker daemon serving a small part of the engine API."""
+
+import json
+import re
+import socketserver
+import threading
+import time
+from collections.abc import Callable, Iterator
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import pytest
+
+
+class FakeDocker:
+    """In-memory docker host, served over HTTP/1.1 by `serve_unix` or `serve_tcp`."""
+
+    API_VERSION = "1.43"
+
+    def __init__(self) -> None:
+        self.containers: dict[str, dict[str, Any]] = {}
+        self.images: dict[str, dict[str, Any]] = {}
+        self.volumes: dict[str, dict[str, Any]] = {}
+        self.events: list[dict[str, Any]] = []
+        self.calls: list[tuple[str, str]] = []
+        self.latency = 0.0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.servers: list[socketserver.BaseServer] = []
+
+    def add_container(self, cid: str, **attrs: Any) -> None:
+        self.containers[cid] = {"Id": cid, "Names": [f"/{cid}"], "State": "exited", **attrs}
+
+    def add_image(self, iid: str, **attrs: Any) -> None:
+        self.images[iid] = {"Id": iid, "RepoTags": [], "Created": 0, **attrs}
+
+    def add_volume(self, name: str) -> None:
+        self.volumes[name] = {"Name": name, "Driver": "local"}
+
+    def handle(self, method: str, path: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+        with self.lock:
+            self.calls.append((method, path))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+            return self.route(method, path, query)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+
+    def route(self, method: str, path: str, query: dict[str, list[str]]) -> tuple[int, Any]:
+        if path == "/version":
+            return 200, {"ApiVersion": self.API_VERSION, "Version": "24.0.0"}
+
+        path = re.sub(r"^/v[0-9.]+", "", path)
+        match method, path.split("/")[1:]:
+            case "GET", ["containers", "json"]:
+                return 200, self.list_containers(query)
+            case "GET", ["images", "json"]:
+                return 200, [self.summary(image) for image in self.images.values()]
+            case "GET", ["volumes"]:
+                return 200, {"Volumes": list(self.volumes.values()), "Warnings": None}
+            case "GET", ["containers", cid, "json"] if cid in self.containers:
+                summary = self.containers[cid]
+                return 200, {"Id": cid, "Name": summary["Names"][0], **summary.get("Inspect", {})}
+            case "GET", ["images", *name, "json"] if "/".join(name) in self.images:
+                image = self.images["/".join(name)]
+                return 200, {**self.summary(image), **image.get("Inspect", {})}
+            case "GET", ["system", "df"]:
+                return 200, self.disk_usage()
+            case "DELETE", ["containers", cid] if cid in self.containers:
+                del self.containers[cid]
+                return 204, None
+            case "DELETE", ["images", *name] if "/".join(name) in self.images:
+                del self.images["/".join(name)]
+                return 200, [{"Deleted": "/".join(name)}]
+            case "DELETE", ["volumes", name] if name in self.volumes:
+                del self.volumes[name]
+                return 204, None
+            case "POST", ["containers", cid, "stop"] if cid in self.containers:
+                self.containers[cid]["State"] = "exited"
+                return 204, None
+            case _, [kind, name, *_]:
+                return 404, {"message": f"No such {kind.rstrip('s')}: {unquote(name)}"}
+        raise AssertionError(f"unexpected request {method} {path} {query}")
+
+    def list_containers(self, query: dict[str, list[str]]) -> list[dict[str, Any]]:
+        """List containers honouring the `all` flag and the `status` filter like dockerd."""
+        filters = json.loads(query.get("filters", ["{}"])[0])
+        if "status" in filters:
+            states = set(filters["status"])
+        elif query.get("all", ["0"])[0] in ("1", "true", "True"):
+            states = None
+        else:
+            states = {"running"}
+        return [
+            self.summary(c)
+            for c in self.containers.values()
+            if states is None or c["State"] in states
+        ]
+
+    @staticmethod
+    def summary(obj: dict[str, Any]) -> dict[str, Any]:
+        """Return the list representation of an object, without its inspect-only fields."""
+        return {key: value for key, value in obj.items() if key != "Inspect"}
+
+    def disk_usage(self) -> dict[str, Any]:
+        """Report image sizes like `/system/df`, shared sizes are left uncomputed."""
+        return {
+            "Images": [
+                {"Id": iid, "Size": image.get("Size", 0), "SharedSize": -1, "Containers": 0}
+                for iid, image in self.images.items()
+            ],
+            "Containers": [],
+            "Volumes": [],
+        }
+
+    def stream_events(self) -> Iterator[dict[str, Any]]:
+        yield from self.events
+
+    def serve_unix(self, path: Path) -> str:
+        server = _UnixServer(str(path), _Handler)
+        return self._serve(server, f"unix://{path}")
+
+    def serve_tcp(self) -> str:
+        server = _TCPServer(("127.0.0.1", 0), _Handler)
+        return self._serve(server, f"tcp://127.0.0.1:{server.server_address[1]}")
+
+    def shutdown(self) -> None:
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def _serve(self, server: Any, url: str) -> str:
+        server.daemon_threads = True
+        server.fake = self
+        self.servers.append(server)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return url
+
+
+class _UnixServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+    request_queue_size = 128
+
+
+class _TCPServer(ThreadingHTTPServer):
+    request_queue_size = 128
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        self._dispatch("GET")
+
+    def do_POST(self) -> None:
+        self._dispatch("POST")
+
+    def do_DELETE(self) -> None:
+        self._dispatch("DELETE")
+
+    def log_message(self, format: str, *args: Any) -> None:  # noqa: A002
+        pass
+
+    def _dispatch(self, method: str) -> None:
+        fake: FakeDocker = self.server.fake  # type: ignore[attr-defined]
+        url = urlsplit(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+
+        if url.path.endswith("/events"):
+            self._send_events(fake)
+            return
+
+        status, body = fake.handle(method, unquote(url.path), parse_qs(url.query))
+        data = b"" if body is None else json.dumps(body).encode()
+        self.send_response(status)
+        if data:
+            self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _send_events(self, fake: FakeDocker) -> None:
+        with fake.lock:
+            fake.calls.append(("GET", "/events"))
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for event in fake.stream_events():
+            data = json.dumps(event).encode() + b"\n"
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+@pytest.fixture
+def fake_docker() -> Iterator[FakeDocker]:
+    fake = FakeDocker()
+    yield fake
+    fake.shutdown()
+
+
+@pytest.fixture
+def fake_docker_hosts(tmp_path: Path) -> Iterator[Callable[[int], list[tuple[str, FakeDocker]]]]:
+    fakes: list[FakeDocker] = []
+
+    def serve(count: int) -> list[tuple[str, FakeDocker]]:
+        hosts = []
+        for _ in range(count):
+            fake = FakeDocker()
+            fakes.append(fake)
+            hosts.append((fake.serve_unix(tmp_path / f"docker{len(fakes)}.sock"), fake))
+        return hosts
+
+    yield serve
+    for fake in fakes:
+        fake.shutdown()
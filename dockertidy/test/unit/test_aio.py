@@ -0,0 +1,146 @@
+"""Test asyncio docker client."""
+
+from collections.abc import Iterator
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import docker
+import pytest
+import requests
+from pytest_mock import MockFixture
+
+from dockertidy import autostop, garbage_collector
+from dockertidy.aio import AsyncioClient
+
+if TYPE_CHECKING:
+    from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+pytest_plugins = [
+    "dockertidy.test.fixtures.fake_docker",
+]
+
+
+@pytest.fixture
+def client(fake_docker: "FakeDocker", tmp_path: Path) -> Iterator[AsyncioClient]:
+    client = AsyncioClient(fake_docker.serve_unix(tmp_path / "docker.sock"), timeout=5)
+    yield client
+    client.close()
+
+
+def test_list_inspect_remove(fake_docker: "FakeDocker", client: AsyncioClient) -> None:
+    fake_docker.add_container("c1")
+    fake_docker.add_image("sha256:i1")
+    fake_docker.add_volume("v1")
+
+    assert client.api_version == fake_docker.API_VERSION
+    assert [c["Id"] for c in client.containers(all=True)] == ["c1"]
+    assert client.inspect_container("c1")["Name"] == "/c1"
+    assert client.images()[0]["Id"] == "sha256:i1"
+    assert client.volumes({"dangling": True})["Volumes"][0]["Name"] == "v1"
+
+    client.remove_container("c1", v=True)
+    assert client.remove_image("sha256:i1") == [{"Deleted": "sha256:i1"}]
+    client.remove_volume("v1")
+    assert not fake_docker.containers
+    assert not fake_docker.images
+    assert not fake_docker.volumes
+    assert ("DELETE", f"/v{fake_docker.API_VERSION}/containers/c1") in fake_docker.calls
+
+
+def test_errors_match_docker_sdk(fake_docker: "FakeDocker", client: AsyncioClient) -> None:
+    with pytest.raises(docker.errors.ImageNotFound):
+        client.inspect_image("missing")
+    with pytest.raises(docker.errors.NotFound) as e:
+        client.remove_container("missing")
+    assert e.value.status_code == 404
+
+    fake_docker.add_container("slow")
+    fake_docker.latency = 0.5
+    client._client.timeout = 0.1
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        client.inspect_container("slow")
+
+
+def test_tcp_host(fake_docker: "FakeDocker", monkeypatch: pytest.MonkeyPatch) -> None:
+    fake_docker.add_container("c1")
+    monkeypatch.setenv("DOCKER_HOST", fake_docker.serve_tcp())
+
+    client = AsyncioClient(timeout=5)
+    try:
+        assert client.base_url.startswith("http://127.0.0.1:")
+        assert client.inspect_container("c1")["Id"] == "c1"
+    finally:
+        client.close()
+
+
+def test_tls_host_unsupported(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setenv("DOCKER_TLS_VERIFY", "1")
+
+    with pytest.raises(docker.errors.DockerException, match="sync backend"):
+        AsyncioClient("tcp://127.0.0.1:2376")
+
+
+def test_map_bounds_requests_in_flight(fake_docker: "FakeDocker", tmp_path: Path) -> None:
+    for i in range(40):
+        fake_docker.add_container(f"c{i:02d}")
+    fake_docker.latency = 0.02
+    client = AsyncioClient(fake_docker.serve_unix(tmp_path / "docker.sock"), max_in_flight=8)
+
+    try:
+        ids = [f"c{i:02d}" for i in range(40)]
+        results = [f.result()["Id"] for _, f in client.map("inspect_container", "container", ids)]
+    finally:
+        client.close()
+
+    assert results == ids
+    assert 1 < fake_docker.max_in_flight <= 8
+
+
+def test_events(fake_docker: "FakeDocker", client: AsyncioClient) -> None:
+    fake_docker.events = [
+        {"Type": "container", "Action": "start", "Actor": {"ID": "c1"}, "time": 1},
+        {"Type": "image", "Action": "delete", "Actor": {"ID": "i1"}, "time": 2},
+    ]
+
+    stream = client.events(since=0, filters={"type": ["container"]}, decode=True)
+    assert [event["Action"] for event in stream] == ["start", "delete"]
+    stream.close()
+
+
+def test_gc_with_asyncio_backend(
+    mocker: MockFixture, fake_docker: "FakeDocker", client: AsyncioClient
+) -> None:
+    for i in range(20):
+        finished = "2014-01-01T01:01:01Z" if i % 2 else "2999-01-01T01:01:01Z"
+        fake_docker.add_container(
+            f"c{i:02d}", Inspect={"Created": finished, "State": {"FinishedAt": finished}}
+        )
+    mocker.patch.object(garbage_collector.GarbageCollector, "_get_docker_client")
+    gc = garbage_collector.GarbageCollector()
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    mocker.patch.dict(
+        gc.config.config["gc"], {"max_container_age": "1 day", "exclude_container_labels": []}
+    )
+
+    gc.docker = client
+    gc.cleanup_containers()
+
+    assert sorted(fake_docker.containers) == [f"c{i:02d}" for i in range(0, 20, 2)]
+
+
+def test_autostop_with_asyncio_backend(
+    mocker: MockFixture, fake_docker: "FakeDocker", client: AsyncioClient
+) -> None:
+    for cid, started in [("old", "2014-01-01T01:01:01Z"), ("new", "2999-01-01T01:01:01Z")]:
+        fake_docker.add_container(cid, State="running", Inspect={"State": {"StartedAt": started}})
+    mocker.patch.object(autostop.AutoStop, "_get_docker_client")
+    stop = autostop.AutoStop()
+    mocker.patch.dict(stop.config.config, {"dry_run": False})
+    mocker.patch.dict(stop.config.config["stop"], {"max_run_time": "1 day ago", "prefix": []})
+
+    stop.docker = client
+    stop.stop_containers()
+
+    assert [path for method, path in fake_docker.calls if method == "POST"] == [
+        f"/v{fake_docker.API_VERSION}/containers/old/stop"
+    ]
@@ -2,11 +2,13 @@
 # cspell:ignore asdb
 
 import docker
+import requests
 import pytest
 import datetime
 
 from typing import Any
-from dockertidy import autostop
+from dockertidy import autostop, metrics, resilience
+from dockertidy.inventory import Inventory
 from pytest_mock import MockFixture
 pytest_plugins = [
     "dockertidy.test.fixtures.fixtures",
@@ -33,6 +35,18 @@ def test_stop_container(autostop_fixture: autostop.AutoStop, mocker: MockFixture
     client.stop.assert_called_once_with(cid)
 
 
+def test_stop_container_retries(autostop_fixture: autostop.AutoStop, mocker: MockFixture) -> None:
+    mocker.patch.dict(autostop_fixture.config.config["retry"], {"attempts": 1, "backoff": 0.0})
+    mocker.patch("dockertidy.resilience.time.sleep")
+    autostop_fixture.retry = resilience.get_retry_policy(autostop_fixture.config.config)
+    client = mocker.create_autospec(docker.APIClient)
+    client.stop.side_effect = [requests.exceptions.ReadTimeout(), None]
+
+    autostop_fixture._stop_container(client, "asdb")
+    assert client.stop.call_args_list == [mocker.call("asdb")] * 2
+    assert autostop_fixture.stopped == ["asdb"]
+
+
 def test_build_container_matcher(autostop_fixture: autostop.AutoStop, mocker: MockFixture) -> None:
     prefixes = ["one_", "two_"]
     matcher = autostop_fixture._build_container_matcher(prefixes)
@@ -49,3 +63,69 @@ def test_has_been_running_since_true(autostop_fixture: autostop.AutoStop, contai
 
 def test_has_been_running_since_false(autostop_fixture: autostop.AutoStop, container: dict[str, Any], earlier_time: datetime.datetime) -> None:
     assert not autostop_fixture._has_been_running_since(container, earlier_time)
+
+
+def test_stop_containers_live_inventory(autostop_fixture: autostop.AutoStop, mocker: MockFixture) -> None:
+    mocker.patch.dict(autostop_fixture.config.config["stop"], {"max_run_time": "1 day ago", "prefix": []})
+    mocker.patch.dict(autostop_fixture.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = [
+        {"Id": "long", "Names": ["/long"], "State": "running"},
+        {"Id": "short", "Names": ["/short"], "State": "running"},
+        {"Id": "stopped", "Names": ["/stopped"], "State": "exited"},
+    ]
+    autostop_fixture.docker = client
+    autostop_fixture.live_inventory = Inventory(
+        lambda: client.containers(all=True), lambda: []
+    )
+    now = datetime.datetime.now(tz=datetime.UTC)
+    autostop_fixture.live_inventory.container_started("long", now - datetime.timedelta(days=3))
+    autostop_fixture.live_inventory.container_started("short", now)
+
+    autostop_fixture.stop_containers()
+
+    client.inspect_container.assert_not_called()
+    client.stop.assert_called_once_with("long")
+
+
+def test_run_summary(autostop_fixture: autostop.AutoStop, mocker: MockFixture) -> None:
+    mocker.patch.dict(autostop_fixture.config.config["stop"], {"max_run_time": "1 day ago", "prefix": []})
+    mocker.patch.dict(autostop_fixture.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = [{"Id": "long"}, {"Id": "short"}]
+    now = datetime.datetime.now(tz=datetime.UTC)
+    client.inspect_container.side_effect = lambda cid: {
+        "Id": cid,
+        "Name": f"/{cid}",
+        "State": {"StartedAt": (now - datetime.timedelta(days=3 if cid == "long" else 0)).isoformat()},
+    }
+    autostop_fixture.docker = client
+
+    autostop_fixture.run()
+
+    summary = autostop_fixture.summary.to_dict()
+    assert summary["command"] == "stop"
+    assert summary["api_calls"] == 4
+    assert (summary["candidates"], summary["removed"], summary["failed"]) == (1, 1, 0)
+    assert [phase["name"] for phase in summary["phases"]] == ["stop_containers"]
+
+
+def test_inspect_containers_is_instrumented(autostop_fixture: autostop.AutoStop, mocker: MockFixture) -> None:
+    mocker.patch.dict(autostop_fixture.config.config["retry"], {"attempts": 1, "backoff": 0.0})
+    mocker.patch("dockertidy.resilience.time.sleep")
+    autostop_fixture.retry = resilience.get_retry_policy(autostop_fixture.config.config)
+    autostop_fixture.host = "tcp://node1:2375"
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.__name__ = "containers"
+    client.containers.return_value = [{"Id": "asdb"}]
+    client.inspect_container.__name__ = "inspect_container"
+    client.inspect_container.side_effect = [requests.exceptions.ReadTimeout(), {"Id": "asdb"}]
+    autostop_fixture.docker = client
+    calls = metrics.API_CALL_DURATION.value(endpoint="inspect_container", host="tcp://node1:2375")
+
+    assert list(autostop_fixture._get_running_containers()) == [{"Id": "asdb"}]
+    assert client.inspect_container.call_count == 2
+    assert metrics.API_CALL_DURATION.value(
+        endpoint="inspect_container", host="tcp://node1:2375"
+    ) == calls + 1
+    assert autostop_fixture.summary.api_calls == 2
@@ -0,0 +1,64 @@
+"""Test InspectCache class."""
+
+import pathlib
+from typing import Any
+
+from dockertidy.cache import InspectCache
+
+
+def image(image_id: str) -> dict[str, Any]:
+    return {
+        "Id": image_id,
+        "Created": "2024-06-01T00:00:00Z",
+        "Size": 100,
+        "RootFS": {"Type": "layers", "Layers": [f"sha256:{image_id}"]},
+        "Parent": "",
+        "RepoTags": [f"{image_id}:latest"],
+    }
+
+
+def test_round_trip(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "cache" / "inspect.db")
+    cache = InspectCache(path, 100)
+
+    assert cache.get("a") is None
+    entry = cache.put(image("a"))
+    assert "RepoTags" not in entry
+    cache.save()
+
+    cache = InspectCache(path, 100)
+    assert cache.get("a") == entry
+    assert cache.get("b") is None
+
+
+def test_save_evicts_absent_images(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "inspect.db")
+    cache = InspectCache(path, 100)
+    cache.put(image("a"))
+    cache.put(image("b"))
+    cache.save()
+
+    cache.put(image("c"))
+    cache.save(present=["b"])
+
+    cache = InspectCache(path, 100)
+    assert cache.get("a") is None
+    assert cache.get("b") is not None
+    assert cache.get("c") is None
+
+
+def test_save_caps_entries(tmp_path: pathlib.Path) -> None:
+    path = str(tmp_path / "inspect.db")
+    cache = InspectCache(path, 2)
+    cache.put(image("a"))
+    cache.save()
+    cache.put(image("b"))
+    cache.put(image("c"))
+    cache.save()
+
+    cache = InspectCache(path, 2)
+    assert [cache.get(image_id) is not None for image_id in ("a", "b", "c")] == [
+        False,
+        True,
+        True,
+    ]
@@ -0,0 +1,91 @@
+"""Test the gc candidate pipeline."""
+
+import datetime
+from collections.abc import Iterator
+
+import pytest
+
+from dockertidy.candidates import ImageCandidate, fill_in_order
+
+
+def test_image_candidate() -> None:
+    summary = {"Id": "sha256:abcdef0123456789abcd", "RepoTags": ["app:1", "app:latest"]}
+    details = {
+        "Created": "2024-01-02T03:04:05.123456789Z",
+        "Size": 42,
+        "Parent": "sha256:base",
+        "RootFS": {"Layers": ["sha256:one", "sha256:two"]},
+        "Config": {"Env": ["PADDING=" + "x" * 1024]},
+    }
+
+    candidate = ImageCandidate(summary, details)
+
+    assert candidate.created == datetime.datetime(2024, 1, 2, 3, 4, 5, 123456, datetime.UTC)
+    assert candidate.size == 42
+    assert candidate.base == "sha256:base"
+    assert candidate.layers == ("sha256:one", "sha256:two")
+    assert str(candidate) == "sha256:abcdef012 app:1, app:latest"
+    with pytest.raises(AttributeError):
+        candidate.config = details["Config"]  # type: ignore[attr-defined]
+
+
+def test_image_candidate_from_summary() -> None:
+    summary = {"Id": "abcd", "RepoTags": ["<none>:<none>"], "Created": 1388538061, "Size": 7}
+
+    candidate = ImageCandidate(summary, summary)
+    assert candidate.created == datetime.datetime(2014, 1, 1, 1, 1, 1, tzinfo=datetime.UTC)
+    assert candidate.layers is None
+    assert str(candidate) == "abcd "
+
+    candidate = ImageCandidate(summary)
+    assert candidate.created is None
+    assert candidate.size == 7
+
+
+def test_fill_in_order() -> None:
+    fetched: list[int] = []
+
+    def fetch(missing: Iterator[int]) -> Iterator[str | None]:
+        # Read two items ahead, like the inspect pools do
+        window = []
+        for item in missing:
+            fetched.append(item)
+            window.append(item)
+            if len(window) > 2:
+                value = window.pop(0)
+                yield None if value == 5 else f"fetched {value}"
+        for value in window:
+            yield f"fetched {value}"
+
+    result = list(
+        fill_in_order(range(10), lambda item: f"known {item}" if item % 3 == 0 else None, fetch)
+    )
+
+    assert fetched == [1, 2, 4, 5, 7, 8]
+    assert result == [
+        (0, "known 0"),
+        (1, "fetched 1"),
+        (2, "fetched 2"),
+        (3, "known 3"),
+        (4, "fetched 4"),
+        (5, None),
+        (6, "known 6"),
+        (7, "fetched 7"),
+        (8, "fetched 8"),
+        (9, "known 9"),
+    ]
+
+
+def test_fill_in_order_is_lazy() -> None:
+    consumed: list[int] = []
+
+    def items() -> Iterator[int]:
+        for item in range(1000):
+            consumed.append(item)
+            yield item
+
+    pairs = fill_in_order(items(), lambda item: None, lambda missing: (-item for item in missing))
+
+    assert next(pairs) == (0, 0)
+    assert next(pairs) == (1, -1)
+    assert consumed == [0, 1]
@@ -0,0 +1,64 @@
+"""Test DockerTidy class."""
+
+import subprocess
+import sys
+
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy import cli
+from dockertidy.logger import Log
+
+
+def test_import_is_lazy() -> None:
+    code = (
+        "import sys, dockertidy.cli; "
+        "print(sorted(m for m in ('dateparser', 'docker') if m in sys.modules))"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize(
+    ("command", "created"),
+    [("gc", ["GarbageCollector"]), ("stop", ["AutoStop"])],
+)
+def test_run_creates_selected_command(
+    mocker: MockFixture, command: str, created: list[str]
+) -> None:
+    gc = mocker.patch("dockertidy.garbage_collector.GarbageCollector", autospec=True)
+    stop = mocker.patch("dockertidy.autostop.AutoStop", autospec=True)
+    tidy = object.__new__(cli.DockerTidy)
+    tidy.config = mocker.Mock(
+        config={"command": command, "hosts": [], "profile": {"mode": "", "path": "", "top": 25}}
+    )
+
+    tidy.run()
+
+    classes = {"GarbageCollector": gc, "AutoStop": stop}
+    for name, cls in classes.items():
+        assert cls.called == (name in created)
+        if name in created:
+            cls.return_value.run.assert_called_once_with()
+
+
+@pytest.mark.parametrize("summary", ["-", ""])
+def test_get_config_moves_logs_off_stdout_for_summary(
+    mocker: MockFixture, capsys: pytest.CaptureFixture[str], summary: str
+) -> None:
+    config = mocker.patch.object(cli, "SingleConfig", autospec=True)
+    config.return_value.config = {"logging": {"level": "INFO"}, "summary": summary}
+    config.return_value.config_file = "config.yml"
+    tidy = object.__new__(cli.DockerTidy)
+    tidy.log = Log(name=f"dockertidy-test-summary{summary}")  # type: ignore[assignment]
+    tidy.logger = tidy.log.logger
+    tidy.args = {}
+
+    tidy._get_config()
+
+    captured = capsys.readouterr()
+    assert ("Using config file" in captured.out) == (summary != "-")
+    assert ("Using config file" in captured.err) == (summary == "-")
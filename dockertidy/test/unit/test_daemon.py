@@ -0,0 +1,123 @@
+"""Test Daemon class."""
+
+import sqlite3
+
+import docker
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy import daemon
+from dockertidy.autostop import AutoStop
+from dockertidy.garbage_collector import GarbageCollector
+from dockertidy.inventory import Inventory
+
+
+@pytest.fixture
+def daemon_fixture(mocker: MockFixture) -> daemon.Daemon:
+    gc = mocker.create_autospec(GarbageCollector, instance=True)
+    gc.docker = mocker.create_autospec(docker.APIClient)
+    stop = mocker.create_autospec(AutoStop, instance=True)
+    return daemon.Daemon(gc, stop)
+
+
+def test_run_schedules_jobs(mocker: MockFixture, daemon_fixture: daemon.Daemon) -> None:
+    mocker.patch.dict(
+        daemon_fixture.config.config,
+        {"daemon": {"gc_interval": 0.01, "stop_interval": 0.025, "events": False}},
+    )
+    calls: list[str] = []
+    running = False
+
+    def job(name: str) -> None:
+        nonlocal running
+        assert not running
+        running = True
+        calls.append(name)
+        if len(calls) == 6:
+            daemon_fixture.shutdown()
+        running = False
+
+    mocker.patch.object(daemon_fixture.gc, "run", side_effect=lambda: job("gc"))
+    mocker.patch.object(daemon_fixture.stop, "run", side_effect=lambda: job("stop"))
+
+    daemon_fixture.run()
+
+    assert calls[:2] == ["gc", "stop"]
+    assert calls.count("gc") > calls.count("stop")
+    assert daemon_fixture.stop.docker is daemon_fixture.gc.docker
+
+
+def test_run_job_failure_keeps_running(
+    mocker: MockFixture, daemon_fixture: daemon.Daemon
+) -> None:
+    mocker.patch.dict(
+        daemon_fixture.config.config,
+        {"daemon": {"gc_interval": 0.01, "stop_interval": 0, "events": False}},
+    )
+    runs = 0
+
+    def run() -> None:
+        nonlocal runs
+        runs += 1
+        if runs == 1:
+            raise docker.errors.APIError("daemon unavailable")
+        daemon_fixture.shutdown()
+
+    mocker.patch.object(daemon_fixture.gc, "run", side_effect=run)
+
+    daemon_fixture.run()
+
+    assert runs == 2
+
+
+@pytest.mark.parametrize(
+    "error", [KeyError("Id"), sqlite3.OperationalError("database is locked"), SystemExit(1)]
+)
+def test_run_job_unexpected_error_keeps_running(
+    mocker: MockFixture, daemon_fixture: daemon.Daemon, error: BaseException
+) -> None:
+    mocker.patch.dict(
+        daemon_fixture.config.config,
+        {"daemon": {"gc_interval": 0.01, "stop_interval": 0, "events": False}},
+    )
+    runs = 0
+
+    def run() -> None:
+        nonlocal runs
+        runs += 1
+        if runs == 1:
+            raise error
+        daemon_fixture.shutdown()
+
+    mocker.patch.object(daemon_fixture.gc, "run", side_effect=run)
+    logger = mocker.patch.object(daemon_fixture, "logger")
+
+    daemon_fixture.run()
+
+    assert runs == 2
+    assert "Job gc failed unexpectedly" in logger.exception.call_args.args[0]
+
+
+def test_run_shares_live_inventory(mocker: MockFixture, daemon_fixture: daemon.Daemon) -> None:
+    mocker.patch.dict(
+        daemon_fixture.config.config,
+        {"daemon": {"gc_interval": 60, "stop_interval": 60, "events": True}},
+    )
+    inventory = Inventory(list, list)
+    mocker.patch.object(daemon_fixture.gc, "create_inventory", return_value=inventory)
+    watcher = mocker.patch.object(daemon, "EventWatcher", autospec=True)
+    seen = []
+
+    def run() -> None:
+        seen.append((daemon_fixture.gc.live_inventory, daemon_fixture.stop.live_inventory))
+        daemon_fixture.shutdown()
+
+    mocker.patch.object(daemon_fixture.gc, "run", side_effect=run)
+
+    daemon_fixture.run()
+
+    assert seen == [(inventory, inventory)]
+    watcher.assert_called_once_with(daemon_fixture.gc.docker, inventory)
+    watcher.return_value.start.assert_called_once_with()
+    watcher.return_value.stop.assert_called_once_with()
+    assert daemon_fixture.gc.live_inventory is None
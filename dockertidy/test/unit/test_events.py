@@ -0,0 +1,116 @@
+"""Test EventWatcher class."""
+
+import datetime
+from typing import Any
+
+import pytest
+import requests
+from pytest_mock import MockFixture
+
+from dockertidy.events import EventWatcher
+from dockertidy.inventory import Inventory
+
+
+def event(kind: str, action: str, actor: str, time: int = 1700000000) -> dict[str, Any]:
+    return {
+        "Type": kind,
+        "Action": action,
+        "Actor": {"ID": actor, "Attributes": {}},
+        "time": time,
+        "timeNano": time * 10**9,
+    }
+
+
+@pytest.fixture
+def listings() -> dict[str, int]:
+    return {"containers": 0, "images": 0, "volumes": 0}
+
+
+@pytest.fixture
+def inventory(listings: dict[str, int]) -> Inventory:
+    def load(kind: str, items: list[dict[str, Any]]) -> Any:
+        def loader() -> list[dict[str, Any]]:
+            listings[kind] += 1
+            return [dict(item) for item in items]
+
+        return loader
+
+    return Inventory(
+        load("containers", [{"Id": "c1", "State": "running"}, {"Id": "c2", "State": "exited"}]),
+        load("images", [{"Id": "sha256:i1"}, {"Id": "sha256:i2"}]),
+        load("volumes", [{"Name": "v1"}]),
+    )
+
+
+def test_apply_container_events(
+    mocker: MockFixture, inventory: Inventory, listings: dict[str, int]
+) -> None:
+    watcher = EventWatcher(mocker.Mock(), inventory)
+    inventory.containers
+
+    watcher.apply(event("container", "die", "c1", 1700000100))
+    watcher.apply(event("container", "start", "c2", 1700000200))
+    watcher.apply(event("container", "destroy", "c3"))
+
+    assert {c["Id"]: c["State"] for c in inventory.containers} == {
+        "c1": "exited",
+        "c2": "running",
+    }
+    assert inventory.finished_at("c1") == datetime.datetime(
+        2023, 11, 14, 22, 15, tzinfo=datetime.UTC
+    )
+    assert inventory.finished_at("c2") is None
+    assert inventory.started_at("c2") is not None
+    assert listings["containers"] == 1
+
+    watcher.apply(event("container", "create", "c3"))
+    inventory.containers
+    assert listings["containers"] == 2
+
+
+def test_apply_image_and_volume_events(
+    mocker: MockFixture, inventory: Inventory, listings: dict[str, int]
+) -> None:
+    watcher = EventWatcher(mocker.Mock(), inventory)
+    inventory.images
+    inventory.volumes
+
+    watcher.apply(event("image", "delete", "sha256:i1"))
+    watcher.apply(event("volume", "destroy", "v1"))
+
+    assert [image["Id"] for image in inventory.images] == ["sha256:i2"]
+    assert inventory.volumes == []
+    assert listings == {"containers": 0, "images": 1, "volumes": 1}
+
+    watcher.apply(event("image", "pull", "alpine:latest"))
+    watcher.apply(event("volume", "create", "v2"))
+    inventory.images
+    inventory.volumes
+    assert listings == {"containers": 0, "images": 2, "volumes": 2}
+
+
+def test_watch_reconciles_after_interruption(
+    mocker: MockFixture, inventory: Inventory, listings: dict[str, int]
+) -> None:
+    client = mocker.Mock()
+    watcher = EventWatcher(client, inventory)
+    mocker.patch.object(watcher, "RECONNECT_DELAY", 0)
+
+    def events(**kwargs: Any) -> Any:
+        if client.events.call_count == 1:
+            yield event("container", "die", "c1")
+            raise requests.exceptions.ConnectionError("connection reset")
+        watcher._stopped.set()
+        yield from ()
+
+    client.events.side_effect = events
+    inventory.containers
+
+    watcher._watch(1700000000)
+
+    assert client.events.call_count == 2
+    assert client.events.call_args_list[0].kwargs["since"] == 1700000000
+    assert inventory.finished_at("c1") is not None
+    # Events may have been missed, so the listing is fetched again
+    inventory.containers
+    assert listings["containers"] == 2
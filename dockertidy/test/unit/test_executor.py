@@ -0,0 +1,85 @@
+"""Test RemovalExecutor class."""
+
+import threading
+import time
+
+import pytest
+
+from dockertidy.executor import RemovalExecutor
+from dockertidy.logger import current_host, set_current_host
+
+
+@pytest.mark.parametrize("limit", [1, 4])
+def test_run_records_outcome(limit: int) -> None:
+    executor = RemovalExecutor({"containers": limit})
+
+    report = executor.run("containers", range(10), lambda item: item % 3 != 0, str)
+
+    assert sorted(report.removed) == ["1", "2", "4", "5", "7", "8"]
+    assert sorted(report.failed) == ["0", "3", "6", "9"]
+    assert executor.reports["containers"] is report
+
+
+def test_run_respects_limit() -> None:
+    executor = RemovalExecutor({"volumes": 3})
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def remove(item: int) -> bool:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return True
+
+    report = executor.run("volumes", range(12), remove, str)
+
+    assert len(report.removed) == 12
+    assert 1 < peak <= 3
+
+
+def test_run_passes_on_host() -> None:
+    executor = RemovalExecutor({"images": 4})
+    hosts: set[str | None] = set()
+
+    def remove(item: int) -> bool:
+        hosts.add(current_host())
+        return True
+
+    set_current_host("tcp://node1:2375")
+    try:
+        executor.run("images", range(8), remove, str)
+    finally:
+        set_current_host(None)
+
+    assert hosts == {"tcp://node1:2375"}
+
+
+@pytest.mark.parametrize("limit", [1, 4])
+def test_run_ordered_removes_children_first(limit: int) -> None:
+    executor = RemovalExecutor({"images": limit})
+    parents = {"base": None, "mid": "base", "leaf1": "mid", "leaf2": "mid", "other": "unknown"}
+    removed: list[str] = []
+    lock = threading.Lock()
+
+    def remove(item: str) -> bool:
+        with lock:
+            removed.append(item)
+        return True
+
+    executor.run_ordered(
+        "images",
+        ["base", "mid", "leaf1", "other", "leaf2"],
+        remove,
+        name=str,
+        key=str,
+        parent=lambda item: parents[item],
+    )
+
+    assert sorted(removed[:2]) == ["leaf1", "leaf2"]
+    assert removed[2] == "mid"
+    assert sorted(removed[3:]) == ["base", "other"]
@@ -0,0 +1,110 @@
+"""Test FanOut class."""
+
+from collections.abc import Callable
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy.fanout import FanOut
+from dockertidy.garbage_collector import GarbageCollector
+
+if TYPE_CHECKING:
+    from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+pytest_plugins = [
+    "dockertidy.test.fixtures.fake_docker",
+]
+
+OLD = {"Created": "2014-01-01T01:01:01Z", "State": {"FinishedAt": "2014-01-01T01:01:01Z"}}
+
+
+@pytest.fixture
+def fanout_config(mocker: MockFixture) -> None:
+    fanout = FanOut("gc", [])
+    mocker.patch.dict(fanout.config.config, {"dry_run": False, "host_workers": 2})
+    mocker.patch.dict(
+        fanout.config.config["gc"],
+        {"max_container_age": "1 day", "max_image_age": "", "exclude_container_labels": []},
+    )
+    mocker.patch.dict(fanout.config.config["cache"], {"enabled": False})
+
+
+@pytest.mark.usefixtures("fanout_config")
+@pytest.mark.parametrize("backend", ["sync", "asyncio"])
+def test_gc_on_all_hosts(
+    mocker: MockFixture,
+    fake_docker_hosts: Callable[[int], list[tuple[str, "FakeDocker"]]],
+    backend: str,
+) -> None:
+    hosts = fake_docker_hosts(3)
+    for index, (_, fake) in enumerate(hosts):
+        for i in range(index + 1):
+            fake.add_container(f"c{i}", Inspect=OLD)
+    fanout = FanOut("gc", [url for url, _ in hosts])
+    mocker.patch.dict(fanout.config.config, {"backend": backend})
+
+    summaries = fanout.run()
+
+    assert [summary.host for summary in summaries] == [url for url, _ in hosts]
+    assert [summary.removed["containers"] for summary in summaries] == [1, 2, 3]
+    assert all(not fake.containers for _, fake in hosts)
+
+
+@pytest.mark.usefixtures("fanout_config")
+def test_failing_host_is_isolated(
+    fake_docker_hosts: Callable[[int], list[tuple[str, "FakeDocker"]]], tmp_path: Path
+) -> None:
+    [(url, fake)] = fake_docker_hosts(1)
+    fake.add_container("c0", Inspect=OLD)
+    dead = f"unix://{tmp_path / 'missing.sock'}"
+    fanout = FanOut("gc", [dead, url])
+
+    with pytest.raises(SystemExit):
+        fanout.run()
+
+    assert not fake.containers
+    assert fanout.run_host(dead).error == "aborted"
+
+
+@pytest.mark.usefixtures("fanout_config")
+def test_unexpected_error_is_isolated(
+    mocker: MockFixture, fake_docker_hosts: Callable[[int], list[tuple[str, "FakeDocker"]]]
+) -> None:
+    [(url, fake)] = fake_docker_hosts(1)
+    fake.add_container("c0", Inspect=OLD)
+    run = GarbageCollector.run
+
+    def run_or_fail(self: GarbageCollector) -> None:
+        if self.host != url:
+            raise KeyError("Id")
+        run(self)
+
+    mocker.patch.object(GarbageCollector, "run", run_or_fail)
+    fanout = FanOut("gc", ["tcp://broken:2375", url])
+    logger = mocker.patch.object(fanout, "logger")
+
+    with pytest.raises(SystemExit):
+        fanout.run()
+
+    assert not fake.containers
+    assert "Unexpected error: KeyError('Id')" in logger.exception.call_args.args[0]
+
+
+@pytest.mark.usefixtures("fanout_config")
+def test_stop_on_all_hosts(
+    mocker: MockFixture, fake_docker_hosts: Callable[[int], list[tuple[str, "FakeDocker"]]]
+) -> None:
+    hosts = fake_docker_hosts(2)
+    for _, fake in hosts:
+        fake.add_container(
+            "old", State="running", Inspect={"State": {"StartedAt": "2014-01-01T01:01:01Z"}}
+        )
+    fanout = FanOut("stop", [url for url, _ in hosts])
+    mocker.patch.dict(fanout.config.config["stop"], {"max_run_time": "1 day ago", "prefix": []})
+
+    summaries = fanout.run()
+
+    assert [summary.removed["stopped containers"] for summary in summaries] == [1, 1]
+    assert "stopped containers 1 ok/0 failed" in summaries[0].format()
@@ -2,14 +2,18 @@
 # cspell:ignore abcdabcdabcdabcd,babababababaabababab,abbb,abcda
 
 import datetime
+import json
 from collections import namedtuple
 
 import docker
 import pytest
 import requests
 
-from dockertidy import garbage_collector
+from dockertidy import garbage_collector, metrics, resilience
+from dockertidy.candidates import ImageCandidate
 from dockertidy.garbage_collector import parse_disk_size
+from dockertidy.inventory import Inventory
+from dockertidy.layers import LayerGraph
 from pytest_mock import MockFixture
 from typing import Any
 
@@ -310,11 +314,11 @@ def test_filter_excluded_images_advanced(gc: garbage_collector.GarbageCollector,
 
 
 def test_is_image_old(gc: garbage_collector.GarbageCollector, image: dict[str, str], now: datetime.datetime) -> None:
-    assert gc._is_image_old(image, now)
+    assert gc._is_image_old(ImageCandidate(image, image), now)
 
 
 def test_is_image_old_false(gc: garbage_collector.GarbageCollector, image: dict[str, str], later_time: datetime.datetime) -> None:
-    assert not gc._is_image_old(image, later_time)
+    assert not gc._is_image_old(ImageCandidate(image, image), later_time)
 
 
 def test_remove_image_no_tags(mocker: MockFixture, gc: garbage_collector.GarbageCollector, image: dict[str, str], now: datetime.datetime) -> None:
@@ -686,3 +690,610 @@ def test_cleanup_images_by_space_with_excluded(
     assert mocker.call(image="img_none") in remove_calls
     assert mocker.call(image="app:mid") in remove_calls
     assert mocker.call(image="app:newest") in remove_calls
+
+
+def test_map_api_call_keeps_order(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(gc.config.config["gc"], {"workers": 4})
+    func = mocker.Mock(side_effect=lambda image: image.upper())
+
+    result = list(gc._map_api_call(func, "image", [f"img{i}" for i in range(20)]))
+    assert result == [f"IMG{i}" for i in range(20)]
+    assert func.call_count == 20
+
+
+def test_cleanup_containers_concurrent(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {"workers": 8, "max_container_age": "0day", "exclude_container_labels": []},
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = [{"Id": f"c{i:02d}"} for i in range(30)]
+    client.inspect_container.side_effect = lambda container: {
+        "Id": container,
+        "Created": "2014-01-01T01:01:01Z",
+        "State": {
+            "Running": int(container[1:]) % 2 == 0,
+            "FinishedAt": "2014-01-01T01:01:01Z",
+        },
+    }
+
+    gc.docker = client
+    gc.cleanup_containers()
+    assert client.remove_container.mock_calls == [
+        mocker.call(container=f"c{i:02d}", v=True) for i in reversed(range(30)) if i % 2
+    ]
+
+
+def test_cleanup_containers_uses_list_summary(mocker: MockFixture, gc: garbage_collector.GarbageCollector, containers: list[dict[str, Any]]) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {"max_container_age": "0day", "exclude_container_labels": []},
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = [
+        {"Id": "abcd", "Created": 1388538061, "State": "exited"},
+        {"Id": "never", "Names": ["/never"], "Created": 1388538061, "State": "created"},
+        {"Id": "young", "Created": 4102444800, "State": "exited"},
+    ]
+    client.inspect_container.side_effect = iter(containers)
+
+    gc.docker = client
+    gc.cleanup_containers()
+    client.containers.assert_called_once_with(
+        all=True, filters={"status": ["created", "exited", "dead"]}
+    )
+    client.inspect_container.assert_called_once_with(container="abcd")
+    assert client.remove_container.mock_calls == [
+        mocker.call(container="never", v=True),
+        mocker.call(container="abcd", v=True),
+    ]
+
+
+def test_should_remove_container_summary(gc: garbage_collector.GarbageCollector, now: datetime.datetime) -> None:
+    assert gc._should_remove_container_summary({"Created": 4102444800, "State": "exited"}, now) is False
+    assert gc._should_remove_container_summary({"Created": 1388538061, "State": "created"}, now) is True
+    assert gc._should_remove_container_summary({"Created": 1388538061, "State": "exited"}, now) is None
+    assert gc._should_remove_container_summary({"Id": "abcd"}, now) is None
+
+
+def test_remove_image_uses_summary_created(mocker: MockFixture, gc: garbage_collector.GarbageCollector, now: datetime.datetime) -> None:
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    image_summary = {"Id": "abcd", "Created": 1388538061}
+
+    gc.docker = client
+    gc._remove_image(image_summary, now)
+    client.inspect_image.assert_not_called()
+    client.remove_image.assert_called_once_with(image="abcd")
+
+
+def test_get_prune_filters(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "2014-01-01 00:00:00 UTC",
+            "max_image_age": "2014-01-01 00:00:00 UTC",
+            "exclude_images": [],
+            "exclude_container_labels": [
+                gc.ExcludeLabel(key="keep", value=None),
+                gc.ExcludeLabel(key="env", value="prod"),
+            ],
+        },
+    )
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    gc.docker = client
+
+    assert gc._get_prune_filters("containers") == (
+        {"until": "1388534400", "label!": ["keep", "env=prod"]},
+        False,
+    )
+    assert gc._get_prune_filters("images") == ({"dangling": False, "until": "1388534400"}, True)
+    assert gc._get_prune_filters("volumes") == ({"all": True}, True)
+
+    client.api_version = "1.41"
+    assert gc._get_prune_filters("volumes") == ({}, True)
+
+    gc.config.config["gc"]["exclude_container_labels"] = [gc.ExcludeLabel(key="keep*", value=None)]
+    gc.config.config["gc"]["exclude_images"] = ["app:*"]
+    assert gc._get_prune_filters("containers") == (None, False)
+    assert gc._get_prune_filters("images") == (None, False)
+
+
+@pytest.mark.parametrize(
+    "strategy,dry_run,resource,expected",
+    [
+        ("per-object", False, "volumes", False),
+        ("auto", False, "volumes", True),
+        ("auto", False, "containers", False),
+        ("prune", False, "containers", True),
+        ("prune", True, "volumes", False),
+    ],
+)
+def test_use_prune(
+    mocker: MockFixture,
+    gc: garbage_collector.GarbageCollector,
+    strategy: str,
+    dry_run: bool,
+    resource: str,
+    expected: bool,
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {"strategy": strategy, "max_container_age": "0day", "exclude_container_labels": []},
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": dry_run})
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    gc.docker = client
+
+    assert gc._use_prune(resource) is expected
+
+
+def test_run_prune_volumes(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "strategy": "auto",
+            "max_container_age": "",
+            "max_image_age": "",
+            "min_free_disk_space": "",
+            "dangling_volumes": True,
+            "exclude_container_labels": [],
+        },
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    client.prune_volumes.return_value = {"VolumesDeleted": ["one", "two"], "SpaceReclaimed": 2048}
+
+    gc.docker = client
+    gc.run()
+    client.prune_volumes.assert_called_once_with(filters={"all": True})
+    client.remove_volume.assert_not_called()
+    assert gc.space_reclaimed == 2048
+
+
+def test_cleanup_images_removes_children_first(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(gc.config.config["gc"], {"max_image_age": "0days", "exclude_images": []})
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    client.containers.return_value = []
+    client.images.return_value = [
+        {"Id": "child", "ParentId": "parent", "Created": 1388538061},
+        {"Id": "parent", "ParentId": "", "Created": 1388538061},
+    ]
+    client.remove_image.side_effect = [
+        None,
+        docker.errors.APIError("Error", mocker.Mock(status_code=409, reason="Conflict", url="dummy")),
+    ]
+
+    gc.docker = client
+    gc.cleanup_images(set())
+    assert client.remove_image.call_args_list == [
+        mocker.call(image="child"),
+        mocker.call(image="parent"),
+    ]
+    assert gc.remover.reports["images"].removed == ["child"]
+    assert gc.remover.reports["images"].failed == ["parent"]
+
+
+def test_run_lists_inventory_once(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "strategy": "per-object",
+            "max_container_age": "0day",
+            "max_image_age": "0days",
+            "min_free_disk_space": "10GB",
+            "dangling_volumes": False,
+            "exclude_images": [],
+            "exclude_container_labels": [],
+        },
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    usage = DiskUsage(total=100 * 1024**3, used=95 * 1024**3, free=5 * 1024**3)
+    mocker.patch.object(gc, "_get_disk_usage", return_value=usage)
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    client.containers.return_value = [
+        {"Id": "old", "ImageID": "img1", "Created": 1388538061, "State": "created"},
+        {"Id": "running", "ImageID": "img2", "Created": 1388538061, "State": "running"},
+    ]
+    client.images.return_value = [
+        {"Id": "img1", "Created": 1388538061},
+        {"Id": "img2", "Created": 1388538061},
+        {"Id": "img3", "Created": 4102444800},
+    ]
+
+    gc.docker = client
+    gc.run()
+    client.containers.assert_called_once_with(all=True)
+    client.images.assert_called_once_with()
+    client.remove_container.assert_called_once_with(container="old", v=True)
+    assert client.remove_image.call_args_list == [mocker.call(image="img1"), mocker.call(image="img3")]
+    assert gc.inventory is not None
+    assert [image["Id"] for image in gc.inventory.images] == ["img2"]
+
+
+def test_run_skips_space_cleanup_on_remote_host(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "",
+            "max_image_age": "",
+            "min_free_disk_space": "10GB",
+            "dangling_volumes": False,
+        },
+    )
+    cleanup = mocker.patch.object(gc, "cleanup_images_by_space")
+    disk_usage = mocker.patch.object(gc, "_get_disk_usage")
+    gc.host = "tcp://node1:2375"
+
+    gc.run()
+    cleanup.assert_not_called()
+    disk_usage.assert_not_called()
+
+
+def test_cleanup_images_by_space_uses_disk_usage(
+    mocker: MockFixture,
+    gc: garbage_collector.GarbageCollector,
+    images_by_age: list[dict[str, Any]],
+) -> None:
+    mocker.patch.dict(gc.config.config["gc"], {"min_free_disk_space": "10GB", "exclude_images": []})
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+    client.containers.return_value = []
+    client.images.return_value = list(images_by_age)
+    client.inspect_image.side_effect = lambda image: {
+        "Id": image,
+        "Created": next(img["Created"] for img in images_by_age if img["Id"] == image),
+    }
+    client.df.return_value = {
+        "Images": [
+            {"Id": "img_newest", "Size": 6 * 1024**3, "SharedSize": 0, "Containers": 0},
+            {"Id": "img_mid", "Size": 1 * 1024**3, "SharedSize": 0, "Containers": 0},
+            {"Id": "img_oldest", "Size": 4 * 1024**3, "SharedSize": 1024**3, "Containers": 0},
+            {"Id": "img_none", "Size": 512 * 1024**2, "SharedSize": -1, "Containers": 0},
+        ]
+    }
+    usage_calls = [
+        DiskUsage(total=100 * 1024**3, used=95 * 1024**3, free=5 * 1024**3),
+        DiskUsage(total=100 * 1024**3, used=89 * 1024**3, free=11 * 1024**3),
+    ]
+    disk_usage = mocker.patch.object(gc, "_get_disk_usage", side_effect=usage_calls)
+
+    gc.docker = client
+    gc.cleanup_images_by_space(set())
+
+    assert client.remove_image.call_args_list == [mocker.call(image="app:newest")]
+    assert disk_usage.call_count == 2
+
+
+def test_cleanup_images_by_space_removes_children_before_parents(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector
+) -> None:
+    mocker.patch.dict(gc.config.config["gc"], {"min_free_disk_space": "10GB", "exclude_images": []})
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    mocker.patch.object(gc, "SPACE_CHECKPOINT_INTERVAL", 1)
+    parent = ImageCandidate({"Id": "parent", "RepoTags": ["app:base"]})
+    child = ImageCandidate({"Id": "child", "ParentId": "parent", "RepoTags": ["app:child"]})
+    other = ImageCandidate({"Id": "other", "RepoTags": ["app:other"]})
+    mocker.patch.object(gc, "_get_removable_images", return_value=iter([]))
+    mocker.patch.object(gc, "_get_image_disk_usage", return_value={})
+    mocker.patch.object(gc, "_build_layer_graph", return_value=LayerGraph())
+    mocker.patch.object(
+        gc,
+        "_plan_space_eviction",
+        return_value=([(parent, 300), (other, 200), (child, 100)], 3),
+    )
+    low = DiskUsage(total=100 * 1024**3, used=95 * 1024**3, free=5 * 1024**3)
+    mocker.patch.object(gc, "_get_disk_usage", return_value=low)
+    client = mocker.create_autospec(docker.APIClient)
+    client.api_version = "1.45"
+
+    gc.docker = client
+    gc.cleanup_images_by_space(set())
+
+    assert client.remove_image.call_args_list == [
+        mocker.call(image="app:child"),
+        mocker.call(image="app:base"),
+        mocker.call(image="app:other"),
+    ]
+
+
+def test_plan_space_eviction(gc: garbage_collector.GarbageCollector, now: datetime.datetime, earlier_time: datetime.datetime) -> None:
+    candidates = [
+        ImageCandidate({"Id": "a"}, {"Created": earlier_time.isoformat()}),
+        ImageCandidate({"Id": "b"}, {"Created": now.isoformat()}),
+        ImageCandidate({"Id": "c"}, {"Created": now.isoformat()}),
+        ImageCandidate({"Id": "d"}),
+    ]
+
+    def build_graph() -> LayerGraph:
+        graph = LayerGraph()
+        graph.add_image("a", ["base", "a"], 400, shared_size=300)
+        graph.add_image("b", ["base", "b"], 600, shared_size=300)
+        graph.add_image("c", ["c"], 100)
+        graph.add_image("d", ["d"], 1000)
+        return graph
+
+    order, planned = gc._plan_space_eviction(candidates, build_graph(), 350)
+    assert [(candidate.id, reclaimable) for candidate, reclaimable in order] == [
+        ("b", 300),
+        ("a", 400),
+        ("c", 100),
+    ]
+    assert planned == 2
+
+    order, planned = gc._plan_space_eviction(candidates, build_graph(), 10000)
+    assert planned == 3
+
+
+def test_cleanup_images_dry_run_logs_reclaimable(
+    mocker: MockFixture,
+    gc: garbage_collector.GarbageCollector,
+    images_by_age: list[dict[str, Any]],
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"], {"max_image_age": "2023-12-01", "exclude_images": []}
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": True})
+    layers = {
+        "img_newest": ["new"],
+        "img_mid": ["base", "mid"],
+        "img_oldest": ["base", "oldest"],
+        "img_none": ["none"],
+    }
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = []
+    client.images.return_value = list(images_by_age)
+    client.inspect_image.side_effect = lambda image: {
+        "Id": image,
+        "Created": next(img["Created"] for img in images_by_age if img["Id"] == image),
+        "RootFS": {"Layers": layers[image]},
+    }
+    client.df.return_value = {
+        "Images": [
+            {"Id": "img_newest", "Size": 2 * 1024**3, "SharedSize": 0},
+            {"Id": "img_mid", "Size": 3 * 1024**3, "SharedSize": 2 * 1024**3},
+            {"Id": "img_oldest", "Size": 3 * 1024**3, "SharedSize": 2 * 1024**3},
+            {"Id": "img_none", "Size": 1024**3, "SharedSize": 0},
+        ]
+    }
+    mock_log = mocker.patch.object(gc, "logger", autospec=True)
+
+    gc.docker = client
+    gc.cleanup_images(set())
+
+    client.remove_image.assert_not_called()
+    # The shared base is only freed with the last image using it
+    assert mock_log.info.call_args_list[-1] == mocker.call(
+        "Removing 3 images would free 5.0GB"
+    )
+
+
+def test_run_inspect_cache_warm(
+    mocker: MockFixture,
+    gc: garbage_collector.GarbageCollector,
+    images_by_age: list[dict[str, Any]],
+    tmp_path: Any,
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "",
+            "max_image_age": "2000-01-01",
+            "min_free_disk_space": "",
+            "dangling_volumes": False,
+            "exclude_images": [],
+            "exclude_container_labels": [],
+            "strategy": "per-object",
+        },
+    )
+    mocker.patch.dict(
+        gc.config.config,
+        {"cache": {"enabled": True, "path": str(tmp_path / "inspect.db"), "max_entries": 100}},
+    )
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = []
+    client.images.return_value = list(images_by_age[:2])
+    client.inspect_image.side_effect = lambda image: {
+        "Id": image,
+        "Created": next(img["Created"] for img in images_by_age if img["Id"] == image),
+        "RootFS": {"Layers": []},
+    }
+    gc.docker = client
+
+    gc.run()
+    assert client.inspect_image.call_count == 2
+
+    client.inspect_image.reset_mock()
+    client.images.return_value = list(images_by_age[1:3])
+    gc.run()
+    assert client.inspect_image.call_args_list == [mocker.call(image="img_oldest")]
+
+
+def test_cleanup_containers_live_inventory(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector, now: datetime.datetime
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"], {"max_container_age": "1 day ago", "exclude_container_labels": []}
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    created = int((now - datetime.timedelta(days=10)).timestamp())
+    client = mocker.create_autospec(docker.APIClient)
+    client.containers.return_value = [
+        {"Id": "old", "State": "exited", "Created": created, "Labels": {}},
+        {"Id": "recent", "State": "exited", "Created": created, "Labels": {}},
+        {"Id": "unknown", "State": "exited", "Created": created, "Labels": {}},
+    ]
+    client.inspect_container.return_value = {
+        "Id": "unknown",
+        "Name": "/unknown",
+        "State": {"Running": False, "FinishedAt": "2000-01-01T00:00:00Z"},
+    }
+    gc.docker = client
+    gc.inventory = gc.create_inventory()
+    gc.inventory.container_finished("old", now - datetime.timedelta(days=5))
+    gc.inventory.container_finished("recent", datetime.datetime.now(tz=datetime.UTC))
+
+    gc.cleanup_containers()
+
+    client.inspect_container.assert_called_once_with(container="unknown")
+    assert client.remove_container.call_args_list == [
+        mocker.call(container="unknown", v=True),
+        mocker.call(container="old", v=True),
+    ]
+    assert [container["Id"] for container in gc.inventory.containers] == ["recent"]
+
+
+def test_api_call_result_retries(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(gc.config.config["retry"], {"attempts": 2, "backoff": 0.0})
+    mocker.patch("dockertidy.resilience.time.sleep")
+    gc.retry = resilience.get_retry_policy(gc.config.config)
+    func = mocker.Mock(__name__="remove_image", side_effect=[requests.exceptions.ReadTimeout(), None])
+
+    assert gc._api_call_result(func, image="abcd") == (True, None)
+    assert func.call_count == 2
+
+    func = mocker.Mock(__name__="remove_image", side_effect=requests.exceptions.ReadTimeout())
+    assert gc._api_call_result(func, image="abcd") == (False, None)
+    assert func.call_count == 3
+
+
+def test_remove_retried_after_timeout(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector
+) -> None:
+    mocker.patch.dict(gc.config.config["retry"], {"attempts": 2, "backoff": 0.0})
+    mocker.patch("dockertidy.resilience.time.sleep")
+    gc.retry = resilience.get_retry_policy(gc.config.config)
+    client = mocker.create_autospec(docker.APIClient)
+    client.remove_volume.side_effect = [
+        requests.exceptions.ReadTimeout(),
+        docker.errors.NotFound("no such volume"),
+    ]
+    gc.docker = client
+    gc.inventory = mocker.create_autospec(Inventory, instance=True)
+
+    assert gc._remove_volume({"Name": "one"})
+    assert client.remove_volume.call_count == 2
+    gc.inventory.discard_volumes.assert_called_once_with(["one"])
+
+
+def test_api_call_result_observes_latency(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "latency_target": 0.5,
+            "latency_window": 2,
+            "remove_workers": {"containers": 1, "images": 4, "volumes": 1},
+        },
+    )
+    gc.limiter = gc._get_limiter()
+    assert gc.limiter is not None
+    monotonic = mocker.patch(
+        "dockertidy.garbage_collector.time.monotonic", side_effect=[0.0, 0.1, 1.0, 1.1]
+    )
+    func = mocker.Mock(__name__="remove_image")
+
+    gc._api_call_result(func, image="a")
+    gc._api_call_result(func, image="b")
+
+    assert monotonic.call_count == 4
+    assert gc.limiter.limit == 2
+
+
+def test_listings_are_instrumented(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector
+) -> None:
+    mocker.patch.dict(gc.config.config["retry"], {"attempts": 2, "backoff": 0.0})
+    mocker.patch("dockertidy.resilience.time.sleep")
+    gc.retry = resilience.get_retry_policy(gc.config.config)
+    client = mocker.create_autospec(docker.APIClient)
+    client.images.__name__ = "images"
+    client.images.side_effect = [requests.exceptions.ReadTimeout(), [{"Id": "abcd"}]]
+    client.volumes.__name__ = "volumes"
+    client.volumes.side_effect = docker.errors.APIError("daemon unavailable")
+    gc.docker = client
+    calls = metrics.API_CALL_DURATION.value(endpoint="images", host=None)
+    errors = metrics.API_CALL_ERRORS.value(endpoint="volumes", host=None)
+
+    assert gc._get_all_images() == [{"Id": "abcd"}]
+    with pytest.raises(docker.errors.APIError):
+        gc._get_dangling_volumes()
+
+    assert client.images.call_count == 2
+    assert metrics.API_CALL_DURATION.value(endpoint="images", host=None) == calls + 1
+    assert metrics.API_CALL_ERRORS.value(endpoint="volumes", host=None) == errors + 1
+    assert gc.summary.api_calls == 2
+
+
+def test_run_records_metrics(mocker: MockFixture, gc: garbage_collector.GarbageCollector) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "",
+            "max_image_age": "",
+            "min_free_disk_space": "",
+            "dangling_volumes": True,
+        },
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False})
+    client = mocker.create_autospec(docker.APIClient)
+    client.volumes.return_value = {"Volumes": [{"Name": "one"}, {"Name": "two"}]}
+    client.remove_volume.side_effect = [None, requests.exceptions.ReadTimeout()]
+    client.remove_volume.__name__ = "remove_volume"
+    gc.docker = client
+    removed = metrics.REMOVED.value(command="gc", resource="volumes", host=None)
+    failed = metrics.FAILED.value(command="gc", resource="volumes", host=None)
+    calls = metrics.API_CALL_DURATION.value(endpoint="remove_volume", host=None)
+
+    gc.run()
+
+    assert metrics.REMOVED.value(command="gc", resource="volumes", host=None) == removed + 1
+    assert metrics.FAILED.value(command="gc", resource="volumes", host=None) == failed + 1
+    assert metrics.API_CALL_DURATION.value(endpoint="remove_volume", host=None) == calls + 2
+    assert metrics.RUN_DURATION.value(command="gc", phase="cleanup_volumes", host=None) > 0
+
+
+def test_run_writes_summary(
+    mocker: MockFixture, gc: garbage_collector.GarbageCollector, tmp_path: Any
+) -> None:
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "",
+            "max_image_age": "",
+            "min_free_disk_space": "",
+            "dangling_volumes": True,
+            "disk_path": str(tmp_path),
+        },
+    )
+    mocker.patch.dict(gc.config.config, {"dry_run": False, "summary": str(tmp_path / "run.json")})
+    client = mocker.create_autospec(docker.APIClient)
+    client.volumes.return_value = {"Volumes": [{"Name": "one"}, {"Name": "two"}]}
+    client.remove_volume.side_effect = [None, requests.exceptions.ReadTimeout()]
+    gc.docker = client
+
+    gc.run()
+
+    summary = json.loads((tmp_path / "run.json").read_text())
+    assert summary["command"] == "gc"
+    assert summary["reclaimed_bytes"] is not None
+    assert summary["phases"] == [
+        {
+            "name": "cleanup_volumes",
+            "seconds": mocker.ANY,
+            "api_calls": 3,
+            "candidates": 2,
+            "removed": 1,
+            "failed": 1,
+        }
+    ]
@@ -0,0 +1,69 @@
+"""Test LayerGraph class."""
+
+from dockertidy.layers import LayerGraph
+
+
+def test_reclaimable_shared_base() -> None:
+    graph = LayerGraph()
+    graph.add_image("a", ["base", "a"], 400, shared_size=300)
+    graph.add_image("b", ["base", "b"], 600, shared_size=300)
+    graph.add_image("c", ["c"], 100)
+
+    assert graph.reclaimable("a") == 100
+    assert graph.reclaimable("b") == 300
+    assert graph.reclaimable("c") == 100
+
+    assert graph.select("a") == {"b"}
+    assert graph.reclaimable("a") == 0
+    assert graph.reclaimable("b") == 600
+
+
+def test_reclaimable_identical_chains() -> None:
+    graph = LayerGraph()
+    graph.add_image("a", ["base", "top"], 500)
+    graph.add_image("b", ["base", "top"], 500)
+
+    # Two tags of the same layers free nothing until both are removed
+    assert graph.reclaimable("a") == 0
+    graph.select("a")
+    assert graph.reclaimable("b") == 500
+
+
+def test_reclaimable_without_shared_size() -> None:
+    graph = LayerGraph()
+    graph.add_image("a", ["base", "a"], 400)
+    graph.add_image("b", ["base", "b"], 600)
+
+    # The shared base is assumed as large as possible, never overestimating
+    assert graph.reclaimable("a") == 0
+    assert graph.reclaimable("b") == 200
+    graph.select("b")
+    assert graph.reclaimable("a") == 400
+
+
+def test_reclaimable_images_without_layers() -> None:
+    graph = LayerGraph()
+    graph.add_image("parent", [], 300)
+    graph.add_image("child", [], 500, parent="parent")
+    graph.add_image("lonely", [], 200, shared_size=50)
+
+    assert graph.reclaimable("parent") == 0
+    assert graph.reclaimable("child") == 200
+    assert graph.reclaimable("lonely") == 150
+    assert graph.reclaimable("unknown") == 0
+
+    graph.select("child")
+    assert graph.reclaimable("parent") == 300
+
+
+def test_plan() -> None:
+    graph = LayerGraph()
+    graph.add_image("old", ["base", "old"], 1100, shared_size=1000)
+    graph.add_image("mid", ["base", "mid"], 1100, shared_size=1000)
+    graph.add_image("new", ["new"], 500)
+    candidates = {"old": 1, "mid": 2, "new": 3}
+
+    order, planned = graph.plan(candidates, 600)
+
+    assert order == [("new", 500), ("old", 100), ("mid", 1100)]
+    assert planned == 2
@@ -0,0 +1,67 @@
+"""Test AdaptiveLimiter class."""
+
+import threading
+import time
+
+from dockertidy.executor import RemovalExecutor
+from dockertidy.limiter import AdaptiveLimiter, percentile
+
+
+def test_percentile() -> None:
+    samples = [float(i) for i in range(1, 101)]
+
+    assert percentile(samples, 95) == 95.0
+    assert percentile(samples, 100) == 100.0
+    assert percentile([3.0], 95) == 3.0
+
+
+def test_limit_grows_while_healthy() -> None:
+    limiter = AdaptiveLimiter(target=1.0, max_limit=3, window=2)
+
+    for _ in range(10):
+        limiter.observe(0.1)
+
+    assert limiter.limit == 3
+
+
+def test_limit_shrinks_above_target() -> None:
+    limiter = AdaptiveLimiter(target=1.0, max_limit=16, window=4)
+    limiter.limit = 16
+
+    limiter.observe(0.1)
+    limiter.observe(0.1)
+    limiter.observe(0.1)
+    assert limiter.limit == 16
+
+    limiter.observe(2.0)
+    assert limiter.limit == 8
+
+    for _ in range(3):
+        for _ in range(4):
+            limiter.observe(2.0)
+    assert limiter.limit == 1
+
+
+def test_executor_respects_adaptive_limit() -> None:
+    limiter = AdaptiveLimiter(target=1.0, max_limit=8, window=100)
+    limiter.limit = 2
+    executor = RemovalExecutor({"images": 8}, limiter)
+    lock = threading.Lock()
+    in_flight = 0
+    peak = 0
+
+    def remove(item: int) -> bool:
+        nonlocal in_flight, peak
+        with lock:
+            in_flight += 1
+            peak = max(peak, in_flight)
+        time.sleep(0.01)
+        with lock:
+            in_flight -= 1
+        return True
+
+    report = executor.run("images", range(12), remove, str)
+
+    assert len(report.removed) == 12
+    assert peak == 2
+    assert limiter.in_flight == 0
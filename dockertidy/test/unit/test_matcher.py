@@ -0,0 +1,124 @@
+"""Test exclude matchers."""
+
+import fnmatch
+import itertools
+
+import pytest
+
+from dockertidy.matcher import ImageExcludeIndex, LabelMatcher, has_glob, translate
+
+LABELS = [
+    {"toot": ""},
+    {"too": "lol"},
+    {"toots": "lol"},
+    {"foo": "bar"},
+    {"com.docker.compose.project": "web", "com.docker.compose.service": "db"},
+    {"io.kubernetes.pod.name": "api-7d9f", "env": "prod"},
+    {"a*b": "[x]", "odd?": "*"},
+    {},
+]
+
+RULES = [
+    ("too", None),
+    ("too*", "lol"),
+    ("foo", "bar"),
+    ("foo", "baz"),
+    ("com.docker.compose.*", None),
+    ("io.kubernetes.*", "api-*"),
+    ("env", "pro?"),
+    ("env", "dev"),
+    ("a[*]b", "[[]x]"),
+    ("odd[?]", None),
+    ("toot", ""),
+    ("*", "nomatch"),
+]
+
+TAGS = [
+    "user/one:latest",
+    "user/one:abcd",
+    "user/onetwo:latest",
+    "other-1:abcda",
+    "other-2:abc45",
+    "new_image:latest",
+    "new_image:123",
+    "registry:5000/app:1.0",
+    "registry:5000/app:1.0-rc1",
+    "registry.example.com/team/app:2024.05",
+    "app",
+    "app:",
+]
+
+PATTERNS = [
+    "user/one:latest",
+    "user/one:*",
+    "user/one*",
+    "new_*:123",
+    "other-1:abc*",
+    "other-?:abc45",
+    "registry:*",
+    "registry:5000/app:1.[0-9]",
+    "*/team/*:2024.*",
+    "app:*",
+    "*",
+    "[!a]*:latest",
+    "app",
+]
+
+
+def fnmatch_reference(labels: dict[str, str], rules: list[tuple[str, str | None]]) -> bool:
+    for key, value in rules:
+        keys = fnmatch.filter(labels.keys(), key)
+        if value:
+            if fnmatch.filter([labels[k] for k in keys], value):
+                return True
+        elif keys:
+            return True
+    return False
+
+
+def test_has_glob() -> None:
+    assert has_glob("foo*")
+    assert has_glob("fo?")
+    assert has_glob("f[oa]o")
+    assert not has_glob("com.docker.compose.project")
+
+
+def test_translate_is_unanchored() -> None:
+    assert not translate("foo*").endswith(("\\Z", "\\z"))
+
+
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_label_matcher_matches_fnmatch(size: int) -> None:
+    for rules in itertools.combinations(RULES, size):
+        matcher = LabelMatcher(rules)
+        for labels in LABELS:
+            assert matcher.matches(labels) == fnmatch_reference(labels, list(rules)), (
+                rules,
+                labels,
+            )
+
+
+def test_label_matcher_empty() -> None:
+    matcher = LabelMatcher([])
+
+    assert not matcher
+    assert not matcher.matches({"foo": "bar"})
+    assert not LabelMatcher([("foo", None)]).matches(None)
+
+
+@pytest.mark.parametrize("size", [1, 2, 3])
+def test_image_exclude_index_matches_fnmatch(size: int) -> None:
+    for patterns in itertools.combinations(PATTERNS, size):
+        index = ImageExcludeIndex(patterns)
+        for tag in TAGS:
+            expected = any(fnmatch.filter([tag], pattern) for pattern in patterns)
+            assert index.matches([tag]) == expected, (patterns, tag)
+
+
+def test_image_exclude_index_is_pattern_set() -> None:
+    index = ImageExcludeIndex(["user/one:*", "app:latest", "app:latest"])
+
+    assert index == frozenset({"user/one:*", "app:latest"})
+    assert index.matches(["other:1", "user/one:2"])
+    assert not index.matches([])
+    assert not ImageExcludeIndex().matches(["app:latest"])
@@ -0,0 +1,93 @@
+"""Test Prometheus metrics."""
+
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy import metrics
+from dockertidy.config import SingleConfig
+
+
+def test_exposition() -> None:
+    registry = metrics.Registry()
+    counter = metrics.Counter("tidy_removed_total", "Removed.", ("resource",), registry)
+    gauge = metrics.Gauge("tidy_last_run", "Last run.", registry=registry)
+    counter.inc(2, resource="images")
+    counter.inc(resource='a"b')
+    gauge.set(1.5)
+
+    assert registry.exposition() == (
+        "# HELP tidy_removed_total Removed.\n"
+        "# TYPE tidy_removed_total counter\n"
+        'tidy_removed_total{resource="a\\"b"} 1.0\n'
+        'tidy_removed_total{resource="images"} 2.0\n'
+        "# HELP tidy_last_run Last run.\n"
+        "# TYPE tidy_last_run gauge\n"
+        "tidy_last_run 1.5\n"
+    )
+    assert counter.value(resource="images") == 2.0
+
+    with pytest.raises(ValueError, match="expects labels"):
+        counter.inc(command="gc")
+
+
+def test_phase_per_host() -> None:
+    with metrics.phase("gc", "per_host", "tcp://node1:2375"):
+        pass
+    with metrics.phase("gc", "per_host"):
+        pass
+
+    exposition = metrics.REGISTRY.exposition()
+    assert 'run_duration_seconds{command="gc",phase="per_host",host="tcp://node1:2375"}' in exposition
+    assert 'run_duration_seconds{command="gc",phase="per_host",host=""}' in exposition
+
+
+def test_histogram() -> None:
+    registry = metrics.Registry()
+    histogram = metrics.Histogram(
+        "tidy_call_seconds", "Calls.", ("endpoint",), registry, buckets=(0.1, 1.0)
+    )
+    for value in (0.05, 0.5, 5.0):
+        histogram.observe(value, endpoint="remove_image")
+
+    assert histogram.value(endpoint="remove_image") == 3
+    assert histogram.samples() == [
+        'tidy_call_seconds_bucket{endpoint="remove_image",le="0.1"} 1',
+        'tidy_call_seconds_bucket{endpoint="remove_image",le="1.0"} 2',
+        'tidy_call_seconds_bucket{endpoint="remove_image",le="+Inf"} 3',
+        'tidy_call_seconds_sum{endpoint="remove_image"} 5.55',
+        'tidy_call_seconds_count{endpoint="remove_image"} 3',
+    ]
+
+
+def test_track_run_writes_textfile(mocker: MockFixture, tmp_path: Path) -> None:
+    textfile = tmp_path / "docker-tidy.prom"
+    mocker.patch.dict(SingleConfig().config["metrics"], {"textfile": str(textfile)})
+    runs = metrics.RUNS.value(command="gc", status="failure", host=None)
+
+    with pytest.raises(SystemExit), metrics.track_run("gc"):
+        raise SystemExit(1)
+
+    assert metrics.RUNS.value(command="gc", status="failure", host=None) == runs + 1
+    assert "docker_tidy_runs_total" in textfile.read_text()
+    assert list(tmp_path.iterdir()) == [textfile]
+
+
+def test_metrics_server() -> None:
+    registry = metrics.Registry()
+    metrics.Counter("tidy_runs_total", "Runs.", registry=registry).inc()
+    server = metrics.MetricsServer("127.0.0.1", 0, registry)
+    server.start()
+    url = f"http://127.0.0.1:{server.server_address[1]}"
+    try:
+        with urllib.request.urlopen(f"{url}/metrics") as response:  # noqa: S310
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert b"tidy_runs_total 1.0" in response.read()
+
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen(f"{url}/other")  # noqa: S310
+    finally:
+        server.stop()
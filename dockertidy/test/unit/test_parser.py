@@ -0,0 +1,101 @@
+"""Test custom input type parser."""
+
+import datetime
+from argparse import ArgumentTypeError
+
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy import parser
+
+NOW = datetime.datetime(2024, 6, 15, 12, 0, tzinfo=datetime.UTC)
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("7 days ago", datetime.timedelta(days=7)),
+        ("3 DAYS AGO", datetime.timedelta(days=3)),
+        ("1 day", datetime.timedelta(days=1)),
+        ("an hour ago", datetime.timedelta(hours=1)),
+        ("1 day and 2 hours ago", datetime.timedelta(days=1, hours=2)),
+        ("1 day, 2 hours ago", datetime.timedelta(days=1, hours=2)),
+        ("1.5 hours ago", datetime.timedelta(hours=1, minutes=30)),
+        ("2 weeks", datetime.timedelta(weeks=2)),
+        ("12h", datetime.timedelta(hours=12)),
+        ("1d12h", datetime.timedelta(days=1, hours=12)),
+        ("30m", datetime.timedelta(minutes=30)),
+        ("90s", datetime.timedelta(seconds=90)),
+        ("0day", datetime.timedelta()),
+        ("0days", datetime.timedelta()),
+        ("P1W", datetime.timedelta(weeks=1)),
+        ("P1DT12H", datetime.timedelta(days=1, hours=12)),
+        ("PT0.5S", datetime.timedelta(milliseconds=500)),
+    ],
+)
+def test_parse_past_time_durations(value: str, expected: datetime.timedelta) -> None:
+    assert parser.parse_past_time(value, now=NOW) == NOW - expected
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        ("1 month ago", datetime.datetime(2024, 5, 15, 12, 0, tzinfo=datetime.UTC)),
+        ("P1Y2M", datetime.datetime(2023, 4, 15, 12, 0, tzinfo=datetime.UTC)),
+        ("now", NOW),
+        ("2014-01-01 00:00:00 UTC", datetime.datetime(2014, 1, 1, tzinfo=datetime.UTC)),
+        ("2024-01-01T02:00:00+02:00", datetime.datetime(2024, 1, 1, tzinfo=datetime.UTC)),
+    ],
+)
+def test_parse_past_time_calendar_and_absolute(value: str, expected: datetime.datetime) -> None:
+    assert parser.parse_past_time(value, now=NOW) == expected
+
+
+@pytest.mark.parametrize("value", ["in 1 day", "1.5 months", "1 fortnight", "P", "1 day x"])
+def test_parse_duration_rejects(value: str) -> None:
+    assert parser.parse_duration(value) is None
+
+
+def test_parse_past_time_falls_back_to_dateparser(mocker: MockFixture) -> None:
+    dateparser = pytest.importorskip("dateparser")
+    parse = mocker.spy(dateparser, "parse")
+
+    assert parser.parse_past_time("7 days ago", now=NOW) is not None
+    parse.assert_not_called()
+
+    assert parser.parse_past_time("yesterday", now=NOW) is not None
+    parse.assert_called_once()
+
+
+def test_timedelta_validator_without_dateparser(mocker: MockFixture) -> None:
+    mocker.patch.object(parser, "HAS_DATEPARSER", False)
+
+    assert parser.timedelta_validator("7 days ago") == "7 days ago"
+    with pytest.raises(ArgumentTypeError, match=r"docker-tidy\[dateparser\]"):
+        parser.timedelta_validator("yesterday")
+
+
+@pytest.mark.parametrize(
+    ("value", "expected"),
+    [
+        (
+            "2024-05-01T12:34:56.123456789Z",
+            datetime.datetime(2024, 5, 1, 12, 34, 56, 123456, tzinfo=datetime.UTC),
+        ),
+        ("2024-05-01T12:34:56Z", datetime.datetime(2024, 5, 1, 12, 34, 56, tzinfo=datetime.UTC)),
+        (
+            "2024-05-01T14:34:56.5+02:00",
+            datetime.datetime(2024, 5, 1, 12, 34, 56, 500000, tzinfo=datetime.UTC),
+        ),
+        ("2024-05-01 12:34:56", datetime.datetime(2024, 5, 1, 12, 34, 56, tzinfo=datetime.UTC)),
+        ("May 1 2024 12:34:56 UTC", datetime.datetime(2024, 5, 1, 12, 34, 56, tzinfo=datetime.UTC)),
+        (parser.YEAR_ZERO, None),
+    ],
+)
+def test_parse_timestamp(value: str, expected: datetime.datetime | None) -> None:
+    assert parser.parse_timestamp(value) == expected
+
+
+def test_parse_timestamp_malformed() -> None:
+    with pytest.raises(ValueError, match="Unknown string format"):
+        parser.parse_timestamp("not a timestamp")
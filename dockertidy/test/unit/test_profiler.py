@@ -0,0 +1,100 @@
+"""Test profiling of runs."""
+
+import pstats
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+from dockertidy import profiler
+
+
+def _work() -> list[bytes]:
+    return [bytes(1024) for _ in range(1000)]
+
+
+def test_profile_disabled() -> None:
+    with profiler.profile("", "unused") as active, profiler.phase("cleanup_images"):
+        pass
+
+    assert active is None
+
+
+def test_profile_cpu(tmp_path: Path) -> None:
+    path = tmp_path / "run.prof"
+
+    with profiler.profile("cpu", str(path)) as active, profiler.phase("cleanup_images"):
+        _work()
+
+    stats = pstats.Stats(str(path))
+    assert any(func[2] == "_work" for func in stats.stats)  # type: ignore[attr-defined]
+    assert active is not None
+    assert [timing.name for timing in active.phases] == ["cleanup_images"]
+    assert active.phases[0].seconds > 0
+    assert active.phases[0].peak_bytes is None
+
+
+def test_profile_cpu_threads(tmp_path: Path) -> None:
+    path = tmp_path / "run.prof"
+
+    with profiler.profile("cpu", str(path)), ThreadPoolExecutor(max_workers=2) as pool:
+        for future in [pool.submit(_work) for _ in range(4)]:
+            future.result()
+
+    stats = pstats.Stats(str(path))
+    calls = [value[1] for func, value in stats.stats.items() if func[2] == "_work"]  # type: ignore[attr-defined]
+    assert calls == [4]
+
+
+def test_profile_mem(tmp_path: Path) -> None:
+    path = tmp_path / "run.txt"
+
+    with profiler.profile("mem", str(path), top=5) as active:
+        with profiler.phase("cleanup_containers"):
+            held = _work()
+        with profiler.phase("cleanup_images"):
+            pass
+
+    report = path.read_text()
+    assert active is not None
+    assert active.phases[0].peak_bytes is not None
+    assert active.phases[0].peak_bytes >= len(held) * 1024
+    assert "cleanup_containers: " in report
+    assert "Top 5 allocations" in report
+    assert "test_profiler.py" in report
+
+
+def test_profile_mem_overlapping_hosts(tmp_path: Path) -> None:
+    path = tmp_path / "run.txt"
+    started = threading.Barrier(2)
+
+    def run_host(host: str) -> None:
+        with profiler.phase("cleanup_images", host):
+            started.wait()
+            _work()
+            started.wait()
+
+    with profiler.profile("mem", str(path)) as active:
+        threads = [threading.Thread(target=run_host, args=(host,)) for host in ("a", "b")]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        with profiler.phase("cleanup_volumes", "a"):
+            pass
+
+    assert active is not None
+    overlapping, alone = active.phases[:2], active.phases[2]
+    assert sorted(timing.host or "" for timing in overlapping) == ["a", "b"]
+    assert all(timing.overlapped and timing.peak_bytes is None for timing in overlapping)
+    assert not alone.overlapped
+    assert alone.peak_bytes is not None
+    assert "[a] cleanup_images: " in path.read_text()
+
+
+def test_profile_unwritable(tmp_path: Path) -> None:
+    path = tmp_path / "missing" / "run.prof"
+
+    with profiler.profile("cpu", str(path)):
+        pass
+
+    assert not path.exists()
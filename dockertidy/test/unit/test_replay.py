@@ -0,0 +1,113 @@
+"""Test recording and replaying docker API traffic."""
+
+import json
+import re
+from pathlib import Path
+from typing import TYPE_CHECKING
+
+import docker.errors
+import pytest
+from pytest_mock import MockFixture
+
+from dockertidy import garbage_collector, replay
+
+if TYPE_CHECKING:
+    from dockertidy.test.fixtures.fake_docker import FakeDocker
+
+pytest_plugins = ["dockertidy.test.fixtures.fake_docker"]
+
+
+@pytest.fixture
+def gc(mocker: MockFixture, fake_docker: "FakeDocker", tmp_path: Path) -> garbage_collector.GarbageCollector:
+    for i in range(6):
+        finished = "2014-01-01T01:01:01Z" if i % 2 else "2999-01-01T01:01:01Z"
+        fake_docker.add_container(
+            f"c{i}",
+            Labels={"secret": "yes"},
+            Inspect={"Created": finished, "Config": {"Env": ["TOKEN=abc"]}, "State": {"FinishedAt": finished}},
+        )
+    fake_docker.latency = 0.01
+    host = fake_docker.serve_unix(tmp_path / "docker.sock")
+
+    gc = garbage_collector.GarbageCollector(host)
+    mocker.patch.dict(gc.config.config, {"dry_run": False, "backend": "sync"})
+    mocker.patch.dict(
+        gc.config.config["gc"],
+        {
+            "max_container_age": "1 day ago",
+            "max_image_age": "",
+            "min_free_disk_space": "",
+            "dangling_volumes": False,
+            "exclude_container_labels": [],
+        },
+    )
+    return gc
+
+
+def test_record_and_replay(
+    mocker: MockFixture,
+    gc: garbage_collector.GarbageCollector,
+    fake_docker: "FakeDocker",
+    tmp_path: Path,
+) -> None:
+    recording = tmp_path / "recording.jsonl"
+    mocker.patch.dict(gc.config.config["record"], {"path": str(recording), "redact": ["Env"]})
+    gc.run()
+    gc.close()
+
+    entries = [json.loads(line) for line in recording.read_text().splitlines()]
+    assert entries[0]["version"]
+    removed = [entry["path"] for entry in entries[1:] if entry["method"] == "DELETE"]
+    assert len(removed) == 3
+    inspected = [entry for entry in entries[1:] if re.search(r"/containers/c\d/json", entry["path"])]
+    assert inspected
+    assert all(entry["body"]["Config"]["Env"] == replay.REDACTED for entry in inspected)
+    assert all(entry["elapsed"] > 0 for entry in entries[1:])
+    calls = len(fake_docker.calls)
+
+    sleep = mocker.patch("dockertidy.replay.time.sleep")
+    mocker.patch.dict(gc.config.config["record"], {"path": ""})
+    mocker.patch.dict(gc.config.config["replay"], {"path": str(recording), "speed": 2.0})
+    gc.run()
+
+    assert isinstance(gc.docker, replay.ReplayClient)
+    assert len(fake_docker.calls) == calls
+    assert len(gc.remover.reports["containers"].removed) == 3
+    assert sum(c.args[0] for c in sleep.call_args_list) == pytest.approx(
+        sum(entry["elapsed"] for entry in entries[1:]) / 2
+    )
+
+
+def test_replay_unknown_request(tmp_path: Path) -> None:
+    recording = tmp_path / "recording.jsonl"
+    recording.write_text(
+        json.dumps({"version": "1.43", "host": "http+docker://localhost"})
+        + "\n"
+        + json.dumps(
+            {
+                "method": "GET",
+                "path": "/v1.43/images/json?only_ids=0&all=0",
+                "status": 200,
+                "content_type": "application/json",
+                "elapsed": 0.5,
+                "body": [{"Id": "sha256:abcd"}],
+            }
+        )
+        + "\n"
+    )
+    client = replay.ReplayClient(str(recording), speed=0)
+
+    assert client.api_version == "1.43"
+    assert client.images() == [{"Id": "sha256:abcd"}]
+    assert client.images() == [{"Id": "sha256:abcd"}]
+    with pytest.raises(docker.errors.NotFound, match="No recorded response"):
+        client.volumes()
+
+
+def test_redact() -> None:
+    document = {"Config": {"Env": ["A=1"], "Labels": {"a": "b"}}, "Mounts": [{"Env": "x"}]}
+
+    assert replay.redact(document, frozenset({"Env"})) == {
+        "Config": {"Env": replay.REDACTED, "Labels": {"a": "b"}},
+        "Mounts": [{"Env": replay.REDACTED}],
+    }
@@ -0,0 +1,127 @@
+"""Test retry policy and circuit breaker."""
+
+from unittest.mock import MagicMock
+
+import docker
+import pytest
+import requests
+from pytest_mock import MockFixture
+
+from dockertidy.exception import CircuitOpenError
+from dockertidy.resilience import CircuitBreaker, RetryPolicy, is_transient, removal
+
+
+def api_error(status: int) -> docker.errors.APIError:
+    response = requests.Response()
+    response.status_code = status
+    return docker.errors.APIError("error", response=response)
+
+
+@pytest.fixture(autouse=True)
+def sleep(mocker: MockFixture) -> MagicMock:
+    return mocker.patch("dockertidy.resilience.time.sleep")
+
+
+def test_is_transient() -> None:
+    assert is_transient(requests.exceptions.ReadTimeout())
+    assert is_transient(requests.exceptions.ConnectionError())
+    assert is_transient(api_error(503))
+    assert not is_transient(api_error(404))
+    assert not is_transient(api_error(409))
+
+
+def test_retry_transient_errors(mocker: MockFixture) -> None:
+    func = mocker.Mock(side_effect=[requests.exceptions.ReadTimeout(), api_error(500), "ok"])
+    policy = RetryPolicy(attempts=2, backoff=0.1)
+
+    assert policy.call(func, image="a") == "ok"
+    assert func.call_args_list == [mocker.call(image="a")] * 3
+    assert policy.retries == 2
+
+
+def test_retry_gives_up(mocker: MockFixture) -> None:
+    missing = mocker.Mock(side_effect=api_error(404))
+    with pytest.raises(docker.errors.APIError):
+        RetryPolicy(attempts=3).call(missing)
+    missing.assert_called_once()
+
+    failing = mocker.Mock(side_effect=requests.exceptions.ReadTimeout())
+    with pytest.raises(requests.exceptions.ReadTimeout):
+        RetryPolicy(attempts=2).call(failing)
+    assert failing.call_count == 3
+
+
+def test_retried_removal_of_missing_object(mocker: MockFixture) -> None:
+    func = mocker.Mock(
+        __name__="remove_container",
+        side_effect=[requests.exceptions.ReadTimeout(), docker.errors.NotFound("gone")],
+    )
+
+    assert RetryPolicy(attempts=2).call(removal(func), container="a") is None
+    assert func.call_count == 2
+
+    missing = mocker.Mock(side_effect=docker.errors.NotFound("gone"))
+    with pytest.raises(docker.errors.NotFound):
+        RetryPolicy(attempts=2).call(removal(missing), container="a")
+    missing.assert_called_once()
+
+
+def test_retry_budget(mocker: MockFixture) -> None:
+    func = mocker.Mock(side_effect=requests.exceptions.ReadTimeout())
+    policy = RetryPolicy(attempts=5, budget=3)
+
+    for _ in range(2):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            policy.call(func)
+
+    assert policy.retries == 3
+    assert func.call_count == 5
+
+
+def test_retry_backoff_is_capped(mocker: MockFixture) -> None:
+    uniform = mocker.patch("dockertidy.resilience.random.uniform", side_effect=lambda a, b: b)
+    func = mocker.Mock(side_effect=[requests.exceptions.ReadTimeout()] * 4 + ["ok"])
+
+    RetryPolicy(attempts=4, backoff=1.0, max_backoff=3.0).call(func)
+
+    assert [c.args for c in uniform.call_args_list] == [(0, 1.0), (0, 2.0), (0, 3.0), (0, 3.0)]
+
+
+def test_breaker_pauses_and_recovers(sleep: MagicMock) -> None:
+    breaker = CircuitBreaker(threshold=0.5, window=4, pause=30.0)
+    for success in (True, False, True, False):
+        breaker.before_call()
+        breaker.record(success)
+    assert breaker.opens == 1
+
+    breaker.before_call()
+    assert sleep.call_args_list[-1].args[0] == pytest.approx(30.0, abs=1)
+    breaker.record(True)
+
+    breaker.before_call()
+    assert sleep.call_count == 1
+
+
+def test_breaker_gives_up(mocker: MockFixture) -> None:
+    breaker = CircuitBreaker(threshold=0.5, window=2, pause=1.0, max_opens=1)
+    func = mocker.Mock(side_effect=requests.exceptions.ReadTimeout())
+    policy = RetryPolicy(breaker=breaker)
+
+    with pytest.raises(CircuitOpenError):
+        for _ in range(10):
+            with pytest.raises(requests.exceptions.ReadTimeout):
+                policy.call(func)
+
+    assert breaker.opens == 2
+    assert func.call_count == 3
+
+
+def test_breaker_disabled(mocker: MockFixture, sleep: MagicMock) -> None:
+    policy = RetryPolicy(breaker=CircuitBreaker(threshold=0))
+    func = mocker.Mock(side_effect=requests.exceptions.ReadTimeout())
+
+    for _ in range(50):
+        with pytest.raises(requests.exceptions.ReadTimeout):
+            policy.call(func)
+
+    sleep.assert_not_called()
@@ -0,0 +1,56 @@
+"""Test RunSummary class."""
+
+import json
+from pathlib import Path
+
+import pytest
+
+from dockertidy.summary import RunSummary
+
+
+def test_phases() -> None:
+    summary = RunSummary("gc", "tcp://node1:2375")
+
+    summary.count_call()
+    with summary.track():
+        with summary.phase("cleanup_containers"):
+            summary.count_call()
+            summary.record(candidates=3, removed=2, failed=1)
+        with summary.phase("cleanup_volumes"):
+            summary.count_call()
+            summary.count_call()
+            summary.record(candidates=1, removed=1)
+    summary.record(candidates=10)
+
+    result = summary.to_dict()
+    assert result["command"] == "gc"
+    assert result["host"] == "tcp://node1:2375"
+    assert result["api_calls"] == 4
+    assert (result["candidates"], result["removed"], result["failed"]) == (4, 3, 1)
+    assert result["reclaimed_bytes"] is None
+    assert [(phase["name"], phase["api_calls"]) for phase in result["phases"]] == [
+        ("cleanup_containers", 1),
+        ("cleanup_volumes", 2),
+    ]
+
+
+def test_reclaimed_bytes(tmp_path: Path) -> None:
+    summary = RunSummary("gc", disk_path=str(tmp_path))
+
+    with summary.track():
+        pass
+
+    assert summary.disk_free_before is not None
+    assert summary.reclaimed_bytes == summary.disk_free_after - summary.disk_free_before  # type: ignore[operator]
+
+
+def test_write(tmp_path: Path, capsys: pytest.CaptureFixture[str]) -> None:
+    path = tmp_path / "summary.jsonl"
+    RunSummary("gc").write(str(path))
+    RunSummary("stop").write(str(path))
+
+    lines = path.read_text().splitlines()
+    assert [json.loads(line)["command"] for line in lines] == ["gc", "stop"]
+
+    RunSummary("stop").write("-")
+    assert json.loads(capsys.readouterr().out)["command"] == "stop"